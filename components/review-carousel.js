@@ -1,6 +1,10 @@
 /**
  * Review Carousel - COS Celebrations
  * Loads reviews from JSON and creates an interactive carousel
+ *
+ * Pass a tag or venue (data-tag / data-venue) to load only that shard from
+ * /data/reviews/, built by scripts/build-reviews.py. Without one it loads
+ * the featured reviews in /data/reviews.json.
  */
 
 class ReviewCarousel {
@@ -11,13 +15,14 @@ class ReviewCarousel {
       return;
     }
 
+    // Spread first so an undefined option (e.g. from a missing data attribute) keeps its default
     this.options = {
+      ...options,
       brand: options.brand || 'cos', // 'cos' or 'ae'
-      jsonPath: options.jsonPath || '/data/reviews.json',
+      jsonPath: options.jsonPath || ReviewCarousel.shardPath(options),
       autoplay: options.autoplay || false,
       autoplaySpeed: options.autoplaySpeed || 5000,
-      visibleCards: options.visibleCards || 3,
-      ...options
+      visibleCards: options.visibleCards || 3
     };
 
     this.currentIndex = 0;
@@ -57,6 +62,17 @@ class ReviewCarousel {
     this.reviews = data[this.options.brand] || [];
   }
 
+  // 'St. Augustine' -> 'st-augustine', as slugify() in scripts/build-reviews.py
+  static shardSlug(name) {
+    return name.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-+|-+$/g, '');
+  }
+
+  static shardPath({ tag, venue } = {}) {
+    if (tag) return `/data/reviews/tag-${ReviewCarousel.shardSlug(tag)}.json`;
+    if (venue) return `/data/reviews/venue-${ReviewCarousel.shardSlug(venue)}.json`;
+    return '/data/reviews.json';
+  }
+
   render() {
     if (this.reviews.length === 0) {
       this.container.innerHTML = '<p style="text-align: center; color: #666;">No reviews available.</p>';
@@ -277,7 +293,7 @@ class ReviewCarousel {
 document.addEventListener('DOMContentLoaded', () => {
   document.querySelectorAll('[data-review-carousel]').forEach(el => {
     const brand = el.dataset.brand || 'cos';
-    const jsonPath = el.dataset.jsonPath || '/data/reviews.json';
-    new ReviewCarousel(el.id, { brand, jsonPath });
+    const { jsonPath, tag, venue } = el.dataset;
+    new ReviewCarousel(el.id, { brand, jsonPath, tag, venue });
   });
 });
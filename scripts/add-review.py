@@ -2,43 +2,250 @@
 """
 COS Celebrations Review Manager
 Add reviews from Google, WeddingWire, The Knot, and Zola
+
+Usage:
+    python3 add-review.py                                 # Add one review interactively
+    python3 add-review.py import export.csv               # Bulk import a CSV or JSONL export
+    python3 add-review.py import knot.jsonl --platform theknot --dry-run
+
+Duplicate checks go through a MinHash index saved next to the review store
+(reviews/duplicate-index.json), so only likely matches are compared in full.
 """
 
+import argparse
+import csv
 import json
 import os
+import re
+import sys
+from collections import defaultdict
 from datetime import datetime
 from difflib import SequenceMatcher
+from hashlib import blake2b
 
 REVIEWS_FILE = os.path.join(os.path.dirname(__file__), '..', 'reviews', 'reviews.json')
+DUPLICATE_INDEX_FILE = os.path.join(os.path.dirname(__file__), '..', 'reviews', 'duplicate-index.json')
 PLATFORMS = ['google', 'weddingwire', 'theknot', 'zola']
 
+# Flag texts more than this similar (SequenceMatcher ratio) as duplicates
+TEXT_SIMILARITY_THRESHOLD = 0.7
+
+# MinHash/LSH settings. 4-character shingles in 42 bands of 3 rows catch
+# ~99.8% of pairs over the 70% threshold (truncated, re-typed or appended
+# copies) while sending only ~8% of unrelated reviews to the full compare.
+SHINGLE_SIZE = 4
+LSH_BANDS = 42
+LSH_ROWS = 3
+NUM_PERM = LSH_BANDS * LSH_ROWS
+# Band hits whose signatures agree on fewer slots than this are dropped before
+# the full compare; pairs over the 70% threshold sit well above it (>= 0.32),
+# while ~99% of unrelated reviews, even ones sharing most of their words, fall below
+MIN_SIGNATURE_SIMILARITY = 0.25
+NAME_GRAM = 3
+DUPLICATE_INDEX_VERSION = 2
+
+# Import column -> review field; headers are matched case-insensitively
+IMPORT_FIELDS = {
+    'platform': ['platform', 'source', 'site'],
+    'reviewerName': ['reviewername', 'reviewer', 'name', 'author'],
+    'rating': ['rating', 'stars'],
+    'date': ['date', 'reviewdate'],
+    'text': ['text', 'review', 'body', 'comment'],
+    'venue': ['venue'],
+}
+# How many skipped rows the import summary lists before eliding
+IMPORT_SUMMARY_LIMIT = 20
+
 def load_reviews():
     """Load existing reviews from JSON file."""
     with open(REVIEWS_FILE, 'r') as f:
         return json.load(f)
 
 def save_reviews(data):
-    """Save reviews to JSON file."""
-    with open(REVIEWS_FILE, 'w') as f:
+    """Save reviews to JSON file, atomically so an interrupted save keeps the old file."""
+    tmp_path = f"{REVIEWS_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
         json.dump(data, f, indent=2)
+    os.replace(tmp_path, REVIEWS_FILE)
+
+def next_review_id(data):
+    return max((review['id'] for review in data['reviews']), default=0) + 1
+
+def text_similarity(text1, text2, threshold=None):
+    """Calculate similarity ratio between two texts.
+
+    With a threshold, returns 0.0 as soon as SequenceMatcher's cheap upper
+    bounds show the ratio cannot exceed it.
+    """
+    matcher = SequenceMatcher(None, text1.lower(), text2.lower())
+    if threshold is not None and (matcher.real_quick_ratio() <= threshold or
+                                  matcher.quick_ratio() <= threshold):
+        return 0.0
+    return matcher.ratio()
+
+def _hash64(value):
+    return int.from_bytes(blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+# For each signature slot, a fixed order to try the other slots in when it is empty
+DENSIFY_ORDER = [sorted(range(NUM_PERM), key=lambda j: _hash64(f"densify-{i}-{j}"))
+                 for i in range(NUM_PERM)]
+
+def text_key(text):
+    """Fingerprint of a review text, to tell when a saved signature is stale."""
+    normalized = ' '.join(text.lower().split())
+    return blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+
+def minhash_signature(text):
+    """
+    One-permutation MinHash of the text's lowercased, whitespace-collapsed
+    character shingles: each shingle is hashed once, the hash picks one of
+    NUM_PERM slots and the rest of it competes for that slot's minimum.
+    Empty slots copy the first filled slot in their DENSIFY_ORDER, so two
+    texts agree on a slot about as often as their shingle sets overlap.
+    """
+    normalized = ' '.join(text.lower().split())
+    count = max(1, len(normalized) - SHINGLE_SIZE + 1)
+    filled = [None] * NUM_PERM
+    for shingle in {normalized[i:i + SHINGLE_SIZE] for i in range(count)}:
+        slot, value = divmod(_hash64(shingle), NUM_PERM)[::-1]
+        if filled[slot] is None or value < filled[slot]:
+            filled[slot] = value
+    return [value if value is not None else
+            next(filled[j] for j in DENSIFY_ORDER[i] if filled[j] is not None)
+            for i, value in enumerate(filled)]
+
+def agree_key(signature):
+    """The signature's low bytes as one int, so two can be compared slot by slot in one XOR."""
+    return int.from_bytes(bytes(value & 0xFF for value in signature), 'big')
+
+def name_grams(name):
+    return {name[i:i + NAME_GRAM] for i in range(len(name) - NAME_GRAM + 1)}
+
+class DuplicateIndex:
+    """
+    Finds the stored reviews find_duplicates() has to look at without
+    scanning them all: text candidates share an LSH band of their MinHash
+    signatures, name candidates come from a trigram index (names containing
+    the query) and a table of whole names (names contained in it).
+    """
 
-def text_similarity(text1, text2):
-    """Calculate similarity ratio between two texts."""
-    return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+    def __init__(self):
+        self.reviews = {}          # id -> (store position, review)
+        self.signatures = {}       # id -> {'textKey', 'signature'}
+        self.buckets = defaultdict(set)
+        self.agree_keys = {}       # id -> low byte of every slot, packed into one int
+        self.grams = defaultdict(set)
+        self.names = defaultdict(set)  # lowercased name -> ids
+        self.short_names = set()   # ids whose name is too short for trigrams
+        self.last_query = {}       # textKey -> signature of the last text looked up
+        self.changed = False
 
-def find_duplicates(data, reviewer_name, review_text):
-    """Check for potential duplicate reviews."""
+    def add(self, review, signature=None):
+        review_id = review['id']
+        key = text_key(review['text'])
+        saved = signature or self.signatures.get(review_id)
+        if not saved or saved['textKey'] != key:
+            signature = self.last_query.get(key) or minhash_signature(review['text'])
+            saved = {'textKey': key, 'signature': signature}
+            self.changed = True
+        self.signatures[review_id] = saved
+        self.agree_keys[review_id] = agree_key(saved['signature'])
+        self.reviews[review_id] = (len(self.reviews), review)
+
+        for band, start in enumerate(range(0, NUM_PERM, LSH_ROWS)):
+            self.buckets[band, tuple(saved['signature'][start:start + LSH_ROWS])].add(review_id)
+
+        name = review['reviewerName'].lower()
+        grams = name_grams(name)
+        if grams:
+            self.names[name].add(review_id)
+            for gram in grams:
+                self.grams[gram].add(review_id)
+        else:
+            self.short_names.add(review_id)
+
+    def name_candidates(self, name):
+        """Ids whose reviewer name contains name or is contained in it."""
+        grams = name_grams(name)
+        if not grams:
+            return set(self.reviews)    # too short to index; check them all
+        # Names containing the query have every one of its trigrams (rarest first)...
+        containing = set.intersection(*sorted((self.grams.get(g, set()) for g in grams), key=len))
+        # ...names inside it are one of its substrings
+        contained = set()
+        for start in range(len(name) - NAME_GRAM + 1):
+            for end in range(start + NAME_GRAM, len(name) + 1):
+                contained |= self.names.get(name[start:end], set())
+        return containing | contained | self.short_names
+
+    def text_candidates(self, text):
+        signature = minhash_signature(text)
+        # Adding a review right after checking it reuses this signature
+        self.last_query = {text_key(text): signature}
+        candidates = set()
+        for band, start in enumerate(range(0, NUM_PERM, LSH_ROWS)):
+            candidates |= self.buckets.get((band, tuple(signature[start:start + LSH_ROWS])), set())
+        key = agree_key(signature)
+        min_agree = MIN_SIGNATURE_SIMILARITY * NUM_PERM
+        # Slots that agree XOR to a zero byte (a 1-in-256 chance for slots that don't,
+        # which only lets the odd extra pair through to the full compare)
+        return {i for i in candidates
+                if (key ^ self.agree_keys[i]).to_bytes(NUM_PERM, 'big').count(0) >= min_agree}
+
+    def candidates(self, reviewer_name, review_text):
+        """Candidate reviews in store order."""
+        ids = self.name_candidates(reviewer_name.lower()) | self.text_candidates(review_text)
+        return [review for _, review in sorted(self.reviews[i] for i in ids)]
+
+def load_duplicate_index(data):
+    """Index every stored review, reusing saved signatures whose text is unchanged."""
+    saved = {}
+    try:
+        with open(DUPLICATE_INDEX_FILE, 'r') as f:
+            cached = json.load(f)
+        if cached.get('version') == DUPLICATE_INDEX_VERSION and \
+                cached.get('shingle') == SHINGLE_SIZE and cached.get('numPerm') == NUM_PERM:
+            saved = {int(k): v for k, v in cached['reviews'].items()}
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = DuplicateIndex()
+    for review in data['reviews']:
+        index.add(review, saved.get(review['id']))
+    if set(saved) != set(index.signatures):
+        index.changed = True
+    return index
+
+def save_duplicate_index(index):
+    """Persist the signatures next to the review store (skipped when nothing changed)."""
+    if not index.changed:
+        return
+    tmp_path = f"{DUPLICATE_INDEX_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'version': DUPLICATE_INDEX_VERSION,
+            'shingle': SHINGLE_SIZE,
+            'numPerm': NUM_PERM,
+            'reviews': {str(k): v for k, v in index.signatures.items()},
+        }, f)
+    os.replace(tmp_path, DUPLICATE_INDEX_FILE)
+    index.changed = False
+
+def find_duplicates(index, reviewer_name, review_text):
+    """Check for potential duplicate reviews among the index's candidates."""
     duplicates = []
     reviewer_name_lower = reviewer_name.lower()
 
-    for review in data['reviews']:
+    for review in index.candidates(reviewer_name, review_text):
         name_match = reviewer_name_lower in review['reviewerName'].lower() or \
                      review['reviewerName'].lower() in reviewer_name_lower
 
-        text_sim = text_similarity(review_text, review['text'])
+        # A name match is flagged anyway, so only then is the exact ratio needed below the threshold
+        text_sim = text_similarity(review_text, review['text'],
+                                   None if name_match else TEXT_SIMILARITY_THRESHOLD)
 
         # Flag if same name OR very similar text (>70%)
-        if name_match or text_sim > 0.7:
+        if name_match or text_sim > TEXT_SIMILARITY_THRESHOLD:
             duplicates.append({
                 'review': review,
                 'nameMatch': name_match,
@@ -47,6 +254,165 @@ def find_duplicates(data, reviewer_name, review_text):
 
     return duplicates
 
+def add_to_store(data, reviews):
+    """Append reviews and bring the metadata counts up to date."""
+    data['reviews'].extend(reviews)
+    data['metadata']['totalReviews'] = len(data['reviews'])
+    for review in reviews:
+        data['metadata']['platforms'][review['platform']] += 1
+    data['metadata']['lastUpdated'] = datetime.now().strftime('%Y-%m-%d')
+
+def read_import_rows(path):
+    """Yield (line number, row dict or None, error) from a CSV or JSONL file, one row at a time."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if ext == '.csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row, None
+        elif ext in ('.jsonl', '.ndjson'):
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_num, None, f"invalid JSON ({e.msg})"
+                    continue
+                if isinstance(row, dict):
+                    yield line_num, row, None
+                else:
+                    yield line_num, None, "not a JSON object"
+        else:
+            raise ValueError(f"unsupported file type '{ext}' (use .csv or .jsonl)")
+
+def parse_import_row(row, default_platform=None):
+    """Map an export row onto review fields, raising ValueError on anything invalid."""
+    columns = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+    fields = {}
+    for field, names in IMPORT_FIELDS.items():
+        value = next((columns[n] for n in names if columns.get(n) not in (None, '')), None)
+        fields[field] = str(value).strip() if value is not None else ''
+
+    platform = re.sub(r'[^a-z]', '', fields['platform'].lower()) or default_platform
+    if not platform:
+        raise ValueError("missing platform (pass --platform for single-platform exports)")
+    if platform not in PLATFORMS:
+        raise ValueError(f"unknown platform '{fields['platform']}'")
+    if not fields['reviewerName']:
+        raise ValueError("missing reviewer name")
+    if not fields['text']:
+        raise ValueError("missing review text")
+    try:
+        # '5' and '5.0' are fine; 4.5, inf and nan are not ratings
+        value = float(fields['rating'])
+        if not value.is_integer():
+            raise ValueError
+        rating = int(value)
+    except (ValueError, OverflowError):
+        raise ValueError(f"invalid rating '{fields['rating']}' (expected a whole number 1-5)")
+    if not 1 <= rating <= 5:
+        raise ValueError(f"rating {rating} out of range 1-5")
+    try:
+        # Accept full ISO timestamps, keep the date
+        review_date = datetime.strptime(fields['date'][:10], '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"invalid date '{fields['date']}' (expected YYYY-MM-DD)")
+
+    return {
+        'platform': platform,
+        'reviewerName': fields['reviewerName'],
+        'rating': rating,
+        'date': review_date,
+        'text': fields['text'],
+        'venue': fields['venue'] or None,
+    }
+
+def import_reviews(path, default_platform=None, keep_duplicates=False, dry_run=False):
+    """
+    Validate, de-duplicate and add every review in a CSV/JSONL export.
+    Rows are checked against the store and against earlier rows of the same
+    file, and everything accepted is saved in one atomic write at the end.
+    Returns (added, duplicates, invalid).
+    """
+    data = load_reviews()
+    index = load_duplicate_index(data)
+    review_id = next_review_id(data)
+    added_at = datetime.now().isoformat()
+    added, duplicates, invalid = [], [], []
+
+    for line_num, row, error in read_import_rows(path):
+        if error is None:
+            try:
+                fields = parse_import_row(row, default_platform)
+            except ValueError as e:
+                error = str(e)
+        if error:
+            invalid.append((line_num, error))
+            continue
+
+        matches = find_duplicates(index, fields['reviewerName'], fields['text'])
+        if matches and not keep_duplicates:
+            duplicates.append((line_num, fields, matches))
+            continue
+
+        review = {'id': review_id, **fields, 'addedAt': added_at}
+        review_id += 1
+        index.add(review)
+        added.append(review)
+
+    if added and not dry_run:
+        add_to_store(data, added)
+        save_reviews(data)
+        save_duplicate_index(index)
+    return added, duplicates, invalid
+
+def print_import_summary(added, duplicates, invalid, dry_run=False):
+    print("\n" + "="*50)
+    print("  IMPORT SUMMARY" + (" (dry run, nothing saved)" if dry_run else ""))
+    print("="*50)
+    print(f"\n  Added:      {len(added)}")
+    print(f"  Duplicates: {len(duplicates)}")
+    print(f"  Skipped:    {len(invalid)} invalid rows")
+
+    if duplicates:
+        print("\n  Duplicates (not imported):")
+        for line_num, fields, matches in duplicates[:IMPORT_SUMMARY_LIMIT]:
+            match = matches[0]
+            r = match['review']
+            reason = 'same reviewer name' if match['nameMatch'] else f"text {match['textSimilarity']} similar"
+            print(f"    line {line_num}: {fields['reviewerName']} ~ [{r['id']}] {r['reviewerName']} ({reason})")
+        if len(duplicates) > IMPORT_SUMMARY_LIMIT:
+            print(f"    ... and {len(duplicates) - IMPORT_SUMMARY_LIMIT} more")
+
+    if invalid:
+        print("\n  Invalid rows:")
+        for line_num, error in invalid[:IMPORT_SUMMARY_LIMIT]:
+            print(f"    line {line_num}: {error}")
+        if len(invalid) > IMPORT_SUMMARY_LIMIT:
+            print(f"    ... and {len(invalid) - IMPORT_SUMMARY_LIMIT} more")
+    print()
+
+def run_import(argv):
+    parser = argparse.ArgumentParser(prog='add-review.py import',
+                                     description='Bulk import reviews from a CSV or JSONL export')
+    parser.add_argument('file', help='CSV (with a header row) or JSONL file')
+    parser.add_argument('--platform', choices=PLATFORMS,
+                        help='Platform for rows without a platform column')
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help='Import rows flagged as potential duplicates too')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Validate and report without saving')
+    args = parser.parse_args(argv)
+
+    try:
+        added, duplicates, invalid = import_reviews(args.file, args.platform,
+                                                    args.keep_duplicates, args.dry_run)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print_import_summary(added, duplicates, invalid, args.dry_run)
+
 def get_multiline_input(prompt):
     """Get multiline input from user. Empty line to finish."""
     print(prompt)
@@ -71,6 +437,8 @@ def main():
 
     # Load existing data
     data = load_reviews()
+    index = load_duplicate_index(data)
+    save_duplicate_index(index)
 
     # Platform selection
     print("Platform:")
@@ -123,7 +491,7 @@ def main():
         return
 
     # Check for duplicates
-    duplicates = find_duplicates(data, reviewer_name, review_text)
+    duplicates = find_duplicates(index, reviewer_name, review_text)
 
     if duplicates:
         print("\n" + "!"*50)
@@ -145,7 +513,7 @@ def main():
 
     # Create review object
     review = {
-        'id': len(data['reviews']) + 1,
+        'id': next_review_id(data),
         'platform': platform,
         'reviewerName': reviewer_name,
         'rating': rating,
@@ -156,13 +524,12 @@ def main():
     }
 
     # Add to data
-    data['reviews'].append(review)
-    data['metadata']['totalReviews'] = len(data['reviews'])
-    data['metadata']['platforms'][platform] += 1
-    data['metadata']['lastUpdated'] = datetime.now().strftime('%Y-%m-%d')
+    add_to_store(data, [review])
 
     # Save
     save_reviews(data)
+    index.add(review)
+    save_duplicate_index(index)
 
     print("\n" + "="*50)
     print("  REVIEW SAVED!")
@@ -182,4 +549,7 @@ def main():
     print()
 
 if __name__ == '__main__':
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == 'import':
+        run_import(sys.argv[2:])
+    else:
+        main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Audit Benchmark for COS Celebrations
+Times audit.py against synthetic sites of increasing size.
+
+Each synthetic site is N venue pages cloned from a real venue page, with
+a controllable number of extra internal links, images and JSON-LD blocks
+per page. Every audit group runs as its own `audit.py` process so the
+timings match what `npm run audit:*` costs, and results are written as
+JSON so runs from different versions can be compared.
+
+Usage:
+    python3 audit-benchmark.py                                  # 100, 500 and 1000 pages
+    python3 audit-benchmark.py --pages 200,2000 --links 40      # Denser link graph
+    python3 audit-benchmark.py --images 20 --schemas 3 -j 4     # Heavier pages, 4 jobs
+    python3 audit-benchmark.py -o bench.json --keep             # Save results, keep the sites
+"""
+
+import sys
+import os
+import json
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Fix Windows encoding issues
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_DIR = SCRIPT_DIR.parent
+AUDIT_SCRIPT = SCRIPT_DIR / 'audit.py'
+
+SITE_DOMAIN = 'https://coscelebrations.com'
+TEMPLATE_PAGE = 'lightner-museum-wedding-dj/index.html'
+TEMPLATE_SLUG = 'lightner-museum-wedding-dj'
+TEMPLATE_VENUE = 'Lightner Museum'
+
+DEFAULT_PAGE_COUNTS = [100, 500, 1000]
+
+# Audit groups timed one process each; 'full' is the default all-audits run
+BENCH_GROUPS = ['meta', 'schema', 'images', 'responsive', 'links', 'content', 'graph', 'duplicates']
+# Groups that write a JSON report instead of taking --format
+REPORT_GROUPS = {'graph': 'link-graph.json', 'duplicates': 'duplicates.json'}
+
+EXTRA_SCHEMA = {
+    '@context': 'https://schema.org',
+    '@type': 'Event',
+    'name': 'Wedding Reception',
+    'location': {'@type': 'Place', 'name': 'Bench Venue'},
+}
+
+# ============================================================================
+# SYNTHETIC SITE
+# ============================================================================
+
+def venue_slug(i):
+    return f'bench-venue-{i:05d}'
+
+
+def template_images(template):
+    """Local image paths the template references, so the clone can ship them."""
+    images = []
+    for chunk in template.split('src="/')[1:]:
+        src = chunk.split('"', 1)[0]
+        if src.startswith('images/') and src not in images:
+            images.append(src)
+    return images
+
+
+def copy_images(site_dir, images):
+    """Copy the template's real images into the synthetic site."""
+    for src in images:
+        source = PROJECT_DIR / src
+        if source.exists():
+            target = site_dir / src
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+
+
+def clone_page(template, i, page_count, links, images, schemas, image_pool, rng):
+    """One venue page: the template renamed, plus extra links, images and JSON-LD."""
+    page = template.replace(TEMPLATE_SLUG, venue_slug(i))
+    page = page.replace(TEMPLATE_VENUE, f'Bench Venue {i}')
+
+    extra = []
+    for j in rng.sample(range(page_count), min(links, page_count)):
+        extra.append(f'<a href="/{venue_slug(j)}/">Bench Venue {j}</a>')
+    for k in range(images):
+        src = image_pool[(i + k) % len(image_pool)] if image_pool else 'images/missing.webp'
+        extra.append(f'<img src="/{src}" alt="Bench Venue {i} photo {k + 1}" '
+                     f'width="800" height="533" loading="lazy">')
+    for _ in range(schemas):
+        extra.append('<script type="application/ld+json">'
+                     f'{json.dumps(EXTRA_SCHEMA)}</script>')
+
+    block = '\n<section class="bench">\n' + '\n'.join(extra) + '\n</section>\n'
+    return page.replace('</body>', block + '</body>', 1)
+
+
+def build_synthetic_site(site_dir, page_count, links=10, images=5, schemas=1, seed=1):
+    """Write a synthetic site of page_count venue pages plus the home page.
+
+    Returns (HTML files written, total HTML bytes).
+    """
+    template = (PROJECT_DIR / TEMPLATE_PAGE).read_text(encoding='utf-8')
+    image_pool = template_images(template)
+    copy_images(site_dir, image_pool)
+    image_pool = [src for src in image_pool if (site_dir / src).exists()]
+    rng = random.Random(seed)
+
+    total_bytes = 0
+    for i in range(page_count):
+        page_dir = site_dir / venue_slug(i)
+        page_dir.mkdir(parents=True, exist_ok=True)
+        html = clone_page(template, i, page_count, links, images, schemas, image_pool, rng)
+        (page_dir / 'index.html').write_text(html, encoding='utf-8')
+        total_bytes += len(html.encode('utf-8'))
+
+    # Home page links every venue, so the link graph has a reachable root
+    hub = '\n'.join(f'<a href="/{venue_slug(i)}/">Bench Venue {i}</a>' for i in range(page_count))
+    home = template.replace(f'{SITE_DOMAIN}/{TEMPLATE_SLUG}/', f'{SITE_DOMAIN}/')
+    home = home.replace('</body>', f'<nav class="bench">\n{hub}\n</nav>\n</body>', 1)
+    (site_dir / 'index.html').write_text(home, encoding='utf-8')
+    total_bytes += len(home.encode('utf-8'))
+
+    urls = [f'{SITE_DOMAIN}/'] + [f'{SITE_DOMAIN}/{venue_slug(i)}/' for i in range(page_count)]
+    sitemap = ['<?xml version="1.0" encoding="UTF-8"?>',
+               '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    sitemap += [f'  <url><loc>{url}</loc></url>' for url in urls]
+    sitemap.append('</urlset>')
+    (site_dir / 'sitemap.xml').write_text('\n'.join(sitemap) + '\n', encoding='utf-8')
+
+    shutil.copyfile(PROJECT_DIR / 'robots.txt', site_dir / 'robots.txt')
+    return page_count + 1, total_bytes
+
+# ============================================================================
+# TIMING
+# ============================================================================
+
+def run_audit(site_dir, args):
+    """Run audit.py on site_dir with args. Returns wall-clock seconds."""
+    env = dict(os.environ, AUDIT_PROJECT_DIR=str(site_dir))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(AUDIT_SCRIPT)] + args,
+        capture_output=True,
+        text=True,
+        env=env
+    )
+    elapsed = time.perf_counter() - start
+    # audit.py exits 1 when it finds issues; anything else is a crash
+    if result.returncode not in (0, 1):
+        raise RuntimeError(f"audit.py {' '.join(args)} failed:\n{result.stderr}")
+    return elapsed
+
+
+def time_runs(site_dir, args, repeat, before=None):
+    """Time `repeat` runs, calling before() ahead of each one."""
+    runs = []
+    for _ in range(repeat):
+        if before:
+            before()
+        runs.append(run_audit(site_dir, args))
+    return runs
+
+
+def summarize(runs, page_count):
+    best = min(runs)
+    return {
+        'seconds': round(best, 4),
+        'median_seconds': round(statistics.median(runs), 4),
+        'runs': [round(r, 4) for r in runs],
+        'pages_per_second': round(page_count / best, 1) if best else None,
+        'ms_per_page': round(best * 1000 / page_count, 3),
+    }
+
+
+def benchmark_site(site_dir, page_count, jobs, repeat):
+    """Time each audit group uncached, then the full audit cold and warm.
+
+    page_count is every HTML file audit.py parses, home page included.
+    """
+    cache_dir = site_dir / '.audit-cache'
+    clear_cache = lambda: shutil.rmtree(cache_dir, ignore_errors=True)
+    jobs_args = ['--jobs', str(jobs), '--format', 'json']
+
+    groups = {}
+    for group in BENCH_GROUPS:
+        if group in REPORT_GROUPS:
+            args = [group, '--jobs', str(jobs), '--no-cache',
+                    '--output', str(site_dir / REPORT_GROUPS[group])]
+        else:
+            args = [group, '--no-cache'] + jobs_args
+        # --no-cache skips the page cache only; clearing also drops the image
+        # index and perceptual hashes, so 'duplicates' is timed cold every run
+        groups[group] = summarize(time_runs(site_dir, args, repeat, before=clear_cache), page_count)
+        print(f"    {group + ':':<12} {groups[group]['seconds']:7.2f}s "
+              f"({groups[group]['pages_per_second']} pages/s)", file=sys.stderr)
+
+    groups['full_cold'] = summarize(time_runs(site_dir, jobs_args, repeat, before=clear_cache), page_count)
+    print(f"    {'full:':<12} {groups['full_cold']['seconds']:7.2f}s cold", file=sys.stderr)
+
+    # The last cold run left a populated cache behind
+    groups['full_warm'] = summarize(time_runs(site_dir, jobs_args, repeat), page_count)
+    print(f"    {'':<12} {groups['full_warm']['seconds']:7.2f}s warm (cached)", file=sys.stderr)
+    return groups
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def audit_version():
+    """Commit and dirty flag of audit.py, so results can be tied to a version."""
+    try:
+        commit = subprocess.run(
+            ['git', 'log', '-1', '--format=%h', '--', str(AUDIT_SCRIPT)],
+            capture_output=True, text=True, cwd=PROJECT_DIR
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'diff', '--quiet', '--', str(AUDIT_SCRIPT)],
+            cwd=PROJECT_DIR
+        ).returncode != 0
+    except Exception:
+        return None
+    return f"{commit}{'-dirty' if dirty else ''}" or None
+
+
+def parse_page_counts(value):
+    try:
+        counts = [int(v) for v in value.split(',') if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated page counts, got {value!r}")
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError("page counts must be positive")
+    return counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark audit.py on synthetic sites')
+    parser.add_argument('--pages', type=parse_page_counts, default=DEFAULT_PAGE_COUNTS,
+                        help='Comma-separated venue page counts (default: 100,500,1000)')
+    parser.add_argument('--links', type=int, default=10,
+                        help='Extra internal links per page (default: 10)')
+    parser.add_argument('--images', type=int, default=5,
+                        help='Extra images per page (default: 5)')
+    parser.add_argument('--schemas', type=int, default=1,
+                        help='Extra JSON-LD blocks per page (default: 1)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='audit.py --jobs for every run (default: 1)')
+    parser.add_argument('--repeat', '-r', type=int, default=3,
+                        help='Runs per measurement; the best is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=1,
+                        help='Random seed for link targets (default: 1)')
+    parser.add_argument('--output', '-o',
+                        help='Write results JSON here (default: stdout)')
+    parser.add_argument('--keep', action='store_true',
+                        help='Keep the generated sites and print where they are')
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    # Progress goes to stderr so stdout stays valid JSON
+    work_dir = Path(tempfile.mkdtemp(prefix='audit-bench-'))
+
+    results = []
+    try:
+        for page_count in args.pages:
+            site_dir = work_dir / f'site-{page_count}'
+            print(f"\n  {page_count} pages", file=sys.stderr)
+            start = time.perf_counter()
+            html_files, html_bytes = build_synthetic_site(site_dir, page_count, args.links,
+                                                          args.images, args.schemas, args.seed)
+            print(f"    generated in {time.perf_counter() - start:.2f}s "
+                  f"({html_files} pages, {html_bytes / 1024 / 1024:.1f} MB HTML)", file=sys.stderr)
+            groups = benchmark_site(site_dir, html_files, args.jobs, args.repeat)
+
+            results.append({
+                'pages': page_count,
+                'html_files': html_files,
+                'html_bytes': html_bytes,
+                'groups': groups,
+            })
+    finally:
+        if args.keep:
+            print(f"\n  Synthetic sites kept in {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = json.dumps({
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'audit_version': audit_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'params': {
+            'template': TEMPLATE_PAGE,
+            'links': args.links,
+            'images': args.images,
+            'schemas': args.schemas,
+            'jobs': args.jobs,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }, indent=2)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+        print(f"\n  Results saved: {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,24 +6,41 @@ Runs extensive SEO and quality checks on the website.
 Usage:
     python3 audit.py              # Run all audits
     python3 audit.py images       # Run only image audits
+    python3 audit.py responsive   # Run only srcset/AVIF/WebP and page image weight audits
     python3 audit.py schema       # Run only schema audits
     python3 audit.py meta         # Run only meta audits
     python3 audit.py links        # Run only link audits
     python3 audit.py indexing     # Run only indexing audit
     python3 audit.py quick        # Run quick checks only (no file scanning)
+    python3 audit.py graph        # Link graph report: click depth, PageRank, orphans
+    python3 audit.py duplicates   # Near-duplicate image report (perceptual hashes, needs Pillow)
+    python3 audit.py --jobs 4     # Parse and check pages with 4 worker processes
+    python3 audit.py --no-cache   # Re-parse every page (skip .audit-cache/)
+    python3 audit.py --format sarif -o audit.sarif   # Machine-readable report (json, junit, sarif)
+    python3 audit.py --baseline audit-baseline.json          # Snapshot known issues
+    python3 audit.py --baseline audit-baseline.json --diff   # Report only new/resolved issues
 """
 
 import sys
 import os
 import json
 import re
+import html
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from pathlib import Path
-import subprocess
+import time
+import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property, partial
 from html.parser import HTMLParser
 from collections import defaultdict
-from urllib.parse import urljoin, urlparse
+from urllib.parse import unquote, urljoin, urlparse
+
+from git_history import load_commit_times
+from image_meta import HammingIndex, hamming, load_image_index, load_perceptual_hashes
 
 # Fix Windows encoding issues
 if sys.platform == 'win32':
@@ -38,11 +55,26 @@ SITE_NAME = 'COS Celebrations'
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
-PROJECT_DIR = SCRIPT_DIR.parent
+# AUDIT_PROJECT_DIR points the audit at another tree (audit-benchmark.py's synthetic sites)
+PROJECT_DIR = Path(os.environ.get('AUDIT_PROJECT_DIR') or SCRIPT_DIR.parent).resolve()
 SITEMAP_PATH = PROJECT_DIR / 'sitemap.xml'
 STATUS_PATH = PROJECT_DIR / '_data' / 'indexingStatus.json'
+REDIRECTS_PATH = PROJECT_DIR / '_redirects'
 IMAGES_DIR = PROJECT_DIR / 'images'
 
+# Incremental-run cache (gitignored)
+CACHE_DIR = PROJECT_DIR / '.audit-cache'
+PAGE_CACHE_PATH = CACHE_DIR / 'pages.json'
+GIT_TIMES_CACHE_PATH = CACHE_DIR / 'git-times.json'
+GRAPH_REPORT_PATH = CACHE_DIR / 'link-graph.json'
+IMAGE_INDEX_CACHE_PATH = CACHE_DIR / 'images.json'
+PERCEPTUAL_HASH_CACHE_PATH = CACHE_DIR / 'perceptual-hashes.json'
+DUPLICATES_REPORT_PATH = CACHE_DIR / 'duplicates.json'
+
+# Directories never treated as site pages
+SKIP_DIRS = {'node_modules', 'scripts', '.git', '_site'}
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg']
+
 # Thresholds
 MAX_TITLE_LENGTH = 60
 MAX_DESCRIPTION_LENGTH = 160
@@ -50,8 +82,22 @@ MIN_DESCRIPTION_LENGTH = 120
 MAX_IMAGE_SIZE_KB = 150
 RECOMMENDED_IMAGE_WIDTH = 800
 MAX_HERO_WIDTH = 1200
+MAX_ASPECT_MISMATCH = 0.02  # width/height attributes vs real pixels, relative
+MOBILE_VARIANT_WIDTH = 400  # the -400w files served to phones
+MAX_PAGE_IMAGE_KB = {'mobile': 1000, 'desktop': 2000}
+
+# Viewport (CSS px, device pixel ratio) for page image weight, as in
+# Lighthouse's mobile and desktop emulation
+VIEWPORTS = {'mobile': (412, 1.75), 'desktop': (1350, 1)}
 MIN_ALT_TEXT_LENGTH = 10
 MAX_ALT_TEXT_LENGTH = 125
+MAX_CLICK_DEPTH = 3
+PAGERANK_DAMPING = 0.85
+MAX_DUPLICATE_DISTANCE = 16  # dHash bits (of 256) apart that still count as the same photo
+
+# Bump when a per-page check changes in a way the thresholds above don't
+# capture, so cached findings from older rules are thrown away.
+AUDIT_RULES_VERSION = 6
 
 # Colors for terminal output
 class Colors:
@@ -73,11 +119,46 @@ def colorize(text, color):
 # HTML PARSER
 # ============================================================================
 
+# Elements with no end tag, kept off the parser's open-element stack
+VOID_TAGS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                       'link', 'meta', 'source', 'track', 'wbr'})
+CSS_COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_RULE_PATTERN = re.compile(r'([^{}]+)\{([^{}]*)\}')
+# object-fit values that crop or letterbox instead of stretching (fill)
+OBJECT_FIT_PATTERN = re.compile(r'object-fit\s*:\s*(?:cover|contain|none|scale-down)', re.IGNORECASE)
+COMPOUND_SELECTOR_PATTERN = re.compile(r'([a-z][a-z0-9]*)?((?:\.[\w-]+)*)', re.IGNORECASE)
+
+
+def parse_selector(selector):
+    """[(tag, classes)] per compound of a descendant selector like '.card img.wide',
+    or None for selectors using anything else (ids, attributes, pseudo-classes).
+    """
+    compounds = []
+    for part in selector.replace('>', ' ').split():
+        match = COMPOUND_SELECTOR_PATTERN.fullmatch(part)
+        if not match:
+            return None
+        tag, classes = match.groups()
+        compounds.append(((tag or '').lower(), frozenset(classes.split('.')[1:])))
+    return compounds or None
+
+
+def selector_matches_img(compounds, classes, ancestor_classes):
+    """Whether a parsed selector can select an <img> with these classes under these ancestors."""
+    tag, own = compounds[-1]
+    if tag not in ('', 'img') or not own <= classes:
+        return False
+    return all(needed <= ancestor_classes for _, needed in compounds[:-1])
+
+
 class PageParser(HTMLParser):
     """Parse HTML and extract SEO-relevant elements."""
 
-    def __init__(self):
+    def __init__(self, head_only=False):
         super().__init__()
+        # head_only: stop at </head> (or <body>); `done` tells the feeder to stop
+        self.head_only = head_only
+        self.done = False
         self.title = None
         self.description = None
         self.canonical = None
@@ -88,6 +169,15 @@ class PageParser(HTMLParser):
         self.external_links = []
         self.schemas = []
         self.og_tags = {}
+        # <source>s of the enclosing <picture>, if any
+        self.picture_sources = None
+        # (tag, classes) of every open element, for matching CSS selectors
+        self.open_elements = []
+        # Per image: (classes, ancestor classes), resolved against the page's CSS in finish()
+        self.image_classes = []
+        self.fit_selectors = []
+        self.in_style = False
+        self.style_content = ""
         self.in_title = False
         self.in_h1 = False
         self.in_h2 = False
@@ -97,7 +187,15 @@ class PageParser(HTMLParser):
         self.current_text = ""
 
     def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self.head_only and tag == 'body':
+            self.done = True
+            return
         attrs_dict = dict(attrs)
+        classes = frozenset((attrs_dict.get('class') or '').split())
+        if tag not in VOID_TAGS:
+            self.open_elements.append((tag, classes))
 
         if tag == 'title':
             self.in_title = True
@@ -121,6 +219,15 @@ class PageParser(HTMLParser):
             rel = attrs_dict.get('rel', '')
             if rel == 'canonical':
                 self.canonical = attrs_dict.get('href')
+        elif tag == 'picture':
+            self.picture_sources = []
+        elif tag == 'source' and self.picture_sources is not None:
+            self.picture_sources.append({
+                'srcset': attrs_dict.get('srcset', ''),
+                'sizes': attrs_dict.get('sizes', ''),
+                'type': attrs_dict.get('type', ''),
+                'media': attrs_dict.get('media', ''),
+            })
         elif tag == 'img':
             self.images.append({
                 'src': attrs_dict.get('src', ''),
@@ -128,7 +235,14 @@ class PageParser(HTMLParser):
                 'width': attrs_dict.get('width'),
                 'height': attrs_dict.get('height'),
                 'loading': attrs_dict.get('loading'),
+                'srcset': attrs_dict.get('srcset', ''),
+                'sizes': attrs_dict.get('sizes', ''),
+                'sources': list(self.picture_sources or []),
+                # Cropped or letterboxed by object-fit, so its box may differ from the file's shape
+                'fit': bool(OBJECT_FIT_PATTERN.search(attrs_dict.get('style') or '')),
             })
+            ancestor_classes = frozenset().union(*(c for _, c in self.open_elements))
+            self.image_classes.append((classes, ancestor_classes))
         elif tag == 'a':
             href = attrs_dict.get('href', '')
             if href and not href.startswith('#') and not href.startswith('mailto:') and not href.startswith('tel:'):
@@ -136,6 +250,9 @@ class PageParser(HTMLParser):
                     self.internal_links.append(href)
                 elif href.startswith('http'):
                     self.external_links.append(href)
+        elif tag == 'style':
+            self.in_style = True
+            self.style_content = ""
         elif tag == 'script':
             script_type = attrs_dict.get('type', '')
             if script_type == 'application/ld+json':
@@ -144,7 +261,16 @@ class PageParser(HTMLParser):
                 self.script_content = ""
 
     def handle_endtag(self, tag):
-        if tag == 'title':
+        if self.done:
+            return
+        # Close the innermost matching element and anything left open inside it
+        for i in range(len(self.open_elements) - 1, -1, -1):
+            if self.open_elements[i][0] == tag:
+                del self.open_elements[i:]
+                break
+        if self.head_only and tag == 'head':
+            self.done = True
+        elif tag == 'title':
             self.in_title = False
             self.title = self.current_text.strip()
         elif tag == 'h1':
@@ -153,6 +279,15 @@ class PageParser(HTMLParser):
         elif tag == 'h2':
             self.in_h2 = False
             self.h2s.append(self.current_text.strip())
+        elif tag == 'picture':
+            self.picture_sources = None
+        elif tag == 'style' and self.in_style:
+            self.in_style = False
+            css = CSS_COMMENT_PATTERN.sub('', self.style_content)
+            for selectors, declarations in CSS_RULE_PATTERN.findall(css):
+                if OBJECT_FIT_PATTERN.search(declarations):
+                    parsed = (parse_selector(selector) for selector in selectors.split(','))
+                    self.fit_selectors.extend(p for p in parsed if p)
         elif tag == 'script' and self.in_script:
             self.in_script = False
             if self.script_type == 'json-ld':
@@ -164,22 +299,534 @@ class PageParser(HTMLParser):
             self.script_content = ""
 
     def handle_data(self, data):
+        if self.done:
+            return
         if self.in_title or self.in_h1 or self.in_h2:
             self.current_text += data
         if self.in_script:
             self.script_content += data
+        if self.in_style:
+            self.style_content += data
+
+    def finish(self):
+        """Mark images an object-fit rule in the page's <style> blocks applies to.
+
+        Done once the page is parsed, since a <style> may come after the images it styles.
+        """
+        for img, (classes, ancestor_classes) in zip(self.images, self.image_classes):
+            img['fit'] = img['fit'] or any(selector_matches_img(compounds, classes, ancestor_classes)
+                                           for compounds in self.fit_selectors)
+
+
+# ============================================================================
+# ISSUES
+# ============================================================================
+
+@dataclass(frozen=True)
+class Issue:
+    """One audit finding.
+
+    `rule` is a stable id like 'meta/title-too-long'. `page` is the page or
+    file the finding is about (relative to the project, or a site path),
+    and `element` the offending src/href/field when there is one.
+    """
+    rule: str
+    severity: str
+    message: str
+    page: str = None
+    element: str = None
+
+    @property
+    def id(self):
+        """Stable across runs: doesn't change when e.g. a length in the message does."""
+        key = f"{self.rule}|{self.page or ''}|{self.element or ''}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+    def __str__(self):
+        return self.message
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'rule': self.rule,
+            'severity': self.severity,
+            'page': self.page,
+            'element': self.element,
+            'message': self.message,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(rule=data['rule'], severity=data['severity'], message=data['message'],
+                   page=data.get('page'), element=data.get('element'))
+
 
+def error(rule, message, page=None, element=None):
+    """An issue that fails its audit group."""
+    return Issue(rule, 'error', message, str(page) if page is not None else None, element)
 
-def parse_html_file(file_path):
-    """Parse an HTML file and return extracted data."""
+
+def warning(rule, message, page=None, element=None):
+    """An issue worth fixing that doesn't fail its audit group."""
+    return Issue(rule, 'warning', message, str(page) if page is not None else None, element)
+
+
+# ============================================================================
+# PAGE MODEL
+# ============================================================================
+
+# Page fields, grouped by how cheaply they can be extracted:
+#   head    - complete once the parser reaches </head>
+#   scanned - pulled from the raw markup with a regex, no HTML parse
+#   body    - need the HTML parser to run over the whole document
+HEAD_FIELDS = frozenset({'title', 'description', 'canonical', 'og_tags'})
+SCANNED_FIELDS = frozenset({'h1s'})
+BODY_FIELDS = frozenset({'h1s', 'h2s', 'images', 'internal_links', 'external_links', 'schemas'})
+PARSED_FIELDS = HEAD_FIELDS | BODY_FIELDS
+ALL_FIELDS = PARSED_FIELDS | {'content'}
+
+# Fields each audit reads. A single-audit run extracts only these, with the
+# cheapest parse that covers them; the full audit extracts everything.
+AUDIT_FIELDS = {
+    'meta': frozenset({'title', 'description', 'canonical', 'og_tags', 'h1s'}),
+    'schema': frozenset({'schemas'}),
+    'images': frozenset({'images'}),
+    'links': frozenset({'internal_links'}),
+    'content': frozenset({'content'}),
+    'graph': frozenset({'internal_links'}),
+    'responsive': frozenset({'images'}),
+    'duplicates': frozenset({'images'}),
+}
+
+# Pages are fed to the parser in chunks of this many characters
+PARSE_CHUNK_SIZE = 16 * 1024
+
+H1_PATTERN = re.compile(r'<h1\b[^>]*>(.*?)</h1\s*>', re.IGNORECASE | re.DOTALL)
+NON_CONTENT_PATTERN = re.compile(
+    r'<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+# Extraction modes from least to most complete
+PARSE_MODES = ('none', 'head', 'full')
+
+
+def parse_mode(fields):
+    """Cheapest extraction covering fields: 'none', 'head' or 'full'."""
+    parsed = fields & PARSED_FIELDS
+    if not parsed:
+        return 'none'
+    if parsed <= HEAD_FIELDS | SCANNED_FIELDS:
+        return 'head'
+    return 'full'
+
+
+def scan_h1s(content):
+    """H1 texts found by regex, skipping comments, scripts and styles."""
+    markup = NON_CONTENT_PATTERN.sub('', content)
+    return tuple(
+        html.unescape(TAG_PATTERN.sub('', h1)).strip()
+        for h1 in H1_PATTERN.findall(markup)
+    )
+
+
+@dataclass(frozen=True)
+class Page:
+    """One parsed HTML page. Built once per run and shared by every audit.
+
+    `fields` records what was extracted; fields outside it keep their
+    empty defaults, and `content` is None unless 'content' was requested.
+    """
+    path: Path
+    rel_path: Path
+    content: str
+    parsed: bool = True
+    title: str = None
+    description: str = None
+    canonical: str = None
+    h1s: tuple = ()
+    h2s: tuple = ()
+    images: tuple = ()
+    internal_links: tuple = ()
+    external_links: tuple = ()
+    schemas: tuple = ()
+    og_tags: dict = field(default_factory=dict)
+    content_hash: str = None
+    fields: frozenset = ALL_FIELDS
+
+    @classmethod
+    def from_file(cls, path, fields=None, read=None):
+        """Stream a page through the parser, stopping as soon as `fields` are known.
+
+        `read` is the (content, sha256) read_page() already returned for a
+        cache miss; the page is then parsed from it instead of re-read.
+        Otherwise the file is read only as far as the parser needs (all of
+        it when content is kept) and content_hash stays None, since only
+        the cache uses it.
+
+        Returns None if the file can't be read.
+        """
+        fields = ALL_FIELDS if fields is None else frozenset(fields)
+        mode = parse_mode(fields)
+        scan_h1 = mode == 'head' and 'h1s' in fields
+        keep_content = 'content' in fields or scan_h1
+
+        parser = PageParser(head_only=(mode == 'head')) if mode != 'none' else None
+        parse_failed = False
+        chunks = []
+        content_hash = read[1] if read else None
+        source = split_chunks(read[0]) if read else read_chunks(path)
+        try:
+            for chunk in source:
+                if keep_content:
+                    chunks.append(chunk)
+                if parser and not parser.done and not parse_failed:
+                    try:
+                        parser.feed(chunk)
+                    except Exception:
+                        parse_failed = True
+                elif not keep_content:
+                    break
+        except (OSError, UnicodeDecodeError):
+            return None
+        finally:
+            source.close()
+
+        rel_path = path.relative_to(PROJECT_DIR)
+        content = ''.join(chunks) if keep_content else None
+        if parser is None or parse_failed:
+            return cls(path=path, rel_path=rel_path, content=content, parsed=not parse_failed,
+                       content_hash=content_hash, fields=fields & {'content'})
+
+        parser.finish()
+        # A JSON-LD block may hold a list of schema objects
+        schemas = []
+        for schema in parser.schemas:
+            items = schema if isinstance(schema, list) else [schema]
+            schemas.extend(s for s in items if isinstance(s, dict))
+
+        extracted = set(PARSED_FIELDS if mode == 'full' else HEAD_FIELDS)
+        h1s = tuple(parser.h1s)
+        if scan_h1:
+            h1s = scan_h1s(content)
+            extracted.add('h1s')
+        if 'content' in fields:
+            extracted.add('content')
+        else:
+            content = None
+
+        return cls(
+            path=path,
+            rel_path=rel_path,
+            content=content,
+            title=parser.title,
+            description=parser.description,
+            canonical=parser.canonical,
+            h1s=h1s,
+            h2s=tuple(parser.h2s),
+            images=tuple(parser.images),
+            internal_links=tuple(parser.internal_links),
+            external_links=tuple(parser.external_links),
+            schemas=tuple(schemas),
+            og_tags=dict(parser.og_tags),
+            content_hash=content_hash,
+            fields=frozenset(extracted),
+        )
+
+    def to_cache(self):
+        """Extracted fields as JSON-safe data (content and paths excluded)."""
+        return {
+            'mode': parse_mode(self.fields),
+            'fields': sorted(self.fields & PARSED_FIELDS),
+            'parsed': self.parsed,
+            'title': self.title,
+            'description': self.description,
+            'canonical': self.canonical,
+            'h1s': list(self.h1s),
+            'h2s': list(self.h2s),
+            'images': list(self.images),
+            'internal_links': list(self.internal_links),
+            'external_links': list(self.external_links),
+            'schemas': list(self.schemas),
+            'og_tags': self.og_tags,
+        }
+
+    @classmethod
+    def from_cache(cls, path, content, content_hash, data):
+        """Rebuild a page from to_cache() data without re-parsing it."""
+        return cls(
+            path=path,
+            rel_path=path.relative_to(PROJECT_DIR),
+            content=content,
+            parsed=data['parsed'],
+            title=data['title'],
+            description=data['description'],
+            canonical=data['canonical'],
+            h1s=tuple(data['h1s']),
+            h2s=tuple(data['h2s']),
+            images=tuple(data['images']),
+            internal_links=tuple(data['internal_links']),
+            external_links=tuple(data['external_links']),
+            schemas=tuple(data['schemas']),
+            og_tags=data['og_tags'],
+            content_hash=content_hash,
+            fields=frozenset(data['fields']) | {'content'},
+        )
+
+
+def read_chunks(path):
+    """Yield a page PARSE_CHUNK_SIZE characters at a time; closing early stops the read."""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter(partial(f.read, PARSE_CHUNK_SIZE), '')
+
+
+def split_chunks(content):
+    """Yield already-read content in the same chunks read_chunks() would."""
+    for i in range(0, len(content), PARSE_CHUNK_SIZE):
+        yield content[i:i + PARSE_CHUNK_SIZE]
+
+
+def read_page(path):
+    """Read a page. Returns (content, sha256 of content) or None if unreadable."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             content = f.read()
-        parser = PageParser()
-        parser.feed(content)
-        return parser
-    except Exception as e:
+    except (OSError, UnicodeDecodeError):
         return None
+    return content, hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+@dataclass(frozen=True)
+class Site:
+    """Every page and image in the project, collected in a single tree walk."""
+    pages: tuple
+    html_files: tuple
+    image_files: tuple
+    walk_time: float = 0.0
+    parse_time: float = 0.0
+    jobs: int = 1
+    cache_hits: int = 0
+    # {rel_path: {group: (issues, warnings)}}, filled by workers, the cache or on demand
+    findings: dict = field(default_factory=dict)
+
+    def findings_for(self, page, group):
+        """Per-page (issues, warnings) for an audit group, computed at most once."""
+        page_findings = self.findings.setdefault(page.rel_path, {})
+        if group not in page_findings:
+            page_findings[group] = PAGE_CHECKS[group](page)
+        return page_findings[group]
+
+    def collect(self, group):
+        """Merge a group's per-page findings in path order: all issues, then all warnings."""
+        issues = []
+        warnings = []
+        for page in self.pages:
+            page_issues, page_warnings = self.findings_for(page, group)
+            issues.extend(page_issues)
+            warnings.extend(page_warnings)
+        return issues, warnings
+
+    @cached_property
+    def routes(self):
+        """RouteIndex over this site's pages and _redirects."""
+        return RouteIndex(self.html_files, parse_redirects())
+
+    @cached_property
+    def link_graph(self):
+        """Internal LinkGraph, built on first use."""
+        return build_link_graph(self)
+
+    @cached_property
+    def image_index(self):
+        """Header-probed metadata for every image file, keyed by '/'-separated relative path."""
+        return load_image_index(PROJECT_DIR, self.image_files, IMAGE_INDEX_CACHE_PATH)
+
+    @cached_property
+    def perceptual_hashes(self):
+        """dHash per raster image, keyed like image_index (decodes new images; needs Pillow)."""
+        return load_perceptual_hashes(PROJECT_DIR, self.image_index, PERCEPTUAL_HASH_CACHE_PATH, self.jobs)
+
+
+def walk_project():
+    """Walk the project once. Returns (html_files, image_files), sorted by path."""
+    html_files = []
+    image_files = []
+    for dirpath, dirnames, filenames in os.walk(PROJECT_DIR):
+        dirnames[:] = [d for d in dirnames if d != '.git']
+        root = Path(dirpath)
+        rel_parts = root.relative_to(PROJECT_DIR).parts
+        is_page_dir = not any(part in SKIP_DIRS for part in rel_parts)
+        for name in filenames:
+            suffix = os.path.splitext(name)[1]
+            if suffix == '.html' and is_page_dir:
+                html_files.append(root / name)
+            elif suffix in IMAGE_EXTENSIONS:
+                image_files.append(root / name)
+    return sorted(html_files), sorted(image_files)
+
+
+def analyze_page(path, read=None, groups=(), fields=None):
+    """Parse one page and run the given per-page checks on it.
+
+    Module-level so it can be pickled into pool workers. `read` is passed
+    on to Page.from_file().
+    Returns (page, {group: (issues, warnings)}), or (None, {}) if unreadable.
+    """
+    page = Page.from_file(path, fields, read)
+    if page is None:
+        return None, {}
+    return page, {group: PAGE_CHECKS[group](page) for group in groups}
+
+
+def load_site(jobs=1, groups=(), fields=None, use_cache=False):
+    """Walk the tree and parse every page exactly once.
+
+    With jobs > 1, parsing and the per-page checks for `groups` are fanned
+    out across a process pool. Results come back in path order, so the
+    merged output is identical to a serial run.
+
+    With use_cache, pages whose content hash matches the on-disk cache are
+    rebuilt from their cached extract and findings instead of being parsed.
+
+    `fields` limits extraction to what the audits being run need (see
+    AUDIT_FIELDS); None extracts everything.
+    """
+    fields = ALL_FIELDS if fields is None else frozenset(fields)
+    start = time.perf_counter()
+    html_files, image_files = walk_project()
+    walked = time.perf_counter()
+
+    results = {}
+    to_parse = html_files
+    # Content and hash of each cache miss, so it isn't read a second time
+    reads = {}
+    if use_cache:
+        cached_pages = load_page_cache()
+        to_parse = []
+        for html_file in html_files:
+            read = read_page(html_file)
+            if read is None:
+                continue
+            content, content_hash = read
+            entry = cached_pages.get(str(html_file.relative_to(PROJECT_DIR)))
+            if (entry and entry['hash'] == content_hash
+                    and fields & PARSED_FIELDS <= set(entry['page']['fields'])):
+                page = Page.from_cache(html_file, content, content_hash, entry['page'])
+                results[html_file] = (page, {
+                    group: tuple([Issue.from_dict(i) for i in found] for found in pair)
+                    for group, pair in entry['findings'].items()
+                })
+            else:
+                to_parse.append(html_file)
+                reads[html_file] = read
+    cache_hits = len(results)
+
+    if jobs > 1 and len(to_parse) > 1:
+        worker = partial(analyze_page, groups=tuple(groups), fields=fields)
+        chunksize = max(1, len(to_parse) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results.update(zip(to_parse, pool.map(worker, to_parse, [reads.get(f) for f in to_parse],
+                                                  chunksize=chunksize)))
+    else:
+        # Serial: parse only; checks run lazily so their time is reported per group
+        results.update((html_file, analyze_page(html_file, reads.get(html_file), fields=fields))
+                       for html_file in to_parse)
+
+    pages = []
+    findings = {}
+    for html_file in html_files:
+        page, page_findings = results.get(html_file, (None, {}))
+        if page:
+            pages.append(page)
+            findings[page.rel_path] = page_findings
+    parsed = time.perf_counter()
+
+    return Site(
+        pages=tuple(pages),
+        html_files=tuple(html_files),
+        image_files=tuple(image_files),
+        walk_time=walked - start,
+        parse_time=parsed - walked,
+        jobs=jobs,
+        cache_hits=cache_hits,
+        findings=findings,
+    )
+
+
+# Groups whose per-page findings depend only on the page's own content.
+# Link and image checks also stat other files, so they always re-run.
+CACHEABLE_GROUPS = ('meta', 'schema', 'content')
+
+
+def rules_fingerprint():
+    """Fingerprint of everything besides page content that affects findings."""
+    rules = {
+        'version': AUDIT_RULES_VERSION,
+        'site_domain': SITE_DOMAIN,
+        'max_title_length': MAX_TITLE_LENGTH,
+        'max_description_length': MAX_DESCRIPTION_LENGTH,
+        'min_description_length': MIN_DESCRIPTION_LENGTH,
+        'min_alt_text_length': MIN_ALT_TEXT_LENGTH,
+        'max_alt_text_length': MAX_ALT_TEXT_LENGTH,
+    }
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def load_page_cache():
+    """Load cached page entries, or {} if missing, unreadable or from other rules."""
+    try:
+        with open(PAGE_CACHE_PATH, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('rules') != rules_fingerprint():
+        return {}
+    return cache.get('pages', {})
+
+
+def save_page_cache(site):
+    """Write every page's extract and cacheable findings for the next run.
+
+    An unchanged page keeps its cached extract when that came from a more
+    complete parse (a head-only meta run never replaces a full parse), and
+    keeps the cached findings of groups this run didn't check.
+    """
+    cached_pages = load_page_cache()
+    pages = {}
+    for page in site.pages:
+        key = str(page.rel_path)
+        page_findings = site.findings.get(page.rel_path, {})
+        entry = {
+            'hash': page.content_hash,
+            'page': page.to_cache(),
+            'findings': {
+                group: [[issue.to_dict() for issue in found] for found in page_findings[group]]
+                for group in CACHEABLE_GROUPS if group in page_findings
+            },
+        }
+        cached = cached_pages.get(key)
+        if cached and cached['hash'] == page.content_hash:
+            if PARSE_MODES.index(cached['page']['mode']) > PARSE_MODES.index(entry['page']['mode']):
+                entry['page'] = cached['page']
+            entry['findings'] = {**cached['findings'], **entry['findings']}
+        pages[key] = entry
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = PAGE_CACHE_PATH.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'rules': rules_fingerprint(), 'pages': pages}, f)
+    os.replace(tmp_path, PAGE_CACHE_PATH)
+
+
+_site = None
+
+
+def get_site():
+    """Return the shared Site for this run, loading it on first use."""
+    global _site
+    if _site is None:
+        _site = load_site()
+    return _site
 
 
 # ============================================================================
@@ -215,25 +862,17 @@ def parse_sitemap():
     return urls
 
 
-def get_all_html_files():
-    """Get all HTML files in the project."""
-    html_files = []
-    for path in PROJECT_DIR.rglob('*.html'):
-        # Skip node_modules, scripts, etc.
-        rel_path = path.relative_to(PROJECT_DIR)
-        skip_dirs = ['node_modules', 'scripts', '.git', '_site']
-        if not any(part in skip_dirs for part in rel_path.parts):
-            html_files.append(path)
-    return html_files
-
-
-def get_all_images():
-    """Get all image files in the project."""
-    image_files = []
-    extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg']
-    for ext in extensions:
-        image_files.extend(PROJECT_DIR.rglob(f'*{ext}'))
-    return [f for f in image_files if '.git' not in str(f)]
+def get_sitemap_paths():
+    """Sitemap URLs as site paths with a trailing slash, e.g. '/about/'."""
+    sitemap_paths = set()
+    for url_data in parse_sitemap():
+        path = url_data['url'].replace(SITE_DOMAIN, '')
+        if not path:
+            path = '/'
+        if not path.endswith('/'):
+            path += '/'
+        sitemap_paths.add(path)
+    return sitemap_paths
 
 
 def url_to_file_path(url):
@@ -256,24 +895,20 @@ def url_to_file_path(url):
     return None
 
 
+_commit_times = None
+
+
 def get_git_modified_time(url):
     """Get the last git commit time for a page's HTML file."""
+    global _commit_times
     file_path = url_to_file_path(url)
     if not file_path:
         return None
 
-    try:
-        result = subprocess.run(
-            ['git', 'log', '-1', '--format=%cI', str(file_path)],
-            capture_output=True,
-            text=True,
-            cwd=PROJECT_DIR
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout.strip()
-    except Exception:
-        pass
-    return None
+    # One `git log` pass for every page, cached per HEAD
+    if _commit_times is None:
+        _commit_times = load_commit_times(PROJECT_DIR, GIT_TIMES_CACHE_PATH)
+    return _commit_times.get(file_path.relative_to(PROJECT_DIR).as_posix())
 
 
 def get_file_size_kb(file_path):
@@ -281,6 +916,496 @@ def get_file_size_kb(file_path):
     return file_path.stat().st_size / 1024
 
 
+# ============================================================================
+# LINK GRAPH
+# ============================================================================
+
+def parse_redirects(path=None):
+    """Parse Netlify _redirects into (source, target, status, forced) rules."""
+    path = path or REDIRECTS_PATH
+    rules = []
+    if not path.exists():
+        return rules
+
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            status = parts[2] if len(parts) > 2 else '301'
+            rules.append((parts[0], parts[1], status.rstrip('!'), status.endswith('!')))
+    return rules
+
+
+class RouteIndex:
+    """Resolve internal link paths to pages by dictionary lookup.
+
+    Built once per run from the page list and _redirects. Follows the same
+    precedence as Netlify: forced (!) rules, then real files, then
+    ordinary rules. Each unique link is resolved once and memoized.
+    """
+
+    MAX_REDIRECT_HOPS = 5
+
+    def __init__(self, html_files, redirects):
+        # '/about/' -> about/index.html (a directory index wins over about.html)
+        self.routes = {}
+        for html_file in html_files:
+            rel_path = html_file.relative_to(PROJECT_DIR)
+            url_path = page_url_path(rel_path)
+            if rel_path.name == 'index.html':
+                self.routes[url_path] = html_file
+            else:
+                self.routes.setdefault(url_path, html_file)
+        self.redirects = redirects
+        self._resolved = {}
+
+    def match_redirect(self, link, forced):
+        """Return (target, status) of the first matching rule, or None."""
+        for source, target, status, is_forced in self.redirects:
+            if is_forced != forced:
+                continue
+            if source.endswith('*'):
+                prefix = source[:-1]
+                if link.startswith(prefix):
+                    return target.replace(':splat', link[len(prefix):]), status
+            elif link == source or link.rstrip('/') == source.rstrip('/'):
+                return target, status
+        return None
+
+    def resolve(self, link):
+        """Resolve a normalized link path.
+
+        Returns (target, redirected): target is the page's site path (e.g.
+        '/pricing/'), an off-site URL for external redirects, or None if
+        the link is broken or points at a gone (4xx) rule.
+        """
+        if link not in self._resolved:
+            self._resolved[link] = self._follow(link, self.MAX_REDIRECT_HOPS)
+        return self._resolved[link]
+
+    def _follow(self, link, hops_left):
+        rule = self.match_redirect(link, forced=True)
+        if rule is None and link in self.routes:
+            return link, False
+        if rule is None:
+            rule = self.match_redirect(link, forced=False)
+        if rule is None or hops_left == 0:
+            return None, False
+
+        target, status = rule
+        if not (status.startswith('3') or status == '200'):
+            return None, False
+        if target.startswith(SITE_DOMAIN):
+            target = target.replace(SITE_DOMAIN, '')
+        if target.startswith('http'):
+            return target, True
+
+        target = normalize_internal_link(target)
+        if target is None:
+            return None, False
+        resolved, _ = self._follow(target, hops_left - 1)
+        return resolved, True
+
+
+class LinkGraph:
+    """Internal link graph between pages, keyed by site path ('/about/').
+
+    outbound: page -> pages it links to, in first-seen order
+    inbound:  page -> pages linking to it, in first-seen order
+    broken:   (page rel_path, link) for every unresolvable link occurrence
+    redirected: (page rel_path, link, target) for links that hop via _redirects
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.outbound = defaultdict(list)
+        self.inbound = defaultdict(list)
+        self.broken = []
+        self.redirected = []
+
+    def add_edge(self, source, target):
+        if target not in self.outbound[source]:
+            self.outbound[source].append(target)
+            self.inbound[target].append(source)
+
+
+def build_link_graph(site):
+    """Build the internal link graph for every parsed page in the site."""
+    routes = site.routes
+    graph = LinkGraph()
+
+    for page in site.pages:
+        source = page_url_path(page.rel_path)
+        graph.nodes.append(source)
+        if not page.parsed:
+            continue
+
+        for link in page.internal_links:
+            link = normalize_internal_link(link)
+            if link is None:
+                continue
+
+            target, redirected = routes.resolve(link)
+            if target is None:
+                graph.broken.append((page.rel_path, link))
+                continue
+            if redirected:
+                graph.redirected.append((page.rel_path, link, target))
+            if target in routes.routes:
+                graph.add_edge(source, target)
+
+    return graph
+
+
+# ============================================================================
+# LINK GRAPH ANALYTICS
+# ============================================================================
+
+def graph_to_index(graph):
+    """Number the graph's nodes and build sparse adjacency lists over indices.
+
+    Returns (nodes, out_edges, in_edges): out_edges[i] / in_edges[i] are
+    lists of node indices, so every pass below is O(pages + links).
+    """
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    out_edges = [[] for _ in nodes]
+    in_edges = [[] for _ in nodes]
+    for source, targets in graph.outbound.items():
+        i = index[source]
+        for target in targets:
+            j = index.get(target)
+            if j is not None and j != i:
+                out_edges[i].append(j)
+                in_edges[j].append(i)
+    return nodes, out_edges, in_edges
+
+
+def click_depths(out_edges, root):
+    """Breadth-first click depth from root. Unreachable nodes get None."""
+    depth = [None] * len(out_edges)
+    depth[root] = 0
+    frontier = [root]
+    while frontier:
+        next_frontier = []
+        for i in frontier:
+            for j in out_edges[i]:
+                if depth[j] is None:
+                    depth[j] = depth[i] + 1
+                    next_frontier.append(j)
+        frontier = next_frontier
+    return depth
+
+
+def pagerank(out_edges, in_edges, damping=PAGERANK_DAMPING, tol=1e-10, max_iter=100):
+    """Internal PageRank by power iteration over the sparse edge lists.
+
+    Rank from pages with no outbound links is spread evenly across all
+    pages, so the scores always sum to 1.
+    """
+    n = len(out_edges)
+    if n == 0:
+        return []
+    out_degree = [len(edges) for edges in out_edges]
+    rank = [1.0 / n] * n
+    base = (1.0 - damping) / n
+
+    for _ in range(max_iter):
+        dangling = sum(rank[i] for i in range(n) if out_degree[i] == 0)
+        spread = base + damping * dangling / n
+        share = [rank[i] / out_degree[i] if out_degree[i] else 0.0 for i in range(n)]
+        new_rank = [spread + damping * sum(share[j] for j in in_edges[i]) for i in range(n)]
+        delta = sum(abs(new_rank[i] - rank[i]) for i in range(n))
+        rank = new_rank
+        if delta < tol:
+            break
+    return rank
+
+
+def strongly_connected_components(out_edges):
+    """Tarjan's algorithm, iterative. Returns a component id per node."""
+    n = len(out_edges)
+    index = [None] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    component = [None] * n
+    stack = []
+    counter = 0
+    count = 0
+
+    for start in range(n):
+        if index[start] is not None:
+            continue
+        work = [(start, 0)]
+        while work:
+            node, edge_pos = work[-1]
+            if edge_pos == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+
+            recurse = False
+            edges = out_edges[node]
+            while edge_pos < len(edges):
+                target = edges[edge_pos]
+                edge_pos += 1
+                if index[target] is None:
+                    work[-1] = (node, edge_pos)
+                    work.append((target, 0))
+                    recurse = True
+                    break
+                if on_stack[target]:
+                    lowlink[node] = min(lowlink[node], index[target])
+            if recurse:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = count
+                    if member == node:
+                        break
+                count += 1
+    return component
+
+
+def analyze_link_graph(graph, sitemap_paths=()):
+    """Compute click depth, PageRank, SCCs and orphans for a LinkGraph."""
+    nodes, out_edges, in_edges = graph_to_index(graph)
+    sitemap_paths = set(sitemap_paths)
+
+    root = nodes.index('/') if '/' in nodes else None
+    depth = click_depths(out_edges, root) if root is not None else [None] * len(nodes)
+    rank = pagerank(out_edges, in_edges)
+    component = strongly_connected_components(out_edges)
+
+    members = defaultdict(list)
+    for i, c in enumerate(component):
+        members[c].append(nodes[i])
+    components = sorted(members.values(), key=lambda m: (-len(m), m[0]))
+
+    pages = {}
+    for i, node in enumerate(nodes):
+        pages[node] = {
+            'depth': depth[i],
+            'pagerank': round(rank[i], 6),
+            'inbound': len(in_edges[i]),
+            'outbound': len(out_edges[i]),
+            'component_size': len(members[component[i]]),
+            'in_sitemap': node in sitemap_paths,
+        }
+
+    return {
+        'root': '/',
+        'page_count': len(nodes),
+        'link_count': sum(len(edges) for edges in out_edges),
+        'max_depth': MAX_CLICK_DEPTH,
+        'pages': pages,
+        'components': [m for m in components if len(m) > 1],
+        # No inbound links from any other page
+        'orphans': [node for i, node in enumerate(nodes) if not in_edges[i] and node != '/'],
+        # Can't be reached by clicking from the homepage
+        'unreachable': [node for i, node in enumerate(nodes) if depth[i] is None],
+    }
+
+
+def print_graph_summary(report, limit=10):
+    """Terminal summary of analyze_link_graph() output, sitemap pages first."""
+    pages = report['pages']
+    sitemap = {p: d for p, d in pages.items() if d['in_sitemap']} or pages
+    components = report['components']
+
+    print(f"  Pages: {report['page_count']}  Links: {report['link_count']}  "
+          f"Largest SCC: {len(components[0]) if components else 1} pages")
+
+    by_depth = defaultdict(int)
+    for data in sitemap.values():
+        by_depth[data['depth']] += 1
+    depth_line = ', '.join(f"{d}: {c}" for d, c in sorted(by_depth.items(), key=lambda x: (x[0] is None, x[0] or 0)))
+    print(f"  Click depth (sitemap pages): {depth_line}")
+
+    ranked = sorted(sitemap.items(), key=lambda x: -x[1]['pagerank'])
+    print(f"\n  Highest internal PageRank:")
+    for path, data in ranked[:limit]:
+        print(f"    {data['pagerank']:.4f}  {path}")
+    print(f"\n  Lowest internal PageRank:")
+    for path, data in ranked[-limit:]:
+        print(f"    {data['pagerank']:.4f}  {path}")
+
+    max_depth = report['max_depth']
+    deep = [(p, d['depth']) for p, d in sitemap.items() if d['depth'] is not None and d['depth'] > max_depth]
+    if deep:
+        print(f"\n  {colorize(f'Deeper than {max_depth} clicks:', Colors.YELLOW)}")
+        for path, depth in sorted(deep, key=lambda x: (-x[1], x[0])):
+            print(f"    {depth}  {path}")
+
+    unreachable = [p for p in report['unreachable'] if p in sitemap]
+    if unreachable:
+        print(f"\n  {colorize('Not reachable from /:', Colors.RED)}")
+        for path in unreachable:
+            print(f"    {path}")
+
+    orphans = [p for p in report['orphans'] if p in sitemap]
+    if orphans:
+        print(f"\n  {colorize('Orphans (no inbound links):', Colors.RED)}")
+        for path in orphans:
+            print(f"    {path}")
+
+
+def run_graph_report(site, output_path=None):
+    """Build the link graph once, print a summary and write the JSON report."""
+    print_section("Internal Link Graph")
+    report = analyze_link_graph(site.link_graph, get_sitemap_paths())
+    print_graph_summary(report)
+
+    output_path = Path(output_path) if output_path else GRAPH_REPORT_PATH
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n  Full report: {output_path}\n")
+
+    sitemap_pages = {p for p, d in report['pages'].items() if d['in_sitemap']}
+    return not any(p in sitemap_pages for p in report['unreachable'])
+
+
+# ============================================================================
+# DUPLICATE IMAGES
+# ============================================================================
+
+def image_references(site):
+    """Pages that use each image (src, srcset or <source>): {rel_path: sorted page paths}."""
+    references = defaultdict(set)
+    for page in site.pages:
+        for img in page.images:
+            for url in [img['src']] + image_candidates(img):
+                if url.startswith('/'):
+                    references[url.lstrip("/")].add(str(page.rel_path))
+    return {path: sorted(pages) for path, pages in references.items()}
+
+
+def find_duplicate_images(site, max_distance=MAX_DUPLICATE_DISTANCE):
+    """Clusters of the same photo saved under different names.
+
+    Files sharing a variant_base() (photo.webp, photo.avif, photo-400w.webp)
+    are one asset. Assets whose perceptual hashes are within max_distance
+    bits - directly or through a chain - form a cluster. Each cluster keeps
+    the asset most pages use (then the widest); the rest is reclaimable.
+    """
+    hashes = site.perceptual_hashes
+    image_index = site.image_index
+    references = image_references(site)
+
+    paths = sorted(hashes)
+    index = HammingIndex(max_distance)
+    for path in paths:
+        index.add(hashes[path])
+
+    # Union-find over assets, so variants never count as duplicates of each other
+    parent = {}
+
+    def find(asset):
+        parent.setdefault(asset, asset)
+        while parent[asset] != asset:
+            parent[asset] = parent[parent[asset]]
+            asset = parent[asset]
+        return asset
+
+    closest = {}
+    for i, path in enumerate(paths):
+        asset = find(variant_base(path))
+        for j in index.query(hashes[path]):
+            other = variant_base(paths[j])
+            if j <= i or other == variant_base(path):
+                continue
+            root, other_root = find(asset), find(other)
+            if root != other_root:
+                parent[other_root] = root
+            distance = hamming(hashes[path], hashes[paths[j]])
+            for base in (variant_base(path), other):
+                closest[base] = min(closest.get(base, distance), distance)
+
+    assets = defaultdict(list)
+    for path in paths:
+        assets[variant_base(path)].append(path)
+    clusters = defaultdict(list)
+    for base in closest:
+        files = [{
+            'path': path,
+            'bytes': image_index[path]['bytes'],
+            'width': image_index[path]['width'],
+            'pages': references.get(path, []),
+        } for path in assets[base]]
+        clusters[find(base)].append({
+            'asset': base,
+            'files': files,
+            'bytes': sum(f['bytes'] for f in files),
+            'pages': sorted({p for f in files for p in f['pages']}),
+            'width': max(f['width'] or 0 for f in files),
+            'distance': closest[base],
+        })
+
+    report = []
+    for members in clusters.values():
+        members.sort(key=lambda m: (-len(m['pages']), -m['width'], m['asset']))
+        total = sum(m['bytes'] for m in members)
+        report.append({
+            'keep': members[0]['asset'],
+            'assets': members,
+            'bytes': total,
+            'reclaimable': total - members[0]['bytes'],
+        })
+    report.sort(key=lambda c: (-c['reclaimable'], c['keep']))
+    return report
+
+
+def print_duplicates_summary(clusters, hashed, limit=20):
+    """Terminal summary of find_duplicate_images() output, biggest savings first."""
+    total = sum(c['bytes'] for c in clusters)
+    reclaimable = sum(c['reclaimable'] for c in clusters)
+    print(f"  Images hashed: {hashed}  Duplicate clusters: {len(clusters)}  "
+          f"Size: {total / 1024 / 1024:.1f}MB  Reclaimable: {reclaimable / 1024 / 1024:.1f}MB")
+    for cluster in clusters[:limit]:
+        print(f"\n  {len(cluster['assets'])} copies, {cluster['bytes'] / 1024:.0f}KB "
+              f"({cluster['reclaimable'] / 1024:.0f}KB reclaimable)")
+        for member in cluster['assets']:
+            tag = colorize('keep', Colors.GREEN) if member['asset'] == cluster['keep'] else \
+                colorize(f"d={member['distance']:<2}", Colors.YELLOW)
+            variants = f" +{len(member['files']) - 1} variants" if len(member['files']) > 1 else ''
+            pages = ', '.join(member['pages'][:3]) + (' ...' if len(member['pages']) > 3 else '')
+            print(f"    {tag}  {member['asset']}{variants}  {member['bytes'] / 1024:.0f}KB  "
+                  f"pages: {pages or 'none'}")
+    if len(clusters) > limit:
+        print(f"\n  ... and {len(clusters) - limit} more clusters")
+
+
+def run_duplicates_report(site, output_path=None):
+    """Hash every image (cached), cluster near-duplicates and write the JSON report."""
+    print_section("Duplicate Images")
+    try:
+        clusters = find_duplicate_images(site)
+    except ImportError:
+        print(f"  {colorize('[FAIL]', Colors.RED)} Perceptual hashing needs Pillow: pip install Pillow")
+        return False
+    print_duplicates_summary(clusters, len(site.perceptual_hashes))
+
+    output_path = Path(output_path) if output_path else DUPLICATES_REPORT_PATH
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump({'max_distance': MAX_DUPLICATE_DISTANCE, 'clusters': clusters}, f, indent=2)
+    print(f"\n  Full report: {output_path}\n")
+    return True
+
+
 # ============================================================================
 # AUDIT FUNCTIONS
 # ============================================================================
@@ -290,27 +1415,28 @@ def audit_sitemap():
     issues = []
 
     if not SITEMAP_PATH.exists():
-        return False, ["sitemap.xml not found"]
+        return False, [error('sitemap/missing', "sitemap.xml not found", 'sitemap.xml')]
 
     try:
         urls = parse_sitemap()
         if len(urls) == 0:
-            issues.append("sitemap.xml is empty")
+            issues.append(error('sitemap/empty', "sitemap.xml is empty", 'sitemap.xml'))
 
         # Check for duplicate URLs
         url_list = [u['url'] for u in urls]
         duplicates = [u for u in url_list if url_list.count(u) > 1]
         if duplicates:
-            issues.append(f"Duplicate URLs in sitemap: {set(duplicates)}")
+            issues.append(error('sitemap/duplicate-url', f"Duplicate URLs in sitemap: {set(duplicates)}", 'sitemap.xml'))
 
         # Check all URLs are accessible
         for url_data in urls:
             file_path = url_to_file_path(url_data['url'])
             if not file_path or not file_path.exists():
-                issues.append(f"Missing file for sitemap URL: {url_data['url']}")
+                issues.append(error('sitemap/missing-file', f"Missing file for sitemap URL: {url_data['url']}",
+                                    'sitemap.xml', url_data['url']))
 
     except Exception as e:
-        issues.append(f"Invalid sitemap: {str(e)}")
+        issues.append(error('sitemap/invalid', f"Invalid sitemap: {str(e)}", 'sitemap.xml'))
 
     if not issues:
         return True, [f"{len(urls)} URLs in sitemap - all valid"]
@@ -323,18 +1449,19 @@ def audit_robots():
     robots_path = PROJECT_DIR / 'robots.txt'
 
     if not robots_path.exists():
-        return False, ["robots.txt not found"]
+        return False, [error('robots/missing', "robots.txt not found", 'robots.txt')]
 
     with open(robots_path, 'r') as f:
         content = f.read()
 
     # Check for sitemap reference
     if 'Sitemap:' not in content:
-        issues.append("robots.txt doesn't reference sitemap")
+        issues.append(error('robots/no-sitemap', "robots.txt doesn't reference sitemap", 'robots.txt'))
 
     # Check sitemap URL is correct
     if SITE_DOMAIN not in content:
-        issues.append(f"robots.txt sitemap URL may be incorrect (should use {SITE_DOMAIN})")
+        issues.append(error('robots/sitemap-domain', f"robots.txt sitemap URL may be incorrect (should use {SITE_DOMAIN})",
+                            'robots.txt'))
 
     if not issues:
         return True, ["robots.txt configured correctly"]
@@ -356,12 +1483,12 @@ def audit_indexing():
         page_status = status.get('pages', {}).get(path)
 
         if not page_status:
-            issues.append(f"Never indexed: {path}")
+            issues.append(error('indexing/never-indexed', f"Never indexed: {path}", path))
             continue
 
         last_indexed = page_status.get('lastIndexed')
         if not last_indexed:
-            issues.append(f"No index date: {path}")
+            issues.append(error('indexing/no-date', f"No index date: {path}", path))
             continue
 
         # Check if modified since indexing
@@ -371,7 +1498,7 @@ def audit_indexing():
                 git_date = datetime.fromisoformat(git_time)
                 indexed_date = datetime.fromisoformat(last_indexed.replace('Z', '+00:00'))
                 if git_date > indexed_date:
-                    issues.append(f"Modified since indexing: {path}")
+                    issues.append(error('indexing/modified', f"Modified since indexing: {path}", path))
             except ValueError:
                 pass
 
@@ -380,75 +1507,146 @@ def audit_indexing():
     return False, issues
 
 
-def audit_images():
-    """Comprehensive image audit."""
+def check_page_images(page):
+    """Per-page image checks: alt text and broken references."""
     issues = []
     warnings = []
+    if not page.parsed:
+        return issues, warnings
 
-    html_files = get_all_html_files()
-    all_referenced_images = set()
+    page_path = page.rel_path
 
-    # Collect all images referenced in HTML
-    for html_file in html_files:
-        parser = parse_html_file(html_file)
-        if not parser:
+    for img in page.images:
+        src = img['src']
+        alt = img['alt']
+
+        # Skip lightbox placeholder images (empty src, populated via JS)
+        if not src:
             continue
 
-        page_path = html_file.relative_to(PROJECT_DIR)
+        # Check alt text
+        if not alt:
+            issues.append(error('images/missing-alt', f"Missing alt text: {src} on {page_path}", page_path, src))
+        elif len(alt) < MIN_ALT_TEXT_LENGTH:
+            warnings.append(warning('images/alt-too-short', f"Alt text too short ({len(alt)} chars): {src} on {page_path}",
+                                    page_path, src))
+        elif len(alt) > MAX_ALT_TEXT_LENGTH:
+            warnings.append(warning('images/alt-too-long', f"Alt text too long ({len(alt)} chars): {src} on {page_path}",
+                                    page_path, src))
 
-        for img in parser.images:
-            src = img['src']
-            alt = img['alt']
+        # Check for lazy loading on below-fold images
+        # (We can't know for sure, but non-hero images should have loading="lazy")
+
+        # Check image exists
+        if src.startswith('/'):
+            img_path = PROJECT_DIR / src.lstrip('/')
+            if not img_path.exists():
+                issues.append(error('images/broken', f"Broken image: {src} on {page_path}", page_path, src))
+
+    return issues, warnings
 
-            # Skip lightbox placeholder images (empty src, populated via JS)
-            if not src:
-                continue
 
-            # Track referenced images
-            if src.startswith('/'):
-                all_referenced_images.add(src)
+def parse_dimension(value):
+    """Pixel count from a width/height attribute, or None if absent or not a number."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def check_image_dimensions(page, img, meta):
+    """Compare an <img>'s width/height attributes with the file's real pixels."""
+    src = img['src']
+    page_path = page.rel_path
+    if img['width'] is None or img['height'] is None:
+        return warning('images/missing-dimensions',
+                       f"Missing width/height ({meta['width']}x{meta['height']}): {src} on {page_path}",
+                       page_path, src)
+
+    width, height = parse_dimension(img['width']), parse_dimension(img['height'])
+    # object-fit crops or letterboxes the file into the declared box on purpose
+    if not width or not height or img['fit']:
+        return None
+    declared = width / height
+    actual = meta['width'] / meta['height']
+    if abs(declared - actual) / actual > MAX_ASPECT_MISMATCH:
+        return warning('images/wrong-dimensions',
+                       f"width/height {width}x{height} don't match image {meta['width']}x{meta['height']}: "
+                       f"{src} on {page_path}", page_path, src)
+    return None
+
 
-            # Check alt text
-            if not alt:
-                issues.append(f"Missing alt text: {src} on {page_path}")
-            elif len(alt) < MIN_ALT_TEXT_LENGTH:
-                warnings.append(f"Alt text too short ({len(alt)} chars): {src} on {page_path}")
-            elif len(alt) > MAX_ALT_TEXT_LENGTH:
-                warnings.append(f"Alt text too long ({len(alt)} chars): {src} on {page_path}")
+def audit_images(site=None):
+    """Comprehensive image audit."""
+    site = site or get_site()
+    issues = []
+    warnings = []
 
-            # Check for lazy loading on below-fold images
-            # (We can't know for sure, but non-hero images should have loading="lazy")
+    all_referenced_images = set()
+    image_index = site.image_index
+    # Widest width attribute each image is shown at, to judge oversized sources
+    display_widths = defaultdict(int)
+    # (page, src) pairs whose dimensions were checked; a repeated <img> is reported once
+    dimensions_checked = set()
 
-            # Check image exists
-            if src.startswith('/'):
-                img_path = PROJECT_DIR / src.lstrip('/')
-                if not img_path.exists():
-                    issues.append(f"Broken image: {src} on {page_path}")
+    # Collect all images referenced in HTML
+    for page in site.pages:
+        page_issues, page_warnings = site.findings_for(page, 'images')
+        issues.extend(page_issues)
+        warnings.extend(page_warnings)
+
+        # Track referenced images
+        for img in page.images:
+            if img['src'].startswith('/'):
+                all_referenced_images.add(img['src'])
+
+            # Check declared dimensions against the file (sizes come from headers only)
+            meta = image_index.get(img['src'].lstrip('/')) if img['src'].startswith('/') else None
+            if not meta or not meta['width'] or not meta['height']:
+                continue
+            if (page.rel_path, img['src']) not in dimensions_checked:
+                dimensions_checked.add((page.rel_path, img['src']))
+                dimension_warning = check_image_dimensions(page, img, meta)
+                if dimension_warning:
+                    warnings.append(dimension_warning)
+            rel_src = img['src'].lstrip('/')
+            display_widths[rel_src] = max(display_widths[rel_src], parse_dimension(img['width']) or 0)
 
     # Check image file sizes and formats
-    image_files = get_all_images()
+    image_files = site.image_files
     for img_path in image_files:
         rel_path = img_path.relative_to(PROJECT_DIR)
         size_kb = get_file_size_kb(img_path)
 
         # Check file size
         if size_kb > MAX_IMAGE_SIZE_KB:
-            issues.append(f"Image too large ({size_kb:.0f}KB): {rel_path}")
+            issues.append(error('images/too-large', f"Image too large ({size_kb:.0f}KB): {rel_path}", rel_path))
+
+        # Check pixel width: 2x the widest display width (for retina), within
+        # RECOMMENDED_IMAGE_WIDTH..MAX_HERO_WIDTH; images only used from CSS
+        # are held to MAX_HERO_WIDTH
+        meta = image_index.get(rel_path.as_posix())
+        if meta and meta['width']:
+            shown = display_widths.get(rel_path.as_posix())
+            limit = min(MAX_HERO_WIDTH, max(RECOMMENDED_IMAGE_WIDTH, 2 * shown)) if shown else MAX_HERO_WIDTH
+            if meta['width'] > limit:
+                warnings.append(warning('images/oversized',
+                                        f"Image wider than needed ({meta['width']}px, max {limit}px): {rel_path}",
+                                        rel_path))
 
         # Check format (prefer WebP)
         if img_path.suffix.lower() in ['.jpg', '.jpeg', '.png']:
             # Only warn if it's a content image, not a special file
             if 'favicon' not in str(img_path).lower():
-                warnings.append(f"Consider WebP format: {rel_path}")
+                warnings.append(warning('images/not-webp', f"Consider WebP format: {rel_path}", rel_path))
 
     # Check for orphaned images (in images/ but not used)
-    if IMAGES_DIR.exists():
-        for img_path in IMAGES_DIR.rglob('*'):
-            if img_path.is_file() and img_path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.webp', '.gif']:
-                rel_path = '/' + str(img_path.relative_to(PROJECT_DIR))
-                if rel_path not in all_referenced_images:
-                    # Not necessarily an issue, might be used in CSS
-                    pass
+    for img_path in image_files:
+        if IMAGES_DIR in img_path.parents and img_path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.webp', '.gif']:
+            rel_path = '/' + str(img_path.relative_to(PROJECT_DIR))
+            if rel_path not in all_referenced_images:
+                # Not necessarily an issue, might be used in CSS
+                pass
 
     all_issues = issues + warnings
     if not all_issues:
@@ -456,181 +1654,377 @@ def audit_images():
     return len(issues) == 0, all_issues
 
 
-def audit_meta():
-    """Audit meta tags and SEO elements."""
+MEDIA_WIDTH_PATTERN = re.compile(r'\((max|min)-width:\s*([\d.]+)px\)')
+WIDTH_SUFFIX_PATTERN = re.compile(r'-\d+w$')
+# Raster formats that should have lighter siblings
+RESPONSIVE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp'}
+
+
+def parse_srcset(srcset):
+    """[(url, descriptor)] from a srcset; descriptor is ('w', width) or ('x', density)."""
+    candidates = []
+    for candidate in srcset.split(','):
+        parts = candidate.split()
+        if not parts:
+            continue
+        url, descriptor = parts[0], parts[1] if len(parts) > 1 else '1x'
+        try:
+            if descriptor.endswith('w'):
+                candidates.append((url, ('w', int(descriptor[:-1]))))
+            else:
+                candidates.append((url, ('x', float(descriptor.rstrip('x')))))
+        except ValueError:
+            candidates.append((url, ('x', 1.0)))
+    return candidates
+
+
+def media_matches(media, viewport_width):
+    """Evaluate a (min-width)/(max-width) media query in px; anything else matches."""
+    for kind, value in MEDIA_WIDTH_PATTERN.findall(media or ''):
+        width = float(value)
+        if kind == 'max' and viewport_width > width:
+            return False
+        if kind == 'min' and viewport_width < width:
+            return False
+    return True
+
+
+def slot_width(sizes, viewport_width):
+    """CSS pixel width an image is laid out at, per its sizes attribute."""
+    for entry in (sizes or '').split(','):
+        entry = entry.strip()
+        media, _, length = entry.rpartition(')')
+        length = length.strip()
+        if media and not media_matches(media + ')', viewport_width):
+            continue
+        if length.endswith('px'):
+            return float(length[:-2])
+        if length.endswith('vw'):
+            return float(length[:-2]) * viewport_width / 100
+        break
+    return viewport_width
+
+
+def pick_candidate(candidates, needed_width, dpr):
+    """The candidate a browser fetches: the smallest that covers the slot, else the largest."""
+    widths = sorted((d[1], url) for url, d in candidates if d[0] == 'w')
+    if widths:
+        return next((url for w, url in widths if w >= needed_width), widths[-1][1])
+    densities = sorted((d[1], url) for url, d in candidates)
+    return next((url for x, url in densities if x >= dpr), densities[-1][1])
+
+
+def served_image(img, viewport_width, dpr):
+    """URL of the file a browser at this viewport downloads for an <img>."""
+    for source in img['sources']:
+        if source['srcset'] and media_matches(source['media'], viewport_width):
+            candidates = parse_srcset(source['srcset'])
+            needed = slot_width(source['sizes'] or img['sizes'], viewport_width) * dpr
+            return pick_candidate(candidates, needed, dpr)
+    candidates = parse_srcset(img['srcset'])
+    if not any(d[0] == 'w' for _, d in candidates) and img['src']:
+        candidates.append((img['src'], ('x', 1.0)))
+    if not candidates:
+        return None
+    return pick_candidate(candidates, slot_width(img['sizes'], viewport_width) * dpr, dpr)
+
+
+def image_candidates(img):
+    """Every URL an <img> (and its <picture> sources) can serve."""
+    urls = [url for url, _ in parse_srcset(img['srcset'])]
+    for source in img['sources']:
+        urls.extend(url for url, _ in parse_srcset(source['srcset']))
+    return urls
+
+
+def image_path(url):
+    """'/images/a%20b.webp?v=2' -> 'images/a b.webp': the image_index key a site URL points at."""
+    return unquote(urlparse(url).path).lstrip('/')
+
+
+def variant_base(rel_path):
+    """'images/a/responsive/photo-400w.webp' -> 'images/a/photo': the name all variants share."""
+    stem = rel_path.rsplit('.', 1)[0].replace('/responsive/', '/')
+    return WIDTH_SUFFIX_PATTERN.sub('', stem)
+
+
+def audit_responsive_images(site=None):
+    """Check srcset/<picture> variants, AVIF/WebP/400w siblings and page image weight."""
+    site = site or get_site()
     issues = []
     warnings = []
+    image_index = site.image_index
+
+    # Every variant on disk, grouped by shared name: {base: {'avif', 'webp', '400w', ...}}
+    variants = defaultdict(set)
+    for rel_path in image_index:
+        ext = rel_path.rsplit('.', 1)[-1].lower()
+        variants[variant_base(rel_path)].add(ext)
+        if rel_path.rsplit('.', 1)[0].endswith(f'-{MOBILE_VARIANT_WIDTH}w'):
+            variants[variant_base(rel_path)].add(f'{MOBILE_VARIANT_WIDTH}w')
+
+    missing_siblings = {}
+    weights = []
+    for page in site.pages:
+        page_path = page.rel_path
+        served = {name: set() for name in VIEWPORTS}
+        # Galleries repeat an <img> for the lightbox; report each one once per page
+        checked = set()
+
+        for img in page.images:
+            src = img['src']
+            if not src.startswith('/'):
+                continue
+            candidates = image_candidates(img)
+
+            # Every srcset/<source> variant must exist (a broken src is audit_images' job)
+            for url in candidates:
+                if url in checked:
+                    continue
+                checked.add(url)
+                if url.startswith('/') and image_path(url) not in image_index:
+                    issues.append(error('responsive/missing-variant',
+                                        f"Missing srcset variant: {url} on {page_path}", page_path, url))
+
+            for name, (viewport_width, dpr) in VIEWPORTS.items():
+                url = served_image(img, viewport_width, dpr)
+                if url and url.startswith('/'):
+                    served[name].add(image_path(url))
+
+            rel_src = image_path(src)
+            meta = image_index.get(rel_src)
+            ext = rel_src.rsplit('.', 1)[-1].lower()
+            if not meta or ext not in RESPONSIVE_EXTENSIONS or (src, 'siblings') in checked:
+                continue
+            checked.add((src, 'siblings'))
+
+            # Which lighter siblings exist on disk, and does this page serve them?
+            base = variant_base(rel_src)
+            on_disk = variants[base]
+            candidate_paths = [image_path(url) for url in candidates]
+            offered = {path.rsplit('.', 1)[-1].lower() for path in candidate_paths}
+            offered_mobile = any(variant_base(path) == base and
+                                 path.rsplit('.', 1)[0].endswith(f'-{MOBILE_VARIANT_WIDTH}w')
+                                 for path in candidate_paths)
+            wants_mobile = (meta['width'] or 0) > MOBILE_VARIANT_WIDTH * 1.5
+
+            wanted = ['avif']
+            if ext in ('jpg', 'jpeg', 'png'):
+                wanted.append('webp')
+            if wants_mobile:
+                wanted.append(f'{MOBILE_VARIANT_WIDTH}w')
+            for variant in wanted:
+                if variant not in on_disk:
+                    missing_siblings.setdefault((base, variant), rel_src)
+                elif variant == f'{MOBILE_VARIANT_WIDTH}w':
+                    if not offered_mobile:
+                        warnings.append(warning('responsive/400w-not-served',
+                                                f"{variant} variant exists but isn't in srcset: {src} on {page_path}",
+                                                page_path, src))
+                elif variant not in offered:
+                    warnings.append(warning(f'responsive/{variant}-not-served',
+                                            f"{variant.upper()} sibling exists but isn't served: {src} on {page_path}",
+                                            page_path, src))
+
+        # Page weight: each distinct file the viewport would download
+        weight = {name: sum(image_index[url]['bytes'] for url in urls if url in image_index) / 1024
+                  for name, urls in served.items()}
+        weights.append((page_path, weight))
+        for name, budget_kb in MAX_PAGE_IMAGE_KB.items():
+            if weight[name] > budget_kb:
+                warnings.append(warning(f'responsive/{name}-weight',
+                                        f"Page images too heavy on {name} ({weight[name]:.0f}KB, "
+                                        f"budget {budget_kb}KB): {page_path}", page_path))
+
+    for (base, variant), rel_src in sorted(missing_siblings.items()):
+        warnings.append(warning(f'responsive/no-{variant}',
+                                f"No {variant.upper() if variant[0].isalpha() else variant} variant: {rel_src}",
+                                rel_src))
+
+    summary = []
+    if weights:
+        for name in VIEWPORTS:
+            per_page = sorted(w[name] for _, w in weights)
+            heaviest_path, heaviest = max(weights, key=lambda item: item[1][name])
+            summary.append(f"Page image weight on {name}: median {per_page[len(per_page) // 2]:.0f}KB, "
+                           f"heaviest {heaviest[name]:.0f}KB ({heaviest_path})")
 
-    html_files = get_all_html_files()
+    all_issues = issues + warnings
+    if not all_issues:
+        return True, [f"All responsive images pass audit ({len(site.pages)} pages checked)"] + summary
+    return len(issues) == 0, all_issues + summary
 
-    for html_file in html_files:
-        parser = parse_html_file(html_file)
-        if not parser:
-            continue
 
-        page_path = html_file.relative_to(PROJECT_DIR)
-
-        # Title checks
-        if not parser.title:
-            issues.append(f"Missing title: {page_path}")
-        elif len(parser.title) > MAX_TITLE_LENGTH:
-            warnings.append(f"Title too long ({len(parser.title)} chars): {page_path}")
-
-        # Description checks
-        if not parser.description:
-            issues.append(f"Missing meta description: {page_path}")
-        elif len(parser.description) < MIN_DESCRIPTION_LENGTH:
-            warnings.append(f"Description too short ({len(parser.description)} chars): {page_path}")
-        elif len(parser.description) > MAX_DESCRIPTION_LENGTH:
-            warnings.append(f"Description too long ({len(parser.description)} chars): {page_path}")
-
-        # H1 checks
-        if len(parser.h1s) == 0:
-            issues.append(f"Missing H1: {page_path}")
-        elif len(parser.h1s) > 1:
-            warnings.append(f"Multiple H1s ({len(parser.h1s)}): {page_path}")
-
-        # Canonical check
-        if not parser.canonical:
-            warnings.append(f"Missing canonical: {page_path}")
-
-        # Open Graph checks
-        required_og = ['og:title', 'og:description', 'og:image']
-        for og in required_og:
-            if og not in parser.og_tags:
-                warnings.append(f"Missing {og}: {page_path}")
+def check_page_meta(page):
+    """Per-page title, description, H1, canonical and Open Graph checks."""
+    issues = []
+    warnings = []
+    if not page.parsed:
+        return issues, warnings
+
+    page_path = page.rel_path
+
+    # Title checks
+    if not page.title:
+        issues.append(error('meta/missing-title', f"Missing title: {page_path}", page_path))
+    elif len(page.title) > MAX_TITLE_LENGTH:
+        warnings.append(warning('meta/title-too-long', f"Title too long ({len(page.title)} chars): {page_path}", page_path))
+
+    # Description checks
+    if not page.description:
+        issues.append(error('meta/missing-description', f"Missing meta description: {page_path}", page_path))
+    elif len(page.description) < MIN_DESCRIPTION_LENGTH:
+        warnings.append(warning('meta/description-too-short',
+                                f"Description too short ({len(page.description)} chars): {page_path}", page_path))
+    elif len(page.description) > MAX_DESCRIPTION_LENGTH:
+        warnings.append(warning('meta/description-too-long',
+                                f"Description too long ({len(page.description)} chars): {page_path}", page_path))
+
+    # H1 checks
+    if len(page.h1s) == 0:
+        issues.append(error('meta/missing-h1', f"Missing H1: {page_path}", page_path))
+    elif len(page.h1s) > 1:
+        warnings.append(warning('meta/multiple-h1', f"Multiple H1s ({len(page.h1s)}): {page_path}", page_path))
+
+    # Canonical check
+    if not page.canonical:
+        warnings.append(warning('meta/missing-canonical', f"Missing canonical: {page_path}", page_path))
+
+    # Open Graph checks
+    required_og = ['og:title', 'og:description', 'og:image']
+    for og in required_og:
+        if og not in page.og_tags:
+            warnings.append(warning('meta/missing-og', f"Missing {og}: {page_path}", page_path, og))
+
+    return issues, warnings
+
+
+def audit_meta(site=None):
+    """Audit meta tags and SEO elements."""
+    site = site or get_site()
+    issues, warnings = site.collect('meta')
 
     all_issues = issues + warnings
     if not all_issues:
-        return True, [f"All meta tags pass audit ({len(html_files)} pages checked)"]
+        return True, [f"All meta tags pass audit ({len(site.html_files)} pages checked)"]
     return len(issues) == 0, all_issues
 
 
-def audit_schema():
-    """Audit JSON-LD schema markup."""
+def check_page_schema(page):
+    """Per-page JSON-LD checks."""
     issues = []
     warnings = []
+    if not page.parsed:
+        return issues, warnings
 
-    html_files = get_all_html_files()
+    page_path = page.rel_path
 
-    for html_file in html_files:
-        parser = parse_html_file(html_file)
-        if not parser:
-            continue
+    if not page.schemas:
+        issues.append(error('schema/missing', f"Missing schema markup: {page_path}", page_path))
+        return issues, warnings
 
-        page_path = html_file.relative_to(PROJECT_DIR)
+    has_local_business = False
+    has_faq = False
 
-        if not parser.schemas:
-            issues.append(f"Missing schema markup: {page_path}")
-            continue
+    for schema in page.schemas:
+        schema_type = schema.get('@type', '')
 
-        has_local_business = False
-        has_faq = False
+        # Flatten array types
+        if isinstance(schema_type, list):
+            schema_types = schema_type
+        else:
+            schema_types = [schema_type]
 
-        for schema in parser.schemas:
-            schema_type = schema.get('@type', '')
+        for st in schema_types:
+            if st in ['LocalBusiness', 'EntertainmentBusiness', 'DJService']:
+                has_local_business = True
 
-            # Flatten array types
-            if isinstance(schema_type, list):
-                schema_types = schema_type
-            else:
-                schema_types = [schema_type]
+                # Validate required fields
+                required_fields = ['name', 'telephone', 'address']
+                for field in required_fields:
+                    if field not in schema:
+                        warnings.append(warning('schema/missing-field', f"Schema missing {field}: {page_path}",
+                                                page_path, field))
 
-            for st in schema_types:
-                if st in ['LocalBusiness', 'EntertainmentBusiness', 'DJService']:
-                    has_local_business = True
+                # Check for aggregateRating
+                if 'aggregateRating' not in schema:
+                    warnings.append(warning('schema/missing-rating', f"Schema missing aggregateRating: {page_path}",
+                                            page_path))
 
-                    # Validate required fields
-                    required_fields = ['name', 'telephone', 'address']
-                    for field in required_fields:
-                        if field not in schema:
-                            warnings.append(f"Schema missing {field}: {page_path}")
+            if st == 'FAQPage':
+                has_faq = True
 
-                    # Check for aggregateRating
-                    if 'aggregateRating' not in schema:
-                        warnings.append(f"Schema missing aggregateRating: {page_path}")
+                # Check FAQ has questions
+                main_entity = schema.get('mainEntity', [])
+                if not main_entity:
+                    warnings.append(warning('schema/empty-faq', f"FAQPage has no questions: {page_path}", page_path))
 
-                if st == 'FAQPage':
-                    has_faq = True
+    # Check venue pages have LocalBusiness schema
+    if 'wedding-dj' in str(page_path) and not has_local_business:
+        issues.append(error('schema/venue-not-business', f"Venue page missing LocalBusiness schema: {page_path}",
+                            page_path))
 
-                    # Check FAQ has questions
-                    main_entity = schema.get('mainEntity', [])
-                    if not main_entity:
-                        warnings.append(f"FAQPage has no questions: {page_path}")
+    return issues, warnings
 
-        # Check venue pages have LocalBusiness schema
-        if 'wedding-dj' in str(page_path) and not has_local_business:
-            issues.append(f"Venue page missing LocalBusiness schema: {page_path}")
+
+def audit_schema(site=None):
+    """Audit JSON-LD schema markup."""
+    site = site or get_site()
+    issues, warnings = site.collect('schema')
 
     all_issues = issues + warnings
     if not all_issues:
-        return True, [f"All schema markup passes audit ({len(html_files)} pages checked)"]
+        return True, [f"All schema markup passes audit ({len(site.html_files)} pages checked)"]
     return len(issues) == 0, all_issues
 
 
-def audit_links():
-    """Audit internal and external links."""
-    issues = []
-    warnings = []
+def page_url_path(rel_path):
+    """Site path for a page file, e.g. 'about/index.html' -> '/about/'."""
+    url_path = ('/' + rel_path.as_posix()).replace('/index.html', '/').replace('.html', '/')
+    if url_path.endswith('//'):
+        url_path = '/'
+    return url_path
 
-    html_files = get_all_html_files()
-    all_pages = set()
-    incoming_links = defaultdict(list)
 
-    # Build list of all pages
-    for html_file in html_files:
-        rel_path = '/' + str(html_file.relative_to(PROJECT_DIR)).replace('/index.html', '/').replace('.html', '/')
-        if rel_path.endswith('//'):
-            rel_path = '/'
-        all_pages.add(rel_path)
+def normalize_internal_link(link):
+    """Normalize an internal href to a site path, or None for anchor links."""
+    if link.startswith(SITE_DOMAIN):
+        link = link.replace(SITE_DOMAIN, '')
 
-    # Check all links
-    for html_file in html_files:
-        parser = parse_html_file(html_file)
-        if not parser:
-            continue
+    if not link:
+        link = '/'
 
-        page_path = html_file.relative_to(PROJECT_DIR)
-        source_path = '/' + str(page_path).replace('/index.html', '/').replace('.html', '/')
+    # Skip anchor links (including homepage anchors like /#pricing/)
+    if '#' in link:
+        return None
 
-        for link in parser.internal_links:
-            # Normalize link
-            if link.startswith(SITE_DOMAIN):
-                link = link.replace(SITE_DOMAIN, '')
+    # Ensure trailing slash for directories
+    if not link.endswith('/') and '.' not in link.split('/')[-1]:
+        link = link + '/'
 
-            if not link:
-                link = '/'
+    return link
 
-            # Skip anchor links (including homepage anchors like /#pricing/)
-            if '#' in link:
-                continue
 
-            # Ensure trailing slash for directories
-            if not link.endswith('/') and '.' not in link.split('/')[-1]:
-                link = link + '/'
+def audit_links(site=None):
+    """Audit internal and external links."""
+    site = site or get_site()
+    issues = []
+    warnings = []
 
-            # Track incoming links
-            incoming_links[link].append(source_path)
+    html_files = site.html_files
+    graph = site.link_graph
 
-            # Check if link target exists
-            target_path = url_to_file_path(SITE_DOMAIN + link)
-            if not target_path or not target_path.exists():
-                issues.append(f"Broken internal link: {link} on {page_path}")
+    # Check all links resolve to a page (directly or through _redirects)
+    for page_path, link in graph.broken:
+        issues.append(error('links/broken', f"Broken internal link: {link} on {page_path}", page_path, link))
+    for page_path, link, target in graph.redirected:
+        warnings.append(warning('links/redirected', f"Redirected internal link: {link} -> {target} on {page_path}",
+                                page_path, link))
 
     # Find orphaned pages (no internal links pointing to them)
-    sitemap_urls = parse_sitemap()
-    sitemap_paths = set()
-    for url_data in sitemap_urls:
-        path = url_data['url'].replace(SITE_DOMAIN, '')
-        if not path:
-            path = '/'
-        if not path.endswith('/'):
-            path += '/'
-        sitemap_paths.add(path)
-
-    for path in sitemap_paths:
-        if path not in incoming_links and path != '/':
-            warnings.append(f"No internal links to: {path}")
+    for path in get_sitemap_paths():
+        if path not in graph.inbound and path != '/':
+            warnings.append(warning('links/no-inbound', f"No internal links to: {path}", path))
 
     all_issues = issues + warnings
     if not all_issues:
@@ -638,58 +2032,240 @@ def audit_links():
     return len(issues) == 0, all_issues
 
 
-def audit_content_quality():
-    """Check content quality indicators."""
+def check_page_content(page):
+    """Per-page placeholder, TODO and word count checks."""
     issues = []
     warnings = []
 
-    html_files = get_all_html_files()
+    content = page.content
+    page_path = page.rel_path
 
-    for html_file in html_files:
-        # Get file content
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+    # Check for placeholder text (in text content only, not HTML attributes)
+    text_only = re.sub(r'<[^>]+>', ' ', content)  # Strip HTML tags
+    placeholder_patterns = [
+        r'lorem ipsum',
+        r'\[your.*?\]',
+        r'\[insert.*?\]',
+    ]
+    # These patterns should only match in HTML comments or visible text
+    comment_patterns = [
+        r'<!--.*?(TODO|FIXME).*?-->',
+    ]
 
-        page_path = html_file.relative_to(PROJECT_DIR)
-
-        # Check for placeholder text (in text content only, not HTML attributes)
-        text_only = re.sub(r'<[^>]+>', ' ', content)  # Strip HTML tags
-        placeholder_patterns = [
-            r'lorem ipsum',
-            r'\[your.*?\]',
-            r'\[insert.*?\]',
-        ]
-        # These patterns should only match in HTML comments or visible text
-        comment_patterns = [
-            r'<!--.*?(TODO|FIXME).*?-->',
-        ]
-
-        for pattern in placeholder_patterns:
-            if re.search(pattern, text_only, re.IGNORECASE):
-                issues.append(f"Possible placeholder content: {page_path}")
-                break
+    for pattern in placeholder_patterns:
+        if re.search(pattern, text_only, re.IGNORECASE):
+            issues.append(error('content/placeholder', f"Possible placeholder content: {page_path}", page_path))
+            break
 
-        for pattern in comment_patterns:
-            if re.search(pattern, content, re.IGNORECASE | re.DOTALL):
-                issues.append(f"TODO/FIXME in comments: {page_path}")
-                break
+    for pattern in comment_patterns:
+        if re.search(pattern, content, re.IGNORECASE | re.DOTALL):
+            issues.append(error('content/todo-comment', f"TODO/FIXME in comments: {page_path}", page_path))
+            break
+
+    # Check minimum content length (excluding HTML)
+    text_content = re.sub(r'<[^>]+>', '', content)
+    text_content = re.sub(r'\s+', ' ', text_content).strip()
 
-        # Check minimum content length (excluding HTML)
-        text_content = re.sub(r'<[^>]+>', '', content)
-        text_content = re.sub(r'\s+', ' ', text_content).strip()
+    word_count = len(text_content.split())
+    if word_count < 300 and 'index.html' not in str(page_path) or 'wedding-dj' in str(page_path):
+        # Service pages should have substantial content
+        if word_count < 500:
+            warnings.append(warning('content/low-word-count', f"Low word count ({word_count}): {page_path}", page_path))
 
-        word_count = len(text_content.split())
-        if word_count < 300 and 'index.html' not in str(page_path) or 'wedding-dj' in str(page_path):
-            # Service pages should have substantial content
-            if word_count < 500:
-                warnings.append(f"Low word count ({word_count}): {page_path}")
+    return issues, warnings
+
+
+def audit_content_quality(site=None):
+    """Check content quality indicators."""
+    site = site or get_site()
+    issues, warnings = site.collect('content')
 
     all_issues = issues + warnings
     if not all_issues:
-        return True, [f"Content quality passes ({len(html_files)} pages checked)"]
+        return True, [f"Content quality passes ({len(site.html_files)} pages checked)"]
     return len(issues) == 0, all_issues
 
 
+# Audits that work on the parsed Site
+SITE_AUDITS = ('meta', 'schema', 'images', 'responsive', 'links', 'content')
+
+# Per-page checks, keyed by audit group. These run wherever the page was
+# parsed (in a pool worker when --jobs > 1) and are merged in path order.
+PAGE_CHECKS = {
+    'meta': check_page_meta,
+    'schema': check_page_schema,
+    'images': check_page_images,
+    'content': check_page_content,
+}
+
+
+# ============================================================================
+# REPORT FORMATS
+# ============================================================================
+
+OUTPUT_FORMATS = ['text', 'json', 'junit', 'sarif']
+
+
+def result_issues(messages):
+    """The Issue objects in an audit's messages (pass summaries are plain strings)."""
+    return [m for m in messages if isinstance(m, Issue)]
+
+
+def report_json(results):
+    """Structured report: every group with its issues and a summary."""
+    groups = []
+    for name, passed, messages in results:
+        issues = result_issues(messages)
+        groups.append({
+            'name': name,
+            'passed': passed,
+            'issues': [issue.to_dict() for issue in issues],
+        })
+    all_issues = [i for g in groups for i in g['issues']]
+    return json.dumps({
+        'site': SITE_DOMAIN,
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'summary': {
+            'groups': len(groups),
+            'groups_passed': sum(1 for g in groups if g['passed']),
+            'errors': sum(1 for i in all_issues if i['severity'] == 'error'),
+            'warnings': sum(1 for i in all_issues if i['severity'] == 'warning'),
+        },
+        'groups': groups,
+    }, indent=2)
+
+
+def report_junit(results):
+    """JUnit XML: one testsuite per group, one failing testcase per error.
+
+    Warnings become passing testcases with the message in system-out, so
+    CI only gates on errors.
+    """
+    suites = ET.Element('testsuites', name=f'{SITE_NAME} Site Audit')
+    for name, passed, messages in results:
+        issues = result_issues(messages)
+        errors = [i for i in issues if i.severity == 'error']
+        suite = ET.SubElement(suites, 'testsuite', name=name,
+                              tests=str(max(1, len(issues))), failures=str(len(errors)))
+        if not issues:
+            ET.SubElement(suite, 'testcase', classname=name, name='all checks')
+        for issue in issues:
+            case = ET.SubElement(suite, 'testcase', classname=issue.rule,
+                                 name=f"{issue.page or ''} [{issue.id}]")
+            if issue.severity == 'error':
+                failure = ET.SubElement(case, 'failure', type=issue.rule, message=issue.message)
+                failure.text = issue.message
+            else:
+                ET.SubElement(case, 'system-out').text = f"warning: {issue.message}"
+    ET.indent(suites)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(suites, encoding='unicode')
+
+
+def report_sarif(results):
+    """SARIF 2.1.0 log, with the stable issue id as a partial fingerprint."""
+    rules = {}
+    sarif_results = []
+    for name, passed, messages in results:
+        for issue in result_issues(messages):
+            rules.setdefault(issue.rule, {
+                'id': issue.rule,
+                'properties': {'group': name},
+            })
+            result = {
+                'ruleId': issue.rule,
+                'level': issue.severity,
+                'message': {'text': issue.message},
+                'partialFingerprints': {'issueId': issue.id},
+            }
+            if issue.page:
+                result['locations'] = [{
+                    'physicalLocation': {'artifactLocation': {'uri': issue.page.lstrip('/')}},
+                }]
+            sarif_results.append(result)
+
+    return json.dumps({
+        '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {'driver': {
+                'name': 'cos-site-audit',
+                'informationUri': SITE_DOMAIN,
+                'rules': [rules[r] for r in sorted(rules)],
+            }},
+            'results': sarif_results,
+        }],
+    }, indent=2)
+
+
+REPORT_WRITERS = {
+    'json': report_json,
+    'junit': report_junit,
+    'sarif': report_sarif,
+}
+
+
+def write_report(results, output_format, output_path=None):
+    """Render results in a machine-readable format to output_path or stdout."""
+    report = REPORT_WRITERS[output_format](results)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+# ============================================================================
+# BASELINE
+# ============================================================================
+
+def save_baseline(results, path):
+    """Snapshot the current issues as the known backlog (same shape as --format json)."""
+    write_report(results, 'json', path)
+
+
+def load_baseline(path):
+    """Known issue ids per audit group from a --baseline or --format json report."""
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return {
+        group['name']: {issue['id']: Issue.from_dict(issue) for issue in group['issues']}
+        for group in report.get('groups', [])
+    }
+
+
+def diff_against_baseline(results, baseline):
+    """Split results into issues new since the baseline and baseline issues now gone.
+
+    Returns (new_results, resolved): new_results has the same (name, passed,
+    messages) shape as results, holding only new issues, and a group passes
+    when it has nothing new. resolved is a list of (name, issues).
+    """
+    new_results = []
+    resolved = []
+    for name, passed, messages in results:
+        known = baseline.get(name, {})
+        current = {issue.id for issue in result_issues(messages)}
+        new = [issue for issue in result_issues(messages) if issue.id not in known]
+        new_results.append((name, not new, new))
+        gone = [issue for issue_id, issue in known.items() if issue_id not in current]
+        if gone:
+            resolved.append((name, gone))
+    return new_results, resolved
+
+
+def print_diff(new_results, resolved):
+    """Print new issues per group, then what the baseline had that is now fixed."""
+    for name, passed, new in new_results:
+        print_section(name)
+        print_result(passed, new or ["No new issues"])
+
+    if resolved:
+        print_section("Resolved since baseline")
+        for name, issues in resolved:
+            for issue in issues:
+                print(f"  {colorize('[FIXED]', Colors.GREEN)} {issue}")
+
+
 # ============================================================================
 # MAIN AUDIT RUNNER
 # ============================================================================
@@ -701,63 +2277,137 @@ def print_section(title):
 
 
 def print_result(passed, messages):
-    """Print audit results with color coding."""
+    """Print audit results, colored by each issue's severity."""
     for msg in messages:
-        if passed:
-            print(f"  {colorize('[PASS]', Colors.GREEN)} {msg}")
-        elif 'warning' in msg.lower() or any(x in msg for x in ['too short', 'too long', 'Consider', 'Missing og:', 'Missing canonical']):
+        severity = msg.severity if isinstance(msg, Issue) else 'pass'
+        if severity == 'error':
+            print(f"  {colorize('[FAIL]', Colors.RED)} {msg}")
+        elif severity == 'warning':
             print(f"  {colorize('[WARN]', Colors.YELLOW)} {msg}")
         else:
-            print(f"  {colorize('[FAIL]', Colors.RED)} {msg}")
+            print(f"  {colorize('[PASS]', Colors.GREEN)} {msg}")
 
 
-def run_audit_group(name, audit_func):
-    """Run an audit and print results."""
-    print_section(name)
+def run_audit_group(name, audit_func, show=True):
+    """Run an audit, printing results if show. Returns (passed, messages, seconds)."""
+    if show:
+        print_section(name)
+    start = time.perf_counter()
     passed, messages = audit_func()
-    print_result(passed, messages)
-    return passed, len([m for m in messages if not any(x in m for x in ['pass', 'PASS', 'valid', 'checked'])])
+    elapsed = time.perf_counter() - start
+    if show:
+        print_result(passed, messages)
+    return passed, messages, elapsed
 
 
-def run_all_audits():
-    """Run all audit checks."""
-    print(f"\n{'=' * 60}")
-    print(colorize(f"  {SITE_NAME} Comprehensive Site Audit", Colors.BOLD + Colors.HEADER))
-    print(f"  {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'=' * 60}")
+def print_timings(site, check_times):
+    """Print where the run spent its time: tree walk, parsing, then each check."""
+    print(f"\n  Timing:")
+    print(f"    Walk:  {site.walk_time:6.2f}s ({len(site.html_files)} pages, {len(site.image_files)} images)")
+    if site.cache_hits:
+        detail = f"{len(site.pages) - site.cache_hits} parsed, {site.cache_hits} cached"
+    else:
+        detail = "1 parse per page"
+    if site.jobs > 1:
+        detail = f"parse + page checks, {site.jobs} jobs, {detail}"
+    print(f"    Parse: {site.parse_time:6.2f}s ({detail})")
+    for name, elapsed in check_times:
+        print(f"    {name + ':':<18} {elapsed:6.2f}s")
+    total = site.walk_time + site.parse_time + sum(t for _, t in check_times)
+    print(f"    {'Total:':<18} {total:6.2f}s")
+
+
+def run_all_audits(jobs=1, use_cache=True, output_format='text', output_path=None,
+                   baseline_path=None, diff=False):
+    """Run all audit checks.
+
+    With diff, only issues that aren't in the baseline at baseline_path are
+    reported (plus those it lists that are now fixed). Without diff, a
+    baseline_path is (re)written with the issues found.
+    """
+    baseline = None
+    if diff:
+        try:
+            baseline = load_baseline(baseline_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read baseline {baseline_path}: {e}")
+            print(f"Create it with: python3 audit.py --baseline {baseline_path}")
+            return False
+
+    show = output_format == 'text'
+    if show:
+        print(f"\n{'=' * 60}")
+        print(colorize(f"  {SITE_NAME} Comprehensive Site Audit", Colors.BOLD + Colors.HEADER))
+        print(f"  {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"{'=' * 60}")
+
+    # Walk and parse the site once; every page audit below shares it
+    site = load_site(jobs, groups=PAGE_CHECKS, use_cache=use_cache)
 
     audits = [
         ("Sitemap & Robots", lambda: (audit_sitemap()[0] and audit_robots()[0],
                                        audit_sitemap()[1] + audit_robots()[1])),
         ("Indexing Status", audit_indexing),
-        ("Meta Tags & SEO", audit_meta),
-        ("Schema Markup", audit_schema),
-        ("Images", audit_images),
-        ("Internal Links", audit_links),
-        ("Content Quality", audit_content_quality),
+        ("Meta Tags & SEO", lambda: audit_meta(site)),
+        ("Schema Markup", lambda: audit_schema(site)),
+        ("Images", lambda: audit_images(site)),
+        ("Responsive Images", lambda: audit_responsive_images(site)),
+        ("Internal Links", lambda: audit_links(site)),
+        ("Content Quality", lambda: audit_content_quality(site)),
     ]
 
     total_passed = 0
     total_issues = 0
+    check_times = []
+    results = []
 
     for name, audit_func in audits:
-        passed, issue_count = run_audit_group(name, audit_func)
+        passed, messages, elapsed = run_audit_group(name, audit_func, show and not diff)
+        check_times.append((name, elapsed))
+        results.append((name, passed, messages))
+
+    if use_cache:
+        save_page_cache(site)
+
+    resolved = []
+    if diff:
+        results, resolved = diff_against_baseline(results, baseline)
+        if show:
+            print_diff(results, resolved)
+    elif baseline_path:
+        save_baseline(results, baseline_path)
+
+    for name, passed, messages in results:
         if passed:
             total_passed += 1
-        total_issues += issue_count
+        total_issues += len(result_issues(messages))
+
+    if not show:
+        write_report(results, output_format, output_path)
+        return total_issues == 0
 
     # Summary
     print(f"\n{'=' * 60}")
     print(colorize("  SUMMARY", Colors.BOLD))
     print(f"{'=' * 60}")
 
-    if total_issues == 0:
+    if diff:
+        fixed = sum(len(issues) for _, issues in resolved)
+        print(f"\n  Compared against baseline: {baseline_path}")
+        print(f"  New issues: {colorize(str(total_issues), Colors.RED if total_issues else Colors.GREEN)}")
+        print(f"  Resolved issues: {colorize(str(fixed), Colors.GREEN)}")
+    elif total_issues == 0:
         print(f"\n  {colorize('All audits passed!', Colors.GREEN + Colors.BOLD)}")
     else:
         passed_color = Colors.GREEN if total_passed == len(audits) else Colors.YELLOW
         print(f"\n  Audit groups passed: {colorize(f'{total_passed}/{len(audits)}', passed_color)}")
         print(f"  Total issues found: {colorize(str(total_issues), Colors.YELLOW if total_issues < 10 else Colors.RED)}")
 
+    if baseline_path and not diff:
+        print(f"  Baseline saved: {baseline_path}")
+
+    print_timings(site, check_times)
+
     print(f"\n  Run individual audits with:")
     print(f"    python3 audit.py images")
     print(f"    python3 audit.py schema")
@@ -792,9 +2442,39 @@ def run_quick_audits():
     return all_passed
 
 
+def parse_args(argv=None):
+    """Parse the audit name and options."""
+    parser = argparse.ArgumentParser(description=f'{SITE_NAME} site audit')
+    parser.add_argument('command', nargs='?',
+                        help='Audit to run (default: all)')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for page parsing and checks (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore and do not update the incremental cache in .audit-cache/')
+    parser.add_argument('--format', '-f', choices=OUTPUT_FORMATS, default='text',
+                        help='Output format (default: colored text)')
+    parser.add_argument('--output', '-o',
+                        help='Write the json/junit/sarif report (or the graph/duplicates JSON report, '
+                             f'default: {GRAPH_REPORT_PATH.relative_to(PROJECT_DIR)} / '
+                             f'{DUPLICATES_REPORT_PATH.relative_to(PROJECT_DIR)}) to this file')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='Save the issues found to FILE as the known baseline (full audit only)')
+    parser.add_argument('--diff', action='store_true',
+                        help='Report only issues new since --baseline, and those now resolved')
+    args = parser.parse_args(argv)
+    if args.diff and not args.baseline:
+        parser.error('--diff needs --baseline FILE')
+    if args.baseline and args.command:
+        parser.error('--baseline/--diff compare the full audit; drop the audit name')
+    return args
+
+
 def main():
+    args = parse_args()
+
     audit_map = {
         'images': ('Images', audit_images),
+        'responsive': ('Responsive Images', audit_responsive_images),
         'schema': ('Schema Markup', audit_schema),
         'meta': ('Meta Tags & SEO', audit_meta),
         'links': ('Internal Links', audit_links),
@@ -804,25 +2484,51 @@ def main():
         'robots': ('Robots.txt', audit_robots),
     }
 
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    if args.command:
+        command = args.command.lower()
 
         if command == 'quick':
             success = run_quick_audits()
             sys.exit(0 if success else 1)
+        elif command == 'graph':
+            site = load_site(args.jobs, fields=AUDIT_FIELDS['graph'], use_cache=not args.no_cache)
+            success = run_graph_report(site, args.output)
+            if not args.no_cache:
+                save_page_cache(site)
+            sys.exit(0 if success else 1)
+        elif command == 'duplicates':
+            site = load_site(args.jobs, fields=AUDIT_FIELDS['duplicates'], use_cache=not args.no_cache)
+            success = run_duplicates_report(site, args.output)
+            if not args.no_cache:
+                save_page_cache(site)
+            sys.exit(0 if success else 1)
         elif command in audit_map:
             name, func = audit_map[command]
-            print_section(name)
-            passed, messages = func()
-            print_result(passed, messages)
-            print()
+            if args.format == 'text':
+                print_section(name)
+            if command in SITE_AUDITS:
+                groups = [command] if command in PAGE_CHECKS else []
+                site = load_site(args.jobs, groups=groups, fields=AUDIT_FIELDS[command],
+                                 use_cache=not args.no_cache)
+                passed, messages = func(site)
+                if not args.no_cache:
+                    save_page_cache(site)
+            else:
+                passed, messages = func()
+            if args.format == 'text':
+                print_result(passed, messages)
+                print()
+            else:
+                write_report([(name, passed, messages)], args.format, args.output)
             sys.exit(0 if passed else 1)
         else:
             print(f"Unknown audit: {command}")
-            print(f"Available: {', '.join(audit_map.keys())}, quick")
+            print(f"Available: {', '.join(audit_map.keys())}, quick, graph, duplicates")
             sys.exit(1)
     else:
-        success = run_all_audits()
+        success = run_all_audits(args.jobs, use_cache=not args.no_cache,
+                                 output_format=args.format, output_path=args.output,
+                                 baseline_path=args.baseline, diff=args.diff)
         sys.exit(0 if success else 1)
 
 
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Review Data Builder for COS Celebrations
+Builds the compact review files the site serves from the canonical list.
+
+data/reviews-all.json is the one hand-maintained review list. Everything
+else under data/ is generated from it:
+
+    data/reviews/table.json     every review once, keyed by id
+    data/reviews/index.json     display order, featured ids, tag -> ids, venue -> ids
+    data/reviews/tag-*.json     one shard per tag, only the fields a card shows
+    data/reviews/venue-*.json   one shard per venue
+    data/reviews.json           the featured shard (the carousel's default)
+
+Shards keep the carousel's {"cos": [...]} shape, so a page fetches only the
+reviews it shows instead of the old reviews-tags.json / reviews-venues.json,
+which repeated full review objects under every tag and venue.
+
+Usage:
+    python3 build-reviews.py              # Build and print the size report
+    python3 build-reviews.py --dry-run    # Size report only, write nothing
+"""
+
+import sys
+import os
+import re
+import gzip
+import json
+import argparse
+from pathlib import Path
+
+# Fix Windows encoding issues
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PROJECT_DIR = Path(__file__).parent.parent
+DATA_DIR = PROJECT_DIR / 'data'
+CANONICAL_PATH = DATA_DIR / 'reviews-all.json'
+FEATURED_PATH = DATA_DIR / 'reviews.json'
+OUTPUT_DIR = DATA_DIR / 'reviews'
+
+BRAND = 'cos'
+INDEX_VERSION = 1
+FEATURED_COUNT = 12
+
+# Fields components/review-carousel.js renders; shards carry nothing else
+CARD_FIELDS = ['id', 'author', 'avatarUrl', 'rating', 'text', 'title', 'date', 'googleLink']
+
+# The denormalized files this build replaces, for the before/after report
+LEGACY_FILES = ['reviews-all.json', 'reviews.json', 'reviews-tags.json', 'reviews-venues.json']
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def slugify(name):
+    """'St. Augustine' -> 'st-augustine'. Matches shardSlug() in review-carousel.js."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def load_canonical(path=CANONICAL_PATH):
+    """The canonical review list, in display order."""
+    with open(path, 'r', encoding='utf-8') as f:
+        reviews = json.load(f)[BRAND]
+    ids = [review['id'] for review in reviews]
+    if len(set(ids)) != len(ids):
+        dupes = sorted({i for i in ids if ids.count(i) > 1})
+        raise ValueError(f"Duplicate review ids in {path.name}: {dupes}")
+    return reviews
+
+
+def group_ids(reviews, field):
+    """{value: [ids]} for a list field, values in first-seen order, ids in list order."""
+    groups = {}
+    for review in reviews:
+        for value in review.get(field) or []:
+            groups.setdefault(value, []).append(review['id'])
+    return groups
+
+
+def card(review):
+    """The subset of a review a carousel card needs."""
+    return {field: review[field] for field in CARD_FIELDS if field in review}
+
+
+def compact(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def build_outputs(reviews):
+    """{relative path: JSON text} for every generated file."""
+    by_id = {review['id']: review for review in reviews}
+    tags = group_ids(reviews, 'tags')
+    venues = group_ids(reviews, 'venues')
+    featured = [review['id'] for review in reviews[:FEATURED_COUNT]]
+
+    def shard(ids):
+        return compact({BRAND: [card(by_id[i]) for i in ids]})
+
+    shards = {}
+    for kind, groups in (('tag', tags), ('venue', venues)):
+        for name, ids in groups.items():
+            filename = f"{kind}-{slugify(name)}.json"
+            if filename in shards.values():
+                raise ValueError(f"Two {kind}s share the shard name {filename}")
+            shards[f"{kind}:{name}"] = filename
+
+    index = {
+        'version': INDEX_VERSION,
+        'total': len(reviews),
+        'order': [review['id'] for review in reviews],
+        'featured': featured,
+        'tags': tags,
+        'venues': venues,
+        'shards': shards,
+    }
+
+    outputs = {
+        'reviews/index.json': compact(index),
+        # JSON object keys are strings; index.order keeps the display order
+        'reviews/table.json': compact({str(review['id']): review for review in reviews}),
+        'reviews.json': shard(featured),
+    }
+    for key, filename in shards.items():
+        kind, name = key.split(':', 1)
+        outputs[f"reviews/{filename}"] = shard((tags if kind == 'tag' else venues)[name])
+    return outputs
+
+
+def legacy_outputs(reviews):
+    """The old denormalized files, rebuilt in memory so the report works after they are gone."""
+    def pretty(data):
+        return json.dumps(data, indent=2, ensure_ascii=False)
+
+    by_id = {review['id']: review for review in reviews}
+    return {
+        'reviews-all.json': pretty({BRAND: reviews, 'total': len(reviews)}),
+        'reviews.json': pretty({BRAND: reviews[:FEATURED_COUNT]}),
+        'reviews-tags.json': pretty({tag: [by_id[i] for i in ids]
+                                     for tag, ids in group_ids(reviews, 'tags').items()}),
+        'reviews-venues.json': pretty({venue: [by_id[i] for i in ids]
+                                       for venue, ids in group_ids(reviews, 'venues').items()}),
+    }
+
+
+def write_outputs(outputs):
+    """Write each file atomically and drop shards no longer produced."""
+    for rel_path, text in outputs.items():
+        path = DATA_DIR / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    removed = []
+    for path in sorted(OUTPUT_DIR.glob('*.json')):
+        if f"reviews/{path.name}" not in outputs:
+            path.unlink()
+            removed.append(path.name)
+    for name in LEGACY_FILES:
+        path = DATA_DIR / name
+        if path != CANONICAL_PATH and name not in outputs and path.exists():
+            path.unlink()
+            removed.append(name)
+    return removed
+
+# ============================================================================
+# SIZE REPORT
+# ============================================================================
+
+def sizes(text):
+    data = text.encode('utf-8')
+    return len(data), len(gzip.compress(data, mtime=0))
+
+
+def kb(n):
+    return f"{n / 1024:.1f} KB"
+
+
+def print_size_report(before, after):
+    """Totals on disk, then what a tag, venue and home page download."""
+    print("\n" + "=" * 60)
+    print("  REVIEW DATA SIZE REPORT")
+    print("=" * 60)
+
+    rows = [('Before (denormalized)', before), ('After (index + shards)', after)]
+    print(f"\n  {'':26} {'files':>6} {'raw':>11} {'gzip':>11}")
+    for label, files in rows:
+        raw = sum(sizes(text)[0] for text in files.values())
+        zipped = sum(sizes(text)[1] for text in files.values())
+        print(f"  {label:26} {len(files):>6} {kb(raw):>11} {kb(zipped):>11}")
+
+    shard_sizes = {kind: [sizes(text)[0] for path, text in after.items()
+                          if path.startswith(f"reviews/{kind}-")]
+                   for kind in ('tag', 'venue')}
+    pages = [
+        ('Tag page', before['reviews-tags.json'], shard_sizes['tag']),
+        ('Venue page', before['reviews-venues.json'], shard_sizes['venue']),
+    ]
+    print(f"\n  Per-page download (raw):")
+    for label, old_text, new_sizes in pages:
+        if not new_sizes:
+            continue
+        print(f"    {label:12} {kb(sizes(old_text)[0]):>11} -> "
+              f"{kb(sum(new_sizes) / len(new_sizes))} avg, {kb(max(new_sizes))} max")
+    print(f"    {'Home page':12} {kb(sizes(before['reviews.json'])[0]):>11} -> "
+          f"{kb(sizes(after['reviews.json'])[0])}")
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Build compact review data from data/reviews-all.json')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print the size report without writing anything')
+    args = parser.parse_args()
+
+    try:
+        reviews = load_canonical()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: cannot load {CANONICAL_PATH.name}: {e}")
+        sys.exit(1)
+
+    outputs = build_outputs(reviews)
+    before = legacy_outputs(reviews)
+    # The canonical list is hand-maintained and stays, so it counts on both sides
+    after = {CANONICAL_PATH.name: CANONICAL_PATH.read_text(encoding='utf-8'), **outputs}
+
+    print(f"{len(reviews)} reviews -> {len(outputs)} files in data/")
+    if not args.dry_run:
+        removed = write_outputs(outputs)
+        for name in removed:
+            print(f"  removed {name}")
+
+    print_size_report(before, after)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Git history helpers shared by audit.py and google-indexing.py.
+
+Looks up the last commit time of every tracked HTML file with a single
+`git log` pass, instead of spawning `git log -1 <file>` once per page.
+Results can be persisted to a JSON cache keyed by HEAD, so repeat runs
+on the same commit skip git entirely.
+"""
+
+import json
+import os
+import subprocess
+
+
+def git_head(project_dir):
+    """Return the current HEAD commit hash, or None outside a git repo."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            text=True,
+            cwd=project_dir
+        )
+    except Exception:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def read_commit_times(project_dir, pathspec='*.html'):
+    """Map each file matching pathspec to its last commit time (ISO 8601).
+
+    Paths are relative to project_dir, '/'-separated. Walks the log newest
+    first, so the first time a path appears is its most recent commit -
+    the same answer `git log -1 --format=%cI <file>` gives.
+    """
+    try:
+        result = subprocess.run(
+            ['git', '-c', 'core.quotePath=false', 'log',
+             '--format=%x00%cI', '--name-only', '--relative', '--', pathspec],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            cwd=project_dir
+        )
+    except Exception:
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    times = {}
+    commit_time = None
+    for line in result.stdout.splitlines():
+        if line.startswith('\x00'):
+            commit_time = line[1:]
+        elif line and commit_time:
+            times.setdefault(line, commit_time)
+    return times
+
+
+def load_commit_times(project_dir, cache_path=None, pathspec='*.html'):
+    """Last commit time per file, served from cache_path when HEAD is unchanged."""
+    head = git_head(project_dir)
+    if head is None:
+        return {}
+
+    if cache_path:
+        try:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if cached.get('head') == head and cached.get('pathspec') == pathspec:
+                return cached['times']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    times = read_commit_times(project_dir, pathspec)
+
+    if cache_path:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'head': head, 'pathspec': pathspec, 'times': times}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    return times
@@ -28,7 +28,8 @@ import json
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from pathlib import Path
-import subprocess
+
+from git_history import load_commit_times
 
 # Fix Windows encoding issues
 if sys.platform == 'win32':
@@ -40,6 +41,7 @@ PROJECT_DIR = SCRIPT_DIR.parent
 SITEMAP_PATH = PROJECT_DIR / 'sitemap.xml'
 STATUS_PATH = PROJECT_DIR / '_data' / 'indexingStatus.json'
 CREDENTIALS_PATH = SCRIPT_DIR / 'google-indexing-credentials.json'
+GIT_TIMES_CACHE_PATH = PROJECT_DIR / '.audit-cache' / 'git-times.json'
 
 # API Settings
 DAILY_QUOTA = 200
@@ -91,8 +93,13 @@ def parse_sitemap():
     return urls
 
 
+_commit_times = None
+
+
 def get_git_modified_time(url):
     """Get the last git commit time for a page's HTML file."""
+    global _commit_times
+
     # Convert URL to file path
     # https://coscelebrations.com/about/ -> about/index.html
     path = url.replace('https://coscelebrations.com', '').strip('/')
@@ -108,19 +115,10 @@ def get_git_modified_time(url):
         if not file_path.exists():
             return None
 
-    try:
-        result = subprocess.run(
-            ['git', 'log', '-1', '--format=%cI', str(file_path)],
-            capture_output=True,
-            text=True,
-            cwd=PROJECT_DIR
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout.strip()
-    except Exception:
-        pass
-
-    return None
+    # One `git log` pass for every page, cached per HEAD
+    if _commit_times is None:
+        _commit_times = load_commit_times(PROJECT_DIR, GIT_TIMES_CACHE_PATH)
+    return _commit_times.get(file_path.relative_to(PROJECT_DIR).as_posix())
 
 
 def needs_indexing(url_data, status):
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Image metadata helpers shared by the site scripts.
+
+Reads pixel dimensions straight from PNG, GIF, JPEG, WebP and AVIF file
+headers - a few hundred bytes per file - instead of decoding the image.
+load_image_index() keeps the results (plus byte size and a content hash)
+in a JSON cache keyed by each file's mtime and size, so repeat runs only
+look at images that changed.
+
+Perceptual hashes (for finding the same photo saved twice) do decode the
+image, so they need Pillow and are cached by content hash instead.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import struct
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# Bump when probe_image() learns something new, to re-probe every file
+IMAGE_INDEX_VERSION = 1
+
+# Bump when perceptual_hash() changes, to re-hash every image
+PERCEPTUAL_HASH_VERSION = 1
+# Grid the hash is taken on: 16x16 = 256 bits. An 8x8 hash can't tell
+# burst frames of one pose apart; at 16x16 they are 20+ bits from each
+# other while re-encodes and resizes of one photo stay within ~16.
+HASH_SIZE = 16
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+# JPEG start-of-frame markers carry the dimensions (C4, C8 and CC are not frames)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# EXIF orientations that rotate the image a quarter turn, swapping width and height
+EXIF_TRANSPOSED = {5, 6, 7, 8}
+
+
+# ============================================================================
+# HEADER PROBES
+# ============================================================================
+
+def _probe_png(f, head):
+    if head[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', head[16:24])
+    return width, height
+
+
+def _probe_gif(f, head):
+    width, height = struct.unpack('<HH', head[6:10])
+    return width, height
+
+
+def _probe_webp(f, head):
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and head[20:21] == b'\x2f':
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        width = int.from_bytes(head[24:27], 'little') + 1
+        height = int.from_bytes(head[27:30], 'little') + 1
+        return width, height
+    return None
+
+
+def _exif_orientation(data):
+    """Orientation tag (1-8) from an APP1 segment body, or None."""
+    if not data.startswith(b'Exif\x00\x00'):
+        return None
+    tiff = data[6:]
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return None
+    try:
+        ifd_offset = struct.unpack(endian + 'I', tiff[4:8])[0]
+        count = struct.unpack(endian + 'H', tiff[ifd_offset:ifd_offset + 2])[0]
+        for i in range(count):
+            entry = ifd_offset + 2 + i * 12
+            tag = struct.unpack(endian + 'H', tiff[entry:entry + 2])[0]
+            if tag == 0x0112:
+                return struct.unpack(endian + 'H', tiff[entry + 8:entry + 10])[0]
+    except struct.error:
+        return None
+    return None
+
+
+def _probe_jpeg(f, head):
+    """Walk JPEG segments up to the first frame header, seeking past the rest."""
+    f.seek(2)
+    orientation = None
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+        marker = f.read(1)
+        while marker == b'\xff':
+            marker = f.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        # Standalone markers have no length
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            continue
+        if marker in (0xD9, 0xDA):
+            return None
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>HH', frame[1:5])
+            if orientation in EXIF_TRANSPOSED:
+                width, height = height, width
+            return width, height
+        if marker == 0xE1 and orientation is None:
+            orientation = _exif_orientation(f.read(length - 2))
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_boxes(data):
+    """Yield (type, payload) for each ISO-BMFF box in data."""
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack('>I4s', data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = len(data) - offset
+        if size < header:
+            return
+        yield box_type, data[offset + header:offset + size]
+        offset += size
+
+
+def _probe_avif(f, head):
+    """Primary item size from the meta box's ispe property, honoring irot."""
+    f.seek(0)
+    meta = None
+    while meta is None:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        size, box_type = struct.unpack('>I4s', header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header_size = 16
+        if box_type == b'meta':
+            meta = f.read(size - header_size)
+        elif size == 0:
+            return None
+        else:
+            f.seek(size - header_size, os.SEEK_CUR)
+
+    primary = None
+    properties = []
+    associations = {}
+    # meta is a full box: skip version and flags
+    for box_type, payload in _read_boxes(meta[4:]):
+        if box_type == b'pitm':
+            version = payload[0]
+            primary = (struct.unpack('>I', payload[4:8]) if version else
+                       struct.unpack('>H', payload[4:6]))[0]
+        elif box_type == b'iprp':
+            for sub_type, sub in _read_boxes(payload):
+                if sub_type == b'ipco':
+                    properties = list(_read_boxes(sub))
+                elif sub_type == b'ipma':
+                    associations.update(_parse_ipma(sub))
+
+    def prop(index):
+        return properties[index - 1] if 0 < index <= len(properties) else (None, b'')
+
+    indexes = associations.get(primary) or range(1, len(properties) + 1)
+    size = rotation = None
+    for index in indexes:
+        box_type, payload = prop(index)
+        if box_type == b'ispe' and size is None:
+            size = struct.unpack('>II', payload[4:12])
+        elif box_type == b'irot':
+            rotation = payload[0] & 0x3
+    if size is None:
+        return None
+    width, height = size
+    if rotation in (1, 3):
+        width, height = height, width
+    return width, height
+
+
+def _parse_ipma(payload):
+    """Item id -> property indexes from an ipma full box."""
+    version, flags = payload[0], int.from_bytes(payload[1:4], 'big')
+    count = struct.unpack('>I', payload[4:8])[0]
+    offset = 8
+    associations = {}
+    for _ in range(count):
+        if version < 1:
+            item_id = struct.unpack('>H', payload[offset:offset + 2])[0]
+            offset += 2
+        else:
+            item_id = struct.unpack('>I', payload[offset:offset + 4])[0]
+            offset += 4
+        n = payload[offset]
+        offset += 1
+        indexes = []
+        for _ in range(n):
+            if flags & 1:
+                indexes.append(struct.unpack('>H', payload[offset:offset + 2])[0] & 0x7FFF)
+                offset += 2
+            else:
+                indexes.append(payload[offset] & 0x7F)
+                offset += 1
+        associations[item_id] = indexes
+    return associations
+
+
+def sniff_format(head):
+    """Image format from the first bytes of a file, or None."""
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head.startswith(b'\xff\xd8'):
+        return 'jpeg'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[4:8] == b'ftyp' and head[8:12] in (b'avif', b'avis', b'mif1', b'msf1'):
+        return 'avif'
+    if head.lstrip().startswith((b'<svg', b'<?xml')):
+        return 'svg'
+    return None
+
+
+PROBES = {
+    'png': _probe_png,
+    'gif': _probe_gif,
+    'jpeg': _probe_jpeg,
+    'webp': _probe_webp,
+    'avif': _probe_avif,
+}
+
+
+def probe_image(path):
+    """Format and pixel size of an image, read from its header only.
+
+    Returns {'format', 'width', 'height'}; width and height are None for
+    SVG, unknown formats and truncated or malformed headers.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        image_format = sniff_format(head)
+        size = None
+        probe = PROBES.get(image_format)
+        if probe:
+            try:
+                size = probe(f, head)
+            except (struct.error, IndexError, ValueError):
+                size = None
+    width, height = size if size else (None, None)
+    return {'format': image_format, 'width': width, 'height': height}
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+def file_sha256(path):
+    """Content hash, read in chunks (hashing is not decoding)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_entry(path, stat):
+    entry = probe_image(path)
+    entry.update({
+        'bytes': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_sha256(path),
+    })
+    return entry
+
+
+def load_image_index(project_dir, paths, cache_path=None):
+    """Metadata for each image in paths, keyed by '/'-separated path relative to project_dir.
+
+    Each entry has format, width, height, bytes, mtime_ns and sha256.
+    Entries in cache_path are reused while a file's mtime and size match.
+    """
+    cached = {}
+    if cache_path:
+        try:
+            with open(cache_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == IMAGE_INDEX_VERSION:
+                cached = data['images']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    index = {}
+    changed = False
+    for path in paths:
+        rel_path = os.path.relpath(path, project_dir).replace(os.sep, '/')
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entry = cached.get(rel_path)
+        if not entry or entry['mtime_ns'] != stat.st_mtime_ns or entry['bytes'] != stat.st_size:
+            entry = index_entry(path, stat)
+            changed = True
+        index[rel_path] = entry
+
+    if cache_path and (changed or len(index) != len(cached)):
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': IMAGE_INDEX_VERSION, 'images': index}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    return index
+
+
+# ============================================================================
+# PERCEPTUAL HASHES
+# ============================================================================
+
+def perceptual_hash(path):
+    """HASH_BITS-bit difference hash (dHash) of an image, as an int.
+
+    The image is shrunk to (HASH_SIZE + 1) x HASH_SIZE grey and each bit
+    records whether a pixel is brighter than its right neighbour, so
+    re-encodes, resizes and light edits of one photo land a few bits
+    apart. Needs Pillow.
+    """
+    from PIL import Image, ImageOps
+
+    width = HASH_SIZE + 1
+    with Image.open(path) as image:
+        # JPEGs decode at up to 1/8 scale; the thumbnail needs little
+        image.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+        image = ImageOps.exif_transpose(image).convert('L')
+        pixels = image.resize((width, HASH_SIZE), Image.Resampling.LANCZOS).tobytes()
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            bits = (bits << 1) | (pixels[row * width + col] > pixels[row * width + col + 1])
+    return bits
+
+
+def _hash_file(path):
+    try:
+        return perceptual_hash(path)
+    except (OSError, ValueError):
+        # Unreadable, or a format this Pillow can't decode
+        return None
+
+
+def load_perceptual_hashes(project_dir, index, cache_path=None, jobs=1):
+    """dHash of each raster image in a load_image_index() index: {rel_path: int}.
+
+    Hashes are cached by sha256, so renamed and copied files are not decoded
+    again; new images are hashed with jobs worker processes. Images Pillow
+    can't decode are left out (and retried next run).
+    """
+    cached = {}
+    if cache_path:
+        try:
+            with open(cache_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == PERCEPTUAL_HASH_VERSION:
+                cached = data['hashes']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    # One decode per distinct file content
+    missing = {}
+    for rel_path, entry in index.items():
+        if entry['format'] in PROBES and entry['sha256'] not in cached:
+            missing.setdefault(entry['sha256'], os.path.join(project_dir, rel_path))
+    if missing:
+        paths = list(missing.values())
+        if jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_hash_file, paths, chunksize=16))
+        else:
+            results = [_hash_file(path) for path in paths]
+        for digest, value in zip(missing, results):
+            if value is not None:
+                cached[digest] = f"{value:0{HASH_BITS // 4}x}"
+
+    hashes = {}
+    used = {}
+    for rel_path, entry in index.items():
+        value = cached.get(entry['sha256'])
+        if value is not None:
+            hashes[rel_path] = int(value, 16)
+            used[entry['sha256']] = value
+
+    if cache_path and (missing or len(used) != len(cached)):
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': PERCEPTUAL_HASH_VERSION, 'hashes': used}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    return hashes
+
+
+def hamming(a, b):
+    """Number of differing bits."""
+    return bin(a ^ b).count('1')
+
+
+class HammingIndex:
+    """Finds hashes within a Hamming radius without comparing every pair.
+
+    Multi-index hashing: each hash is split into 16-bit blocks, each with
+    its own lookup table. Two hashes within radius r must differ in at
+    most r // blocks bits in at least one block, so a query only visits
+    the table entries that close to its own blocks and checks those few
+    candidates in full.
+    """
+
+    BLOCK_BITS = 16
+
+    def __init__(self, radius, bits=HASH_BITS):
+        self.radius = radius
+        blocks = -(-bits // self.BLOCK_BITS)
+        block_mask = (1 << self.BLOCK_BITS) - 1
+        self.shifts = [(i * self.BLOCK_BITS, block_mask) for i in range(blocks)]
+        # Every way of flipping up to radius // blocks bits of one block
+        self.flips = [sum(1 << bit for bit in flipped)
+                      for k in range(radius // blocks + 1)
+                      for flipped in itertools.combinations(range(self.BLOCK_BITS), k)]
+        self.tables = [defaultdict(list) for _ in range(blocks)]
+        self.hashes = []
+
+    def add(self, value):
+        """Index a hash; returns its id (insertion order)."""
+        item_id = len(self.hashes)
+        self.hashes.append(value)
+        for table, (shift, mask) in zip(self.tables, self.shifts):
+            table[(value >> shift) & mask].append(item_id)
+        return item_id
+
+    def query(self, value):
+        """Ids of indexed hashes within the radius of value."""
+        seen = set()
+        found = []
+        for table, (shift, mask) in zip(self.tables, self.shifts):
+            block = (value >> shift) & mask
+            for flip in self.flips:
+                for item_id in table.get(block ^ flip, ()):
+                    if item_id in seen:
+                        continue
+                    seen.add(item_id)
+                    if hamming(self.hashes[item_id], value) <= self.radius:
+                        found.append(item_id)
+        return found
@@ -8,8 +8,11 @@ Features:
 - Face detection to avoid cutting off faces
 - Smart cropping to various aspect ratios
 - Generates responsive sizes (400px, 800px, 1200px)
-- Outputs optimized WebP format
+- Outputs optimized WebP, AVIF and/or JPEG
 - SEO-friendly filename generation
+- Site sweep: adds missing AVIF/WebP/400w siblings to images/ and videos/
+- Video posters: completes each clip's poster set in every format, from its
+  existing poster or a face-aware frame picked from the MP4
 
 Usage:
     python3 smart-photo.py <input_image> [options]
@@ -18,17 +21,40 @@ Usage:
 Examples:
     python3 smart-photo.py photo.jpg --output ./processed/
     python3 smart-photo.py photo.jpg --aspect 1:1 --output ./instagram/
+    python3 smart-photo.py photo.jpg --aspect square,4:5,16:9 --output ./social/
+    python3 smart-photo.py photo.jpg --formats avif,webp,jpg --html
     python3 smart-photo.py ./raw-photos/ --batch --output ./processed/
+    python3 smart-photo.py ./raw-photos/ --batch --jobs 8 --output ./processed/
+    python3 smart-photo.py . --sweep --dry-run
+    python3 smart-photo.py . --sweep --jobs 8 --report sweep-report.json
+    python3 smart-photo.py ./videos/ --posters
+    python3 smart-photo.py ./videos/promo.mp4 --posters --name promo.mp4=promo-poster
 """
 
+import io
 import os
+import re
 import sys
+import json
+import time
+import hashlib
 import argparse
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Tuple, List, Optional
 import cv2
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageOps
+
+try:
+    # Registers AVIF with Pillow versions before 11.2, which lack it built in
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+from image_meta import probe_image
 
 # Responsive sizes to generate
 RESPONSIVE_SIZES = [400, 800, 1200]
@@ -46,11 +72,82 @@ ASPECT_PRESETS = {
 # WebP quality (0-100)
 WEBP_QUALITY = 85
 
+# Output formats: file extension, Pillow format, default quality, lowest
+# quality --max-kb may go down to, MIME type. AVIF holds up at a lower
+# quality number than WebP or JPEG.
+OUTPUT_FORMATS = {
+    'avif': {'ext': '.avif', 'pil': 'AVIF', 'quality': 60, 'min_quality': 35, 'mime': 'image/avif'},
+    'webp': {'ext': '.webp', 'pil': 'WEBP', 'quality': WEBP_QUALITY, 'min_quality': 50, 'mime': 'image/webp'},
+    'jpg': {'ext': '.jpg', 'pil': 'JPEG', 'quality': 82, 'min_quality': 50, 'mime': 'image/jpeg'},
+}
+DEFAULT_FORMATS = ['webp']
+
+# sizes attribute for generated srcset markup
+SRCSET_SIZES = "(max-width: 600px) 400px, (max-width: 1024px) 800px, 1200px"
+
+# Face detection runs on a copy scaled down to this longest edge (pixels);
+# boxes are mapped back to the original. 0 detects at full resolution.
+# Kept well above the largest output so only camera originals get a proxy:
+# at 1024, site photos (1024x1536) lost small faces and crops cut them off.
+DETECTION_MAX_EDGE = 2048
+
+# Resizing: JPEGs are decoded at a reduced scale (draft) and other formats
+# box-reduced to no less than this multiple of the largest output, before
+# the final LANCZOS pass (Pillow's reducing_gap)
+RESIZE_REDUCING_GAP = 2.0
+# Smaller sizes are resized from the next larger output when it is at
+# least this much wider; otherwise from the cropped source
+CASCADE_MIN_RATIO = 1.5
+# --verify-resize falls back to a direct resize below this SSIM
+MIN_RESIZE_SSIM = 0.98
+
+# A detected face counts as found by both runs at this overlap (IoU)
+FACE_MATCH_IOU = 0.5
+
+# Image formats picked up by --batch
+BATCH_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff'}
+
+# Written to the output directory: what each source photo has produced
+MANIFEST_NAME = 'smart-photo-manifest.json'
+MANIFEST_VERSION = 3
+
+# --sweep: asset folders under the site root, and the formats it takes
+# sources from, preferred (least lossy) first
+SWEEP_DIRS = ['images', 'videos']
+SWEEP_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.webp']
+# Phone-size siblings are named <name>-400w.<ext>, as audit.py expects
+MOBILE_WIDTH = 400
+WIDTH_SUFFIX_PATTERN = re.compile(r'-\d+w$')
+
+# --posters: clips it reads, and the poster set completed for each
+# (<poster>.<ext> up to POSTER_MAX_WIDTH wide, plus -400w, in every format).
+# <poster> is the name the site's <video poster="..."> already uses.
+VIDEO_EXTENSIONS = {'.mp4', '.m4v', '.mov', '.webm'}
+POSTER_FORMATS = ['avif', 'webp', 'jpg']
+POSTER_MAX_WIDTH = 1280
+# Existing full-size posters missing formats are converted from, least lossy first
+POSTER_SOURCE_EXTENSIONS = SWEEP_EXTENSIONS + ['.avif']
+POSTER_MANIFEST_NAME = 'poster-manifest.json'
+# The site's own videos keep theirs out of the published videos/ folder
+# (ignored in .gitignore); clips from elsewhere keep it in the output directory
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+POSTER_MANIFEST_PATH = PROJECT_DIR / '.smart-photo' / POSTER_MANIFEST_NAME
+VIDEO_TAG_PATTERN = re.compile(r'<video\b[^>]*>.*?</video>', re.S | re.I)
+# Frames sampled per clip, spread over this part of it (skips fades at either end)
+POSTER_SAMPLES = 12
+POSTER_WINDOW = (0.1, 0.9)
+# Frames darker or brighter than this (mean luma) are fades or flashes
+POSTER_LUMA_RANGE = (40, 215)
+# Score bonus for a frame with faces, against log(1 + sharpness), typically 3-8
+POSTER_FACE_BONUS = 2.0
+
 
 class FaceDetector:
     """Handles face detection using OpenCV's Haar cascades."""
 
-    def __init__(self):
+    def __init__(self, max_edge: int = DETECTION_MAX_EDGE):
+        self.max_edge = max_edge
+
         # Load the pre-trained face detection model
         cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         self.face_cascade = cv2.CascadeClassifier(cascade_path)
@@ -61,10 +158,19 @@ class FaceDetector:
 
     def detect_faces(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
-        Detect faces in an image.
-        Returns list of (x, y, width, height) tuples for each face.
+        Detect faces in a BGR or grayscale image.
+        Returns list of (x, y, width, height) tuples for each face, in the
+        coordinates of `image` even when detection ran on a smaller proxy.
         """
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        # Run the cascades on a bounded-size proxy of large camera originals
+        height, width = gray.shape[:2]
+        scale = 1.0
+        if self.max_edge and max(width, height) > self.max_edge:
+            scale = self.max_edge / max(width, height)
+            gray = cv2.resize(gray, (max(1, round(width * scale)), max(1, round(height * scale))),
+                              interpolation=cv2.INTER_AREA)
 
         # Detect frontal faces
         faces = self.face_cascade.detectMultiScale(
@@ -87,8 +193,21 @@ class FaceDetector:
         if len(profiles) > 0:
             all_faces.extend(list(profiles))
 
+        if scale != 1.0:
+            all_faces = [self.scale_box(f, 1 / scale, width, height) for f in all_faces]
+
         return all_faces
 
+    @staticmethod
+    def scale_box(box, factor: float, img_width: int, img_height: int) -> Tuple[int, int, int, int]:
+        """Map a proxy box back to the original, rounding outward so faces stay covered."""
+        x, y, w, h = box
+        left = max(0, int(x * factor))
+        top = max(0, int(y * factor))
+        right = min(img_width, int(np.ceil((x + w) * factor)))
+        bottom = min(img_height, int(np.ceil((y + h) * factor)))
+        return (left, top, right - left, bottom - top)
+
     def get_faces_region(self, faces: List[Tuple[int, int, int, int]],
                          img_width: int, img_height: int,
                          padding: float = 0.2) -> Optional[Tuple[int, int, int, int]]:
@@ -124,8 +243,8 @@ class FaceDetector:
 class SmartCropper:
     """Handles intelligent cropping based on face positions and image content."""
 
-    def __init__(self):
-        self.face_detector = FaceDetector()
+    def __init__(self, detect_max_edge: int = DETECTION_MAX_EDGE):
+        self.face_detector = FaceDetector(max_edge=detect_max_edge)
 
     def find_focus_point(self, image: np.ndarray,
                          faces: List[Tuple[int, int, int, int]]) -> Tuple[float, float]:
@@ -134,7 +253,11 @@ class SmartCropper:
         Prioritizes faces, falls back to center-weighted.
         """
         height, width = image.shape[:2]
+        return self._focus_point(width, height, faces)
 
+    @staticmethod
+    def _focus_point(width: int, height: int,
+                     faces: List[Tuple[int, int, int, int]]) -> Tuple[float, float]:
         if faces:
             # Use center of all faces as focus point
             face_centers = [(f[0] + f[2]/2, f[1] + f[3]/2) for f in faces]
@@ -152,74 +275,83 @@ class SmartCropper:
         Crop image to target aspect ratio while preserving faces.
         """
         height, width = image.shape[:2]
-        target_ratio = target_aspect[0] / target_aspect[1]
-        current_ratio = width / height
-
         if faces is None:
             faces = self.face_detector.detect_faces(image)
 
-        focus_x, focus_y = self.find_focus_point(image, faces)
-
-        if abs(current_ratio - target_ratio) < 0.01:
-            # Already correct aspect ratio
+        left, top, new_width, new_height = self.crop_box(width, height, target_aspect, faces)
+        if (new_width, new_height) == (width, height):
             return image
+        return image[top:top+new_height, left:left+new_width]
 
-        if current_ratio > target_ratio:
-            # Image is wider than target - crop sides
-            new_width = int(height * target_ratio)
-            new_height = height
-        else:
-            # Image is taller than target - crop top/bottom
-            new_width = width
-            new_height = int(width / target_ratio)
-
-        # Calculate crop position based on focus point
-        if new_width < width:
-            # Horizontal crop
-            ideal_left = int(focus_x * width - new_width / 2)
-            left = max(0, min(width - new_width, ideal_left))
-            top = 0
-        else:
-            # Vertical crop
-            ideal_top = int(focus_y * height - new_height / 2)
-            top = max(0, min(height - new_height, ideal_top))
-            left = 0
+    def crop_box(self, width: int, height: int,
+                 target_aspect: Tuple[int, int],
+                 faces: List[Tuple[int, int, int, int]]) -> Tuple[int, int, int, int]:
+        """
+        The (left, top, width, height) region smart_crop() keeps, so any
+        image type (or Pillow's resize box) can apply it.
+        """
+        return tuple(int(v) for v in self.crop_boxes(width, height, [target_aspect], faces)[0])
 
-        # Ensure faces aren't cut off
-        if faces:
-            faces_region = self.face_detector.get_faces_region(faces, width, height)
-            if faces_region:
-                fx, fy, fw, fh = faces_region
-
-                # Adjust crop to include all faces
-                if new_width < width:
-                    # Ensure faces are within horizontal crop
-                    if left > fx:
-                        left = max(0, fx)
-                    if left + new_width < fx + fw:
-                        left = min(width - new_width, fx + fw - new_width + int(fw * 0.1))
-                else:
-                    # Ensure faces are within vertical crop
-                    if top > fy:
-                        top = max(0, fy)
-                    if top + new_height < fy + fh:
-                        top = min(height - new_height, fy + fh - new_height + int(fh * 0.1))
+    def crop_boxes(self, width: int, height: int,
+                   target_aspects: List[Tuple[int, int]],
+                   faces: List[Tuple[int, int, int, int]]) -> np.ndarray:
+        """
+        crop_box() for several aspect ratios at once: an (n, 4) int array of
+        (left, top, width, height), one row per aspect. The focus point and
+        faces region are worked out once and every window in one numpy pass.
+        """
+        aspects = np.asarray(target_aspects, dtype=np.float64).reshape(-1, 2)
+        target_ratio = aspects[:, 0] / aspects[:, 1]
+        current_ratio = width / height
 
-        # Perform the crop
-        cropped = image[top:top+new_height, left:left+new_width]
-        return cropped
+        focus_x, focus_y = self._focus_point(width, height, faces)
+
+        # Image wider than target: crop sides, else crop top/bottom
+        wider = current_ratio > target_ratio
+        new_width = np.where(wider, np.trunc(height * target_ratio), width).astype(np.int64)
+        new_height = np.where(wider, height, np.trunc(width / target_ratio)).astype(np.int64)
+
+        # Crop position based on focus point
+        horizontal = new_width < width
+        left = np.where(horizontal,
+                        np.clip(np.trunc(focus_x * width - new_width / 2), 0, width - new_width), 0)
+        top = np.where(horizontal,
+                       0, np.clip(np.trunc(focus_y * height - new_height / 2), 0, height - new_height))
+
+        # Ensure faces aren't cut off
+        faces_region = self.face_detector.get_faces_region(faces, width, height) if faces else None
+        if faces_region:
+            fx, fy, fw, fh = faces_region
+            # Within a horizontal crop...
+            face_left = np.where(left > fx, max(0, fx), left)
+            face_left = np.where(face_left + new_width < fx + fw,
+                                 np.minimum(width - new_width, fx + fw - new_width + int(fw * 0.1)), face_left)
+            # ...or a vertical one
+            face_top = np.where(top > fy, max(0, fy), top)
+            face_top = np.where(face_top + new_height < fy + fh,
+                                np.minimum(height - new_height, fy + fh - new_height + int(fh * 0.1)), face_top)
+            left = np.where(horizontal, face_left, left)
+            top = np.where(horizontal, top, face_top)
+
+        boxes = np.stack([left, top, new_width, new_height], axis=1).astype(np.int64)
+        # Already the right aspect ratio
+        boxes[np.abs(current_ratio - target_ratio) < 0.01] = (0, 0, width, height)
+        return boxes
 
 
 class PhotoProcessor:
     """Main class for processing photos."""
 
-    def __init__(self, output_dir: str = None):
-        self.cropper = SmartCropper()
+    def __init__(self, output_dir: str = None, detect_max_edge: int = DETECTION_MAX_EDGE,
+                 verify_resize: bool = False):
+        self.cropper = SmartCropper(detect_max_edge)
+        # Check every cascaded resize against a direct one (slower)
+        self.verify_resize = verify_resize
         self.output_dir = Path(output_dir) if output_dir else Path.cwd()
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
     def generate_filename(self, original_name: str, size: int = None,
-                          aspect: str = None) -> str:
+                          aspect: str = None, image_format: str = 'webp') -> str:
         """Generate SEO-friendly filename."""
         # Clean up the original name
         stem = Path(original_name).stem.lower()
@@ -237,156 +369,1509 @@ class PhotoProcessor:
         if size:
             parts.append(f'{size}w')
 
-        return '-'.join(parts) + '.webp'
+        return '-'.join(parts) + OUTPUT_FORMATS[image_format]['ext']
 
     def process_image(self, input_path: str,
                       aspect: str = 'original',
                       sizes: List[int] = None,
-                      prefix: str = None) -> List[str]:
+                      prefix: str = None,
+                      formats: List[str] = None,
+                      quality: dict = None,
+                      max_kb: int = None) -> List[str]:
         """
         Process a single image.
+        formats picks the encodings (default WebP); quality overrides the
+        per-format defaults in OUTPUT_FORMATS, e.g. {'avif': 55}. With
+        max_kb, each file's quality is lowered as needed to fit the budget.
         Returns list of output file paths.
         """
+        output_files, faces, _ = self.render_image(input_path, aspect, sizes, prefix, formats=formats,
+                                                   quality=quality, max_kb=max_kb)
+        return output_files, len(faces)
+
+    def render_image(self, input_path: str,
+                     aspect: str = 'original',
+                     sizes: List[int] = None,
+                     prefix: str = None,
+                     faces: List[Tuple[int, int, int, int]] = None,
+                     formats: List[str] = None,
+                     quality: dict = None,
+                     max_kb: int = None,
+                     known_qualities: dict = None):
+        """
+        process_image(), taking face boxes and --max-kb search results
+        (quality_search_key() -> quality) from an earlier run if given.
+        aspect may list several ratios ('square,4:5,16:9'): the photo is
+        decoded and searched for faces once, and every aspect x size x
+        format is written from that one buffer.
+        Returns (output file paths, face boxes, {path: encoding}), where an
+        encoding has the aspect, format, width, quality, bytes and search key.
+        """
         if sizes is None:
             sizes = RESPONSIVE_SIZES
+        formats = formats or DEFAULT_FORMATS
+        qualities = format_qualities(quality)
+        check_formats_supported(formats)
 
         input_path = Path(input_path)
         if not input_path.exists():
             raise FileNotFoundError(f"Image not found: {input_path}")
 
-        # Load image with OpenCV for face detection
-        cv_image = cv2.imread(str(input_path))
-        if cv_image is None:
-            raise ValueError(f"Could not read image: {input_path}")
-
-        # Detect faces once
-        faces = self.cropper.face_detector.detect_faces(cv_image)
-        num_faces = len(faces)
+        aspects = [(name, parse_aspect(name)) for name in split_aspects(aspect)]
 
-        # Get target aspect ratio
-        target_aspect = ASPECT_PRESETS.get(aspect)
-        if target_aspect is None and aspect != 'original':
-            # Parse custom aspect ratio (e.g., "4:3")
-            try:
-                w, h = aspect.split(':')
-                target_aspect = (int(w), int(h))
-            except:
-                print(f"Invalid aspect ratio: {aspect}, using original")
-                target_aspect = None
+        # Decode straight to RGB at the smallest scale every aspect's outputs allow
+        min_size = tuple(max(dims) for dims in zip(*(min_decode_size(sizes, target)
+                                                       for _, target in aspects)))
+        pil_image, scale = load_image(input_path, min_size)
+        detector = self.cropper.face_detector
 
-        # Apply smart crop if aspect ratio specified
-        if target_aspect:
-            cv_image = self.cropper.smart_crop(cv_image, target_aspect, faces)
-
-        # Convert to PIL for resizing and saving
-        rgb_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(rgb_image)
+        # Detect faces once (unless the manifest already knows them). Boxes
+        # are kept in full-size coordinates, whatever scale was decoded.
+        if faces is None:
+            gray = np.asarray(pil_image.convert('L'))
+            found = detector.detect_faces(gray)
+            faces = [detector.scale_box(f, 1 / scale, *full_size(pil_image, scale)) for f in found]
+        faces = [tuple(int(v) for v in f) for f in faces]
+
+        # Smart crop windows for every aspect ratio at once. They stay boxes
+        # on the decoded buffer; each aspect's largest size resamples
+        # straight out of its box, so no cropped copy is ever made.
+        targets = [target for _, target in aspects if target]
+        crop_boxes = {}
+        if targets:
+            decoded_faces = [detector.scale_box(f, scale, *pil_image.size) for f in faces]
+            for target, (left, top, width, height) in zip(
+                    targets, self.cropper.crop_boxes(*pil_image.size, targets, decoded_faces).tolist()):
+                if (width, height) != pil_image.size:
+                    crop_boxes[target] = (left, top, left + width, top + height)
 
         output_files = []
+        encodings = {}
         base_name = prefix if prefix else input_path.stem
 
-        # Generate responsive sizes
-        orig_width, orig_height = pil_image.size
+        for aspect_name, target in aspects:
+            # Generate responsive sizes, largest first so smaller ones can cascade
+            resized_images = resize_cascade(pil_image, sizes, verify=self.verify_resize,
+                                            box=crop_boxes.get(target))
+            self._encode_sizes(resized_images, sizes, base_name, aspect_name, formats, qualities,
+                               max_kb, known_qualities, output_files, encodings)
 
+        return output_files, faces, encodings
+
+    def _encode_sizes(self, resized_images: dict, sizes: List[int], base_name: str, aspect: str,
+                      formats: List[str], qualities: dict, max_kb: int, known_qualities: dict,
+                      output_files: List[str], encodings: dict):
+        """Encode and write every format of each resized image for one aspect."""
         for size in sizes:
-            if size >= orig_width:
-                # Don't upscale - use original size for this breakpoint
-                if size == max(sizes):
-                    resized = pil_image
+            if size not in resized_images:
+                continue
+            resized = resized_images[size]
+
+            # Encode every format from the same resized buffer
+            for image_format in formats:
+                filename = self.generate_filename(base_name, size, aspect, image_format)
+                output_path = self.output_dir / filename
+                search_key = None
+                known = None
+                if max_kb:
+                    search_key = quality_search_key(aspect, size, image_format, max_kb, qualities)
+                    known = (known_qualities or {}).get(search_key)
+                if known is None:
+                    chosen, data = encode_within(resized, image_format, qualities[image_format], max_kb)
                 else:
+                    chosen, data = known, encode_image(resized, image_format, known)
+                output_path.write_bytes(data)
+                output_files.append(str(output_path))
+                encodings[str(output_path)] = {
+                    'aspect': aspect,
+                    'format': image_format,
+                    'width': resized.size[0],
+                    'quality': chosen,
+                    'bytes': len(data),
+                    'search_key': search_key,
+                    'over_budget': bool(max_kb) and len(data) > max_kb * 1024,
+                }
+
+    def process_single(self, input_path: str, **kwargs):
+        """
+        render_image() for one photo, sharing the output directory's manifest
+        with process_batch(): face boxes and --max-kb search results from
+        earlier runs are reused, and this run's are recorded for the next.
+        """
+        input_path = Path(input_path)
+        if not input_path.exists():
+            raise FileNotFoundError(f"Image not found: {input_path}")
+        manifest = DerivativeManifest(self.output_dir / MANIFEST_NAME)
+        max_edge = self.cropper.face_detector.max_edge
+        digest = file_sha256(input_path)
+        files, faces, encodings = self.render_image(input_path, faces=manifest.faces_for(digest, max_edge),
+                                                    known_qualities=manifest.qualities_for(digest), **kwargs)
+        manifest.record(digest, input_path, faces, max_edge, files, self.output_dir, encodings, **kwargs)
+        manifest.save()
+        return files, faces, encodings
+
+    def process_batch(self, input_dir: str, jobs: int = 1, force: bool = False, **kwargs) -> dict:
+        """
+        Process all images in a directory.
+        With jobs > 1, images are spread over a process pool; progress and
+        results still come back in file-name order.
+
+        Photos whose content, aspect, sizes and quality match an entry in
+        the output directory's manifest (with its files still present) are
+        skipped; face boxes are reused whenever the content matches. force
+        re-renders everything.
+        """
+        input_dir = Path(input_dir)
+        if not input_dir.is_dir():
+            raise NotADirectoryError(f"Not a directory: {input_dir}")
+
+        results = {
+            'processed': [],
+            'failed': [],
+            'skipped': 0,
+            'total_faces': 0
+        }
+
+        img_paths = sorted(p for p in input_dir.iterdir()
+                           if p.suffix.lower() in BATCH_EXTENSIONS)
+
+        manifest = DerivativeManifest(self.output_dir / MANIFEST_NAME)
+        max_edge = self.cropper.face_detector.max_edge
+        parallel = jobs > 1 and len(img_paths) > 1
+        pooled = None
+
+        try:
+            # Queue everything first so workers stay busy, then collect in order
+            pending = []
+            for img_path in img_paths:
+                try:
+                    digest = file_sha256(img_path)
+                except OSError as e:
+                    pending.append((img_path, None, e))
                     continue
-            else:
-                # Calculate new dimensions maintaining aspect ratio
-                ratio = size / orig_width
-                new_height = int(orig_height * ratio)
-                resized = pil_image.resize((size, new_height), Image.Resampling.LANCZOS)
+                derivative = None if force else manifest.lookup(digest, self.output_dir, **kwargs)
+                if derivative:
+                    pending.append((img_path, digest, derivative))
+                    continue
+                faces = manifest.faces_for(digest, max_edge)
+                known = manifest.qualities_for(digest)
+                pending.append((img_path, digest, (str(img_path), faces, known)))
+
+            if parallel:
+                calls = [work + (kwargs,) for _, _, work in pending if isinstance(work, tuple)]
+                pooled = run_in_pool(_worker_pool(jobs, str(self.output_dir), max_edge, self.verify_resize),
+                                     _process_in_worker, calls)
+
+            for img_path, digest, work in pending:
+                if isinstance(work, Exception):
+                    self._record_failure(results, img_path, work)
+                    continue
+                if isinstance(work, dict):
+                    files = [str(self.output_dir / name) for name in work['outputs']]
+                    encodings = {str(self.output_dir / name): encoding
+                                 for name, encoding in work.get('encodings', {}).items()}
+                    self._record_success(results, img_path, files, work['faces'], encodings, cached=True)
+                    continue
+                try:
+                    if pooled:
+                        outcome = next(pooled)
+                        if isinstance(outcome, Exception):
+                            # A worker crash only lands here for the image that caused it
+                            raise outcome
+                        files, faces, encodings = outcome
+                    else:
+                        files, faces, encodings = self.render_image(work[0], faces=work[1],
+                                                                    known_qualities=work[2], **kwargs)
+                except Exception as e:
+                    self._record_failure(results, img_path, e)
+                else:
+                    manifest.record(digest, img_path, faces, max_edge, files, self.output_dir,
+                                    encodings, **kwargs)
+                    self._record_success(results, img_path, files, len(faces), encodings)
+        finally:
+            if pooled:
+                pooled.close()
+            manifest.save()
 
-            # Generate filename
-            filename = self.generate_filename(base_name, size, aspect)
-            output_path = self.output_dir / filename
+        return results
 
-            # Save as WebP
-            resized.save(output_path, 'WEBP', quality=WEBP_QUALITY)
-            output_files.append(str(output_path))
+    def render_siblings(self, source: str, outputs: List[dict], quality: dict = None,
+                        max_kb: int = None, keep_larger: bool = False) -> List[dict]:
+        """
+        Write the plan_sweep() outputs for one source, decoding it once.
+        Returns each output with its quality, bytes and bytes saved against
+        the source; a full-size sibling that isn't smaller than the source
+        is not written (written False) unless keep_larger.
+        """
+        qualities = format_qualities(quality)
+        source = Path(source)
+        source_bytes = source.stat().st_size
+        with Image.open(source) as probe:
+            if getattr(probe, 'is_animated', False):
+                raise ValueError("animated image, convert it by hand")
+
+        widths = [o['width'] for o in outputs if o['width']]
+        needs_full = any(o['width'] is None for o in outputs)
+        image, _ = load_image(source, None if needs_full else min_decode_size(widths, None),
+                              keep_alpha=True)
+        resized_images = resize_cascade(image, widths, verify=self.verify_resize) if widths else {}
+
+        results = []
+        for output in outputs:
+            target = resized_images.get(output['width'], image) if output['width'] else image
+            image_format = output['format']
+            chosen, data = encode_within(target, image_format, qualities[image_format], max_kb)
+            written = keep_larger or output['width'] is not None or len(data) < source_bytes
+            if written:
+                write_atomic(Path(output['path']), data)
+            results.append(dict(output, quality=chosen, bytes=len(data),
+                                saved=source_bytes - len(data), written=written))
+        return results
 
-        return output_files, num_faces
+    def render_poster(self, video_path: str,
+                      base_name: str = None,
+                      aspect: str = 'original',
+                      formats: List[str] = None,
+                      quality: dict = None,
+                      max_kb: int = None,
+                      frame: dict = None,
+                      only: List[str] = None):
+        """
+        Pick a poster frame from a video and write its poster set to the
+        output directory: <base>.<ext> (up to POSTER_MAX_WIDTH wide) and
+        <base>-400w.<ext> in every format, smart-cropped if aspect is set.
+        frame ({'time', 'faces', ...}) reuses an earlier pick instead of
+        sampling; only limits the set to those file names.
+        Returns (output file paths, frame, {path: encoding}).
+        """
+        formats = formats or POSTER_FORMATS
+        qualities = format_qualities(quality)
+        check_formats_supported(formats)
+        video_path = Path(video_path)
+        base_name = base_name or poster_base_name(video_path)
+
+        capture = cv2.VideoCapture(str(video_path))
+        if not capture.isOpened():
+            raise ValueError(f"Can't open video: {video_path}")
+        try:
+            if frame:
+                seconds, faces = frame['time'], [tuple(f) for f in frame['faces']]
+                image = read_frame(capture, seconds)
+                if image is None:
+                    raise ValueError(f"No frame at {seconds}s")
+            else:
+                seconds, image, faces = pick_poster_frame(capture, self.cropper.face_detector)
+        finally:
+            capture.release()
+
+        frame = {
+            'time': seconds,
+            'sha256': hashlib.sha256(image.tobytes()).hexdigest(),
+            'faces': [list(f) for f in faces],
+        }
+        pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        target_aspect = parse_aspect(aspect)
+        box = None
+        crop_width = pil_image.size[0]
+        if target_aspect:
+            left, top, width, height = self.cropper.crop_box(*pil_image.size, target_aspect, faces)
+            if (width, height) != pil_image.size:
+                box = (left, top, left + width, top + height)
+                crop_width = width
 
-    def process_batch(self, input_dir: str, **kwargs) -> dict:
-        """Process all images in a directory."""
-        input_dir = Path(input_dir)
-        if not input_dir.is_dir():
-            raise NotADirectoryError(f"Not a directory: {input_dir}")
+        full_width = min(crop_width, POSTER_MAX_WIDTH)
+        sizes = [full_width] + ([MOBILE_WIDTH] if full_width > MOBILE_WIDTH else [])
+        resized_images = resize_cascade(pil_image, sizes, verify=self.verify_resize, box=box)
+
+        output_files = []
+        encodings = {}
+        for size in sizes:
+            suffix = '' if size == full_width else f'-{size}w'
+            for image_format in formats:
+                output_path = self.output_dir / f"{base_name}{suffix}{OUTPUT_FORMATS[image_format]['ext']}"
+                if only is not None and output_path.name not in only:
+                    continue
+                chosen, data = encode_within(resized_images[size], image_format,
+                                             qualities[image_format], max_kb)
+                write_atomic(output_path, data)
+                output_files.append(str(output_path))
+                encodings[str(output_path)] = {
+                    'format': image_format,
+                    'width': resized_images[size].size[0],
+                    'quality': chosen,
+                    'bytes': len(data),
+                    'search_key': None,
+                    'over_budget': bool(max_kb) and len(data) > max_kb * 1024,
+                }
+
+        return output_files, frame, encodings
+
+    def process_videos(self, input_path: str, jobs: int = 1, force: bool = False,
+                       names: dict = None, site_root: str = None, manifest_path: str = None,
+                       **kwargs) -> dict:
+        """
+        Complete the poster set of a video, or of every video in a folder
+        and every <video poster=...> the site's pages point into the output
+        directory, so each has all of poster_filenames().
+
+        A clip's poster name is the one its pages already use (names,
+        {clip file name: poster name}, overrides; '<stem>-poster' if
+        neither). Only missing files are written. If the set has a
+        full-size poster (hand-made or not), they are converted from it, so
+        every format shows the same frame; otherwise a frame is picked from
+        the clip and recorded in the manifest, and a set made that way is
+        re-rendered when its clip changes. force re-renders every file of
+        a set from its clip, hand-made ones included.
+        """
+        input_path = Path(input_path)
+        if input_path.is_dir():
+            video_paths = sorted(p for p in input_path.iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS)
+        elif input_path.exists():
+            video_paths = [input_path]
+        else:
+            raise FileNotFoundError(f"Video not found: {input_path}")
 
         results = {
             'processed': [],
             'failed': [],
+            'skipped': 0,
             'total_faces': 0
         }
+        sets = poster_sets(video_paths, self.output_dir, site_root or PROJECT_DIR, names,
+                           include_pages=input_path.is_dir())
+        manifest = DerivativeManifest(manifest_path or poster_manifest_path(input_path, self.output_dir))
+        formats = kwargs.get('formats') or POSTER_FORMATS
+        pooled = None
+
+        try:
+            pending = []
+            for base_name, video_path in sets.items():
+                label = video_path or self.output_dir / base_name
+                settings = dict(kwargs, sizes=[POSTER_MAX_WIDTH, MOBILE_WIDTH],
+                                prefix=str(self.output_dir.resolve() / base_name))
+                targets = poster_filenames(base_name, formats)
+                missing = [name for name in targets if not (self.output_dir / name).exists()]
+                digest = None
+                if video_path:
+                    try:
+                        digest = file_sha256(video_path)
+                    except OSError as e:
+                        pending.append((label, None, settings, e))
+                        continue
+                    # Files an earlier run picked from a since-changed clip are stale
+                    stale = {name for name, source in manifest.outputs_for(settings['prefix']).items()
+                             if source != digest and name in targets}
+                    missing = sorted(set(missing) | stale, key=targets.index)
+
+                if force and video_path:
+                    task = {'kind': 'frame', 'video': str(video_path), 'base': base_name,
+                            'frame': manifest.frame_for(digest), 'only': targets}
+                elif not missing:
+                    pending.append((label, digest, settings, targets))
+                    continue
+                else:
+                    source = existing_poster(self.output_dir, base_name, exclude=missing)
+                    if source:
+                        task = {'kind': 'convert', 'source': str(source), 'only': missing,
+                                'outputs': [{'path': str(self.output_dir / name),
+                                             'format': poster_format(name),
+                                             'width': MOBILE_WIDTH if WIDTH_SUFFIX_PATTERN.search(Path(name).stem)
+                                             else None}
+                                            for name in missing]}
+                    elif video_path:
+                        task = {'kind': 'frame', 'video': str(video_path), 'base': base_name,
+                                'frame': manifest.frame_for(digest), 'only': missing}
+                    else:
+                        error = FileNotFoundError("no full-size poster and no local clip to pick a frame from")
+                        pending.append((label, digest, settings, error))
+                        continue
+                pending.append((label, digest, settings, task))
+
+            if jobs > 1 and sum(isinstance(work, dict) for *_, work in pending) > 1:
+                calls = [(work, kwargs) for *_, work in pending if isinstance(work, dict)]
+                pooled = run_in_pool(_worker_pool(jobs, str(self.output_dir),
+                                                  self.cropper.face_detector.max_edge, self.verify_resize),
+                                     _poster_in_worker, calls)
+
+            for label, digest, settings, work in pending:
+                if isinstance(work, Exception):
+                    self._record_failure(results, label, work)
+                    continue
+                if isinstance(work, list):
+                    files = [str(self.output_dir / name) for name in work]
+                    self._record_success(results, label, files, 0, cached=True)
+                    continue
+                try:
+                    if pooled:
+                        outcome = next(pooled)
+                        if isinstance(outcome, Exception):
+                            raise outcome
+                    else:
+                        outcome = self.render_poster_task(work, **kwargs)
+                    files, frame, encodings = outcome
+                except Exception as e:
+                    self._record_failure(results, label, e)
+                    continue
+                faces = len(frame['faces']) if frame else 0
+                if frame:
+                    manifest.record(digest, work['video'], frame['faces'], self.cropper.face_detector.max_edge,
+                                    files, self.output_dir, encodings, frame=frame, **settings)
+                self._record_success(results, label, files, faces, encodings, verbose=True)
+                if frame:
+                    print(f"    poster frame at {frame['time']:.2f}s")
+                else:
+                    print(f"    converted from {Path(work['source']).name}")
+        finally:
+            if pooled:
+                pooled.close()
+            manifest.save()
+
+        return results
 
-        # Supported image formats
-        extensions = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff'}
+    def render_poster_task(self, task: dict, aspect: str = 'original', formats: List[str] = None,
+                           quality: dict = None, max_kb: int = None):
+        """
+        Run one process_videos() task: 'convert' an existing poster into the
+        missing files, or pick a 'frame' from the clip. Returns (output file
+        paths, frame or None, {path: encoding}).
+        """
+        if task['kind'] == 'frame':
+            return self.render_poster(task['video'], task['base'], aspect=aspect, formats=formats,
+                                      quality=quality, max_kb=max_kb, frame=task['frame'], only=task['only'])
+
+        outputs = self.render_siblings(task['source'], task['outputs'], quality=quality, max_kb=max_kb,
+                                       keep_larger=True)
+        files = [o['path'] for o in outputs]
+        encodings = {o['path']: {
+            'format': o['format'],
+            'width': o['width'],
+            'quality': o['quality'],
+            'bytes': o['bytes'],
+            'search_key': None,
+            'over_budget': bool(max_kb) and o['bytes'] > max_kb * 1024,
+        } for o in outputs}
+        return files, None, encodings
+
+    def process_sweep(self, root: str, jobs: int = 1, force: bool = False, dry_run: bool = False,
+                      **kwargs) -> dict:
+        """
+        Give every asset under root's SWEEP_DIRS the AVIF/WebP/400w siblings
+        it lacks. Existing files are never overwritten; with force, siblings
+        older than their source are regenerated. kwargs go to
+        render_siblings() (quality, max_kb).
+        """
+        root = Path(root)
+        tasks, existing = plan_sweep(root, force)
+        results = {
+            'planned': tasks,
+            'existing': existing,
+            'generated': [],
+            'not_smaller': [],
+            'failed': [],
+        }
+        if dry_run:
+            for task in tasks:
+                names = ', '.join(Path(o['path']).name for o in task['outputs'])
+                print(f"+ {os.path.relpath(task['source'], root)} → {names}")
+            return results
+
+        pooled = None
+        if jobs > 1 and len(tasks) > 1:
+            pooled = run_in_pool(_worker_pool(jobs, str(root), self.cropper.face_detector.max_edge,
+                                              self.verify_resize),
+                                 _sweep_in_worker, [(task['source'], task['outputs'], kwargs) for task in tasks])
+        try:
+            for task in tasks:
+                source_name = os.path.relpath(task['source'], root)
+                try:
+                    if pooled:
+                        outputs = next(pooled)
+                        if isinstance(outputs, Exception):
+                            raise outputs
+                    else:
+                        outputs = self.render_siblings(task['source'], task['outputs'], **kwargs)
+                except Exception as e:
+                    results['failed'].append({'input': task['source'], 'error': str(e)})
+                    print(f"✗ {source_name}: {e}")
+                    continue
+                print(f"✓ {source_name} ({task['bytes'] / 1024:.0f} KB)")
+                for output in outputs:
+                    name = Path(output['path']).name
+                    if output['written']:
+                        results['generated'].append(output)
+                        print(f"    {name}  q={output['quality']}  {output['bytes'] / 1024:.1f} KB "
+                              f"({-output['saved'] / 1024:+.0f} KB)")
+                    else:
+                        results['not_smaller'].append(output)
+                        print(f"    {name}  not written, {output['bytes'] / 1024:.1f} KB isn't smaller")
+        finally:
+            if pooled:
+                pooled.close()
+        return results
 
-        for img_path in input_dir.iterdir():
-            if img_path.suffix.lower() in extensions:
+    def _record_success(self, results: dict, img_path: Path, files: List[str], faces: int,
+                        encodings: dict = None, cached: bool = False, verbose: bool = False):
+        results['processed'].append({
+            'input': str(img_path),
+            'outputs': files,
+            'encodings': encodings or {},
+            'faces_detected': faces,
+            'cached': cached
+        })
+        results['total_faces'] += faces
+        if cached:
+            results['skipped'] += 1
+            print(f"= {img_path.name} unchanged ({len(files)} files)")
+        else:
+            print(f"✓ {img_path.name} ({faces} faces) → {len(files)} files")
+            if encodings and (verbose or any(e['search_key'] for e in encodings.values())):
+                for f in files:
+                    print(f"    {describe_encoding(f, encodings[f])}")
+
+    def _record_failure(self, results: dict, img_path: Path, error: Exception):
+        results['failed'].append({
+            'input': str(img_path),
+            'error': str(error) or type(error).__name__
+        })
+        print(f"✗ {img_path.name}: {error}")
+
+
+def parse_aspect(aspect: str) -> Optional[Tuple[int, int]]:
+    """(w, h) for a preset or 'W:H' aspect, None to keep the original."""
+    target_aspect = ASPECT_PRESETS.get(aspect)
+    if target_aspect is None and aspect != 'original':
+        # Parse custom aspect ratio (e.g., "4:3")
+        try:
+            w, h = aspect.split(':')
+            target_aspect = (int(w), int(h))
+        except ValueError:
+            print(f"Invalid aspect ratio: {aspect}, using original")
+            target_aspect = None
+    return target_aspect
+
+
+def split_aspects(aspect: str) -> List[str]:
+    """'square, 4:5,16:9' -> ['square', '4:5', '16:9'], duplicates dropped."""
+    names = [name.strip() for name in (aspect or 'original').split(',') if name.strip()]
+    return list(dict.fromkeys(names)) or ['original']
+
+
+def min_decode_size(sizes: List[int], target_aspect: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+    """
+    Smallest (width, height) to decode so the crop still covers the largest
+    output RESIZE_REDUCING_GAP times over.
+    """
+    needed = int(max(sizes) * RESIZE_REDUCING_GAP)
+    if not target_aspect:
+        return (needed, 1)
+    # A crop to w:h keeps at most height * w/h of the width
+    return (needed, int(np.ceil(needed * target_aspect[1] / target_aspect[0])))
+
+
+def load_image(path: Path, min_size: Tuple[int, int] = None, keep_alpha: bool = False):
+    """
+    Open an image as upright RGB (RGBA with keep_alpha, if it has
+    transparency). JPEGs are decoded at the largest DCT reduction (1/2,
+    1/4, 1/8) that still covers min_size; other formats decode in full.
+    Returns (image, scale of decoded vs full size).
+    """
+    image = Image.open(path)
+    # cv2.imread applied EXIF orientation, so faces and crops expect upright images
+    transposed = image.getexif().get(0x0112) in (5, 6, 7, 8)
+    full_width, full_height = image.size[::-1] if transposed else image.size
+
+    if min_size and image.format == 'JPEG':
+        request = min_size[::-1] if transposed else min_size
+        image.draft('RGB', request)
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    image = ImageOps.exif_transpose(image)
+    mode = 'RGBA' if keep_alpha and has_alpha else 'RGB'
+    if image.mode != mode:
+        image = image.convert(mode)
+    return image, image.size[0] / full_width
+
+
+def full_size(image: Image.Image, scale: float) -> Tuple[int, int]:
+    """Full-resolution (width, height) of an image decoded at scale."""
+    return (round(image.size[0] / scale), round(image.size[1] / scale))
+
+
+def resize_cascade(image: Image.Image, sizes: List[int], verify: bool = False,
+                   box: Tuple[int, int, int, int] = None) -> dict:
+    """
+    Resize to each width in sizes, keeping the aspect ratio: {width: image}.
+
+    The largest is resized from the source (box-reducing first, up to
+    RESIZE_REDUCING_GAP, then LANCZOS); each smaller one from the previous
+    output when that is at least CASCADE_MIN_RATIO wider, so a large
+    original is resampled once instead of once per size. Widths at or
+    above the source width are skipped, except the largest, which keeps
+    the source as is. With verify, any cascaded result under
+    MIN_RESIZE_SSIM against a direct resize is replaced by the direct one.
+
+    box (left, top, right, bottom) treats that region of image as the
+    source, resampling out of it without cropping a copy first.
+    """
+    box = box or (0, 0, *image.size)
+    orig_width, orig_height = box[2] - box[0], box[3] - box[1]
+    resized_images = {}
+    previous = None
+    for size in sorted(set(sizes), reverse=True):
+        if size >= orig_width:
+            # Don't upscale - use original size for this breakpoint
+            if size == max(sizes):
+                resized_images[size] = image if box == (0, 0, *image.size) else image.crop(box)
+            continue
+
+        # Calculate new dimensions maintaining aspect ratio
+        new_size = (size, int(orig_height * size / orig_width))
+        if previous is not None and previous.size[0] >= size * CASCADE_MIN_RATIO:
+            resized = previous.resize(new_size, Image.Resampling.LANCZOS)
+            if verify:
+                direct = image.resize(new_size, Image.Resampling.LANCZOS, box=box,
+                                      reducing_gap=RESIZE_REDUCING_GAP)
+                score = ssim(resized, direct)
+                if score < MIN_RESIZE_SSIM:
+                    print(f"  {size}w cascade SSIM {score:.4f} < {MIN_RESIZE_SSIM}, using direct resize")
+                    resized = direct
+        else:
+            resized = image.resize(new_size, Image.Resampling.LANCZOS, box=box,
+                                   reducing_gap=RESIZE_REDUCING_GAP)
+        resized_images[size] = previous = resized
+    return resized_images
+
+
+def ssim(a: Image.Image, b: Image.Image) -> float:
+    """Mean structural similarity of two same-size images, on luma (Gaussian window)."""
+    x = np.asarray(a.convert('L'), dtype=np.float64)
+    y = np.asarray(b.convert('L'), dtype=np.float64)
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+
+    def blur(v):
+        return cv2.GaussianBlur(v, (11, 11), 1.5)
+
+    mu_x, mu_y = blur(x), blur(y)
+    var_x = blur(x * x) - mu_x ** 2
+    var_y = blur(y * y) - mu_y ** 2
+    cov = blur(x * y) - mu_x * mu_y
+    ssim_map = ((2 * mu_x * mu_y + c1) * (2 * cov + c2)) / ((mu_x ** 2 + mu_y ** 2 + c1) * (var_x + var_y + c2))
+    return float(ssim_map.mean())
+
+
+# Each batch worker process builds its own PhotoProcessor (and FaceDetector)
+_worker_processor = None
+
+
+def _init_worker(output_dir: str, detect_max_edge: int, verify_resize: bool):
+    global _worker_processor
+    # One OpenCV thread per worker; the pool already uses every core
+    cv2.setNumThreads(1)
+    _worker_processor = PhotoProcessor(output_dir=output_dir, detect_max_edge=detect_max_edge,
+                                       verify_resize=verify_resize)
+
+
+def _worker_pool(jobs: int, output_dir: str, detect_max_edge: int, verify_resize: bool):
+    """A factory for worker pools: pool(n) starts a fresh ProcessPoolExecutor with n (default jobs) workers."""
+    def pool(workers: int = jobs) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(output_dir, detect_max_edge, verify_resize))
+    return pool
+
+
+def run_in_pool(pool, fn, calls: List[tuple]):
+    """
+    Run fn(*args) for each args in calls on pool(), yielding each result, or
+    the exception it raised, in call order.
+
+    A worker that dies (segfault, OOM kill) breaks the whole pool, failing
+    every unfinished call with BrokenProcessPool. When that happens the call
+    being collected is re-run alone in a one-worker pool, and only fails if
+    it crashes that too; a new pool then takes every unfinished call, so
+    one bad input costs just its own result.
+    """
+    executor = pool()
+    futures = [executor.submit(fn, *args) for args in calls]
+    try:
+        for i, args in enumerate(calls):
+            try:
+                yield futures[i].result()
+                continue
+            except BrokenProcessPool:
+                pass
+            except Exception as e:
+                yield e
+                continue
+
+            executor.shutdown()
+            with pool(1) as solo:
                 try:
-                    files, faces = self.process_image(str(img_path), **kwargs)
-                    results['processed'].append({
-                        'input': str(img_path),
-                        'outputs': files,
-                        'faces_detected': faces
-                    })
-                    results['total_faces'] += faces
-                    print(f"✓ {img_path.name} ({faces} faces) → {len(files)} files")
+                    outcome = solo.submit(fn, *args).result()
                 except Exception as e:
-                    results['failed'].append({
-                        'input': str(img_path),
-                        'error': str(e)
-                    })
-                    print(f"✗ {img_path.name}: {e}")
+                    outcome = e
+            executor = pool()
+            for j in range(i + 1, len(calls)):
+                done = futures[j].done() and not isinstance(futures[j].exception(), BrokenProcessPool)
+                if not done:
+                    futures[j] = executor.submit(fn, *calls[j])
+            yield outcome
+    finally:
+        executor.shutdown()
 
-        return results
+
+def _process_in_worker(input_path: str, faces, known_qualities, kwargs: dict):
+    return _worker_processor.render_image(input_path, faces=faces, known_qualities=known_qualities,
+                                          **kwargs)
+
+
+def _sweep_in_worker(source: str, outputs: List[dict], kwargs: dict):
+    return _worker_processor.render_siblings(source, outputs, **kwargs)
+
+
+def _poster_in_worker(task: dict, kwargs: dict):
+    return _worker_processor.render_poster_task(task, **kwargs)
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write beside, then swap in: never leave a half-written asset."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def poster_base_name(video_path: Path) -> str:
+    """'videos/first-dance.mp4' -> 'first-dance-poster'."""
+    return f"{Path(video_path).stem}-poster"
+
+
+def poster_filenames(base_name: str, formats: List[str] = None) -> List[str]:
+    """Every file render_poster() may write for base_name."""
+    return [f"{base_name}{suffix}{OUTPUT_FORMATS[fmt]['ext']}"
+            for suffix in ('', f'-{MOBILE_WIDTH}w') for fmt in formats or POSTER_FORMATS]
+
+
+def poster_format(filename: str) -> str:
+    """'clip-poster-400w.jpg' -> 'jpg'."""
+    ext = Path(filename).suffix.lower()
+    return next(fmt for fmt, spec in OUTPUT_FORMATS.items() if spec['ext'] == ext)
+
+
+def existing_poster(output_dir: Path, base_name: str, exclude: List[str] = ()) -> Optional[Path]:
+    """The set's full-size poster to convert missing files from, least lossy format first."""
+    for ext in POSTER_SOURCE_EXTENSIONS:
+        path = output_dir / f"{base_name}{ext}"
+        if path.name not in exclude and path.exists():
+            return path
+    return None
+
+
+def page_posters(site_root: Path) -> dict:
+    """{poster file: clip file or None} for every <video poster="..."> in the site's pages."""
+    site_root = Path(site_root)
+    posters = {}
+    for dirpath, dirnames, filenames in os.walk(site_root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d != 'node_modules']
+        for filename in filenames:
+            if not filename.endswith('.html'):
+                continue
+            try:
+                html = (Path(dirpath) / filename).read_text(encoding='utf-8', errors='replace')
+            except OSError:
+                continue
+            for tag in VIDEO_TAG_PATTERN.findall(html):
+                poster = re.search(r'\bposter="([^"]+)"', tag)
+                if not poster or '://' in poster.group(1):
+                    continue
+                clip = re.search(r'\bsrc="([^"]+)"', tag)
+                poster_path = site_root / poster.group(1).lstrip('/')
+                clip_path = site_root / clip.group(1).lstrip('/') if clip and '://' not in clip.group(1) else None
+                if posters.get(poster_path) is None:
+                    posters[poster_path] = clip_path
+    return posters
+
+
+def poster_manifest_path(input_path: Path, output_dir: Path) -> Path:
+    """POSTER_MANIFEST_PATH for videos inside the project, else one in output_dir."""
+    if PROJECT_DIR in Path(input_path).resolve().parents:
+        return POSTER_MANIFEST_PATH
+    return Path(output_dir) / POSTER_MANIFEST_NAME
+
+
+def poster_sets(video_paths: List[Path], output_dir: Path, site_root: Path, names: dict = None,
+                include_pages: bool = True) -> dict:
+    """
+    {poster name: clip path or None} to complete. Local clips are named by
+    names, then by the poster their pages use, then '<stem>-poster'; with
+    include_pages, posters the pages reference in output_dir are added even
+    when their clip isn't here.
+    """
+    names = names or {}
+    output_dir = Path(output_dir).resolve()
+    by_clip = {}
+    sets = {}
+    for poster, clip in page_posters(site_root).items():
+        base = WIDTH_SUFFIX_PATTERN.sub('', Path(poster).stem)
+        if clip:
+            by_clip.setdefault(clip.name, base)
+        if include_pages and poster.parent.resolve() == output_dir:
+            sets[base] = clip if clip and clip.exists() else None
+    for video_path in video_paths:
+        base = names.get(video_path.name) or by_clip.get(video_path.name) or poster_base_name(video_path)
+        sets[base] = video_path
+    return dict(sorted(sets.items()))
+
+
+def read_frame(capture, seconds: float) -> Optional[np.ndarray]:
+    """The BGR frame at seconds. Seeks (decoding from the nearest keyframe), not from the start."""
+    capture.set(cv2.CAP_PROP_POS_MSEC, seconds * 1000)
+    ok, frame = capture.read()
+    return frame if ok else None
+
+
+def pick_poster_frame(capture, detector: FaceDetector, samples: int = POSTER_SAMPLES):
+    """
+    Sample frames evenly over POSTER_WINDOW of the clip and keep the best:
+    log(1 + sharpness), plus POSTER_FACE_BONUS if it shows faces; fades
+    and flashes (mean luma outside POSTER_LUMA_RANGE) only as a last
+    resort. Returns (seconds, BGR frame, face boxes).
+    """
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+    if not fps or frame_count <= 0:
+        raise ValueError("Can't tell the clip's length")
+    duration = frame_count / fps
+    start, end = POSTER_WINDOW
+
+    best = None
+    for i in range(samples):
+        seconds = round(duration * (start + (end - start) * i / max(1, samples - 1)), 3)
+        frame = read_frame(capture, seconds)
+        if frame is None:
+            continue
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = [tuple(int(v) for v in f) for f in detector.detect_faces(gray)]
+        # Judge sharpness and exposure on a small copy, like detection
+        scale = min(1.0, 640 / max(gray.shape))
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        luma = small.mean()
+        score = np.log1p(cv2.Laplacian(small, cv2.CV_64F).var()) + (POSTER_FACE_BONUS if faces else 0)
+        if not POSTER_LUMA_RANGE[0] <= luma <= POSTER_LUMA_RANGE[1]:
+            score -= 100
+        if best is None or score > best[0]:
+            best = (score, seconds, frame, faces)
+    if best is None:
+        raise ValueError("No readable frames")
+    return best[1:]
+
+
+def plan_sweep(root: Path, force: bool = False):
+    """
+    Siblings missing from the assets under root's SWEEP_DIRS: AVIF for
+    every source, WebP unless the source is one, and 400w WebP + AVIF for
+    sources wider than 1.5x that. Each name (folder + stem) is one asset;
+    its source is the first of SWEEP_EXTENSIONS on disk. -NNNw files and
+    responsive/ folders are variants, not sources.
+
+    Returns (tasks, existing): tasks are {'source', 'bytes', 'outputs':
+    [{'path', 'format', 'width'}]} (width None for full size); existing
+    lists siblings already on disk as {'path', 'stale'}, stale when older
+    than the source - with force those are in tasks too.
+    """
+    assets = {}
+    for folder in SWEEP_DIRS:
+        for path in sorted((root / folder).rglob('*')):
+            if (path.suffix.lower() not in SWEEP_EXTENSIONS or path.parent.name == 'responsive'
+                    or WIDTH_SUFFIX_PATTERN.search(path.stem) or not path.is_file()):
+                continue
+            assets.setdefault(path.parent / path.stem, []).append(path)
+
+    tasks = []
+    existing = []
+    for base, paths in assets.items():
+        source = min(paths, key=lambda p: SWEEP_EXTENSIONS.index(p.suffix.lower()))
+        meta = probe_image(source)
+        if not meta['width']:
+            continue
+
+        # (places the sibling may already be, format, width); new files go in the first
+        wanted = [([base.parent / f"{base.name}.avif"], 'avif', None)]
+        if source.suffix.lower() != '.webp':
+            wanted.append(([base.parent / f"{base.name}.webp"], 'webp', None))
+        if meta['width'] > MOBILE_WIDTH * 1.5:
+            for image_format in ('webp', 'avif'):
+                name = f"{base.name}-{MOBILE_WIDTH}w{OUTPUT_FORMATS[image_format]['ext']}"
+                wanted.append(([base.parent / name, base.parent / 'responsive' / name],
+                               image_format, MOBILE_WIDTH))
+
+        source_stat = source.stat()
+        outputs = []
+        for places, image_format, width in wanted:
+            found = next((p for p in places if p.exists()), None)
+            if found:
+                stale = found.stat().st_mtime_ns < source_stat.st_mtime_ns
+                existing.append({'path': str(found), 'stale': stale})
+                if not (stale and force):
+                    continue
+            outputs.append({'path': str(found or places[0]), 'format': image_format, 'width': width})
+        if outputs:
+            tasks.append({'source': str(source), 'bytes': source_stat.st_size, 'outputs': outputs})
+    return tasks, existing
+
+
+def encode_image(image: Image.Image, image_format: str, quality: int) -> bytes:
+    """Encode an image in memory."""
+    buffer = io.BytesIO()
+    image.save(buffer, OUTPUT_FORMATS[image_format]['pil'], quality=quality)
+    return buffer.getvalue()
+
+
+def fit_quality(image: Image.Image, image_format: str, start_quality: int, max_bytes: int):
+    """
+    Highest quality from start_quality down to the format's min_quality
+    whose encoding fits max_bytes, by binary search. Returns (quality,
+    bytes); if nothing fits, the min_quality encoding (over budget).
+    """
+    data = encode_image(image, image_format, start_quality)
+    if len(data) <= max_bytes:
+        return start_quality, data
+
+    low = min(OUTPUT_FORMATS[image_format]['min_quality'], start_quality)
+    high = start_quality - 1
+    best = None
+    while low <= high:
+        mid = (low + high) // 2
+        data = encode_image(image, image_format, mid)
+        if len(data) <= max_bytes:
+            best = (mid, data)
+            low = mid + 1
+        else:
+            high = mid - 1
+    if best:
+        return best
+    floor = min(OUTPUT_FORMATS[image_format]['min_quality'], start_quality)
+    return floor, encode_image(image, image_format, floor)
+
+
+def encode_within(image: Image.Image, image_format: str, quality: int, max_kb: int = None):
+    """(quality, bytes): at quality, or the fit_quality() search when there is a budget."""
+    if max_kb:
+        return fit_quality(image, image_format, quality, max_kb * 1024)
+    return quality, encode_image(image, image_format, quality)
+
+
+def quality_search_key(aspect: str, size: int, image_format: str, max_kb: int, qualities: dict) -> str:
+    """What a --max-kb search result depends on, besides the source photo."""
+    return f"{aspect}|{size}w|{image_format}:{qualities[image_format]}|{max_kb}kb"
+
+
+def describe_encoding(path: str, encoding: dict) -> str:
+    """'photo-800w.webp  q=72  143.2 KB' for progress and summaries."""
+    note = '  (over budget at the quality floor)' if encoding.get('over_budget') else ''
+    return f"{Path(path).name}  q={encoding['quality']}  {encoding['bytes'] / 1024:.1f} KB{note}"
+
+
+def format_qualities(overrides: dict = None) -> dict:
+    """Quality per output format: OUTPUT_FORMATS defaults with overrides applied."""
+    qualities = {fmt: spec['quality'] for fmt, spec in OUTPUT_FORMATS.items()}
+    qualities.update(overrides or {})
+    return qualities
+
+
+def check_formats_supported(formats: List[str]):
+    """Fail early if Pillow can't write one of the requested formats."""
+    # Loads every Pillow format plugin, so Image.SAVE is complete
+    Image.init()
+    for image_format in formats:
+        if image_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown format: {image_format} (use {', '.join(OUTPUT_FORMATS)})")
+        pil_format = OUTPUT_FORMATS[image_format]['pil']
+        if pil_format not in Image.SAVE:
+            raise ValueError(f"This Pillow can't write {pil_format}; "
+                             f"upgrade to Pillow 11.2+ or pip install pillow-avif-plugin")
+
+
+def file_sha256(path) -> str:
+    """Content hash of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DerivativeManifest:
+    """
+    JSON record of what each source photo (by content hash) has produced.
+
+    {"version": 3,
+     "sources": {sha256: {"input": name, "faces": {max_edge: [[x, y, w, h], ...]},
+                          "qualities": {quality_search_key: quality},
+                          "frame": {"time", "sha256", "faces"}}},  # videos only
+     "derivatives": {key: {"source": sha256, "aspect", "sizes", "formats",
+                           "quality", "max_kb", "prefix", "outputs": [file names],
+                           "encodings": {file name: encoding}, "faces": count}}}
+
+    A derivative key covers everything that changes the output files, so
+    editing a photo, the aspect, the size list, formats or qualities re-renders.
+    --posters keeps one for videos (poster_manifest_path()), keyed by the
+    clip's content hash.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.data = {'version': MANIFEST_VERSION, 'sources': {}, 'derivatives': {}}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.data = data
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def derivative_key(digest: str, aspect: str = 'original', sizes: List[int] = None,
+                       prefix: str = None, formats: List[str] = None, quality: dict = None,
+                       max_kb: int = None) -> str:
+        sizes = sizes or RESPONSIVE_SIZES
+        qualities = format_qualities(quality)
+        encodings = ','.join(f"{fmt}:{qualities[fmt]}" for fmt in formats or DEFAULT_FORMATS)
+        budget = f"|{max_kb}kb" if max_kb else ''
+        return f"{digest}|{aspect}|{','.join(map(str, sizes))}|{encodings}{budget}|{prefix or ''}"
+
+    def lookup(self, digest: str, output_dir: Path, **settings) -> Optional[dict]:
+        """The finished derivative for these settings, if all its files still exist."""
+        derivative = self.data['derivatives'].get(self.derivative_key(digest, **settings))
+        if derivative and all((output_dir / name).exists() for name in derivative['outputs']):
+            return derivative
+        return None
+
+    def faces_for(self, digest: str, max_edge: int) -> Optional[list]:
+        """Face boxes found earlier in this photo at the same detection size."""
+        faces = self.data['sources'].get(digest, {}).get('faces', {}).get(str(max_edge))
+        return [tuple(f) for f in faces] if faces is not None else None
+
+    def outputs_for(self, prefix: str) -> dict:
+        """{file name: source sha256} for every file a derivative with this prefix wrote, latest last."""
+        return {name: d['source'] for d in self.data['derivatives'].values() if d.get('prefix') == prefix
+                for name in d['outputs']}
+
+    def frame_for(self, digest: str) -> Optional[dict]:
+        """The poster frame picked from this video earlier."""
+        return self.data['sources'].get(digest, {}).get('frame')
+
+    def qualities_for(self, digest: str) -> dict:
+        """Earlier --max-kb search results for this photo."""
+        return dict(self.data['sources'].get(digest, {}).get('qualities', {}))
+
+    def record(self, digest: str, input_path: Path, faces: list, max_edge: int,
+               files: List[str], output_dir: Path, encodings: dict = None, frame: dict = None,
+               **settings):
+        source = self.data['sources'].setdefault(digest, {'input': Path(input_path).name, 'faces': {}})
+        source['faces'][str(max_edge)] = [list(f) for f in faces]
+        if frame:
+            source['frame'] = frame
+        for encoding in (encodings or {}).values():
+            if encoding['search_key']:
+                source.setdefault('qualities', {})[encoding['search_key']] = encoding['quality']
+        self.data['derivatives'][self.derivative_key(digest, **settings)] = {
+            'source': digest,
+            'aspect': settings.get('aspect', 'original'),
+            'sizes': settings.get('sizes') or RESPONSIVE_SIZES,
+            'formats': settings.get('formats') or DEFAULT_FORMATS,
+            'quality': {fmt: q for fmt, q in format_qualities(settings.get('quality')).items()
+                        if fmt in (settings.get('formats') or DEFAULT_FORMATS)},
+            'max_kb': settings.get('max_kb'),
+            'prefix': settings.get('prefix'),
+            'outputs': [os.path.relpath(f, output_dir) for f in files],
+            'encodings': {os.path.relpath(f, output_dir): encoding
+                          for f, encoding in (encodings or {}).items()},
+            'faces': len(faces),
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def box_iou(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
+    """Intersection over union of two (x, y, width, height) boxes."""
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right = min(a[0] + a[2], b[0] + b[2])
+    bottom = min(a[1] + a[3], b[1] + b[3])
+    inter = max(0, right - left) * max(0, bottom - top)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def count_matches(faces: list, reference: list) -> int:
+    """How many reference faces have a detected face overlapping them."""
+    return sum(1 for ref in reference
+               if any(box_iou(ref, face) >= FACE_MATCH_IOU for face in faces))
+
+
+def region_covers(outer, inner) -> bool:
+    """Whether box outer contains box inner (both may be None)."""
+    if inner is None:
+        return True
+    if outer is None:
+        return False
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+            outer[0] + outer[2] >= inner[0] + inner[2] and
+            outer[1] + outer[3] >= inner[1] + inner[3])
+
+
+def benchmark_detection(input_path: str, max_edge: int = DETECTION_MAX_EDGE) -> dict:
+    """
+    Time full-resolution vs proxy face detection on an image or folder.
+    Reports per-image latency and how well the proxy agrees with full
+    resolution: recall/precision of matched faces, and whether the padded
+    faces region smart_crop protects still covers every full-res face.
+    """
+    input_path = Path(input_path)
+    if input_path.is_dir():
+        paths = sorted(p for p in input_path.iterdir() if p.suffix.lower() in BATCH_EXTENSIONS)
+    else:
+        paths = [input_path]
+
+    full_detector = FaceDetector(max_edge=0)
+    proxy_detector = FaceDetector(max_edge=max_edge)
+
+    images = []
+    for path in paths:
+        image = cv2.imread(str(path))
+        if image is None:
+            print(f"✗ {path.name}: could not read image")
+            continue
+        height, width = image.shape[:2]
+
+        start = time.perf_counter()
+        full_faces = full_detector.detect_faces(image)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        proxy_faces = proxy_detector.detect_faces(image)
+        proxy_ms = (time.perf_counter() - start) * 1000
+
+        full_region = full_detector.get_faces_region(full_faces, width, height)
+        proxy_region = proxy_detector.get_faces_region(proxy_faces, width, height)
+        entry = {
+            'input': str(path),
+            'size': [width, height],
+            'full_ms': round(full_ms, 1),
+            'proxy_ms': round(proxy_ms, 1),
+            'full_faces': len(full_faces),
+            'proxy_faces': len(proxy_faces),
+            'recalled': count_matches(proxy_faces, full_faces),
+            'confirmed': count_matches(full_faces, proxy_faces),
+            'region_safe': region_covers(proxy_region, full_region),
+        }
+        images.append(entry)
+        print(f"  {path.name}: {width}x{height}  full {full_ms:7.0f}ms ({len(full_faces)} faces)  "
+              f"proxy {proxy_ms:6.0f}ms ({len(proxy_faces)} faces, {entry['recalled']} matched)")
+
+    full_total = sum(e['full_faces'] for e in images)
+    proxy_total = sum(e['proxy_faces'] for e in images)
+    summary = {
+        'images': len(images),
+        'max_edge': max_edge,
+        'median_full_ms': round(statistics.median(e['full_ms'] for e in images), 1) if images else None,
+        'median_proxy_ms': round(statistics.median(e['proxy_ms'] for e in images), 1) if images else None,
+        'recall': round(sum(e['recalled'] for e in images) / full_total, 3) if full_total else None,
+        'precision': round(sum(e['confirmed'] for e in images) / proxy_total, 3) if proxy_total else None,
+        'crop_safe_images': sum(1 for e in images if e['region_safe']),
+    }
+    return {'summary': summary, 'images': images}
+
+
+def _resize_direct(path: str, sizes: List[int]) -> dict:
+    """The previous pipeline: full decode in OpenCV, BGR->RGB copy, one LANCZOS per size."""
+    rgb_image = cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)
+    pil_image = Image.fromarray(rgb_image)
+    width, height = pil_image.size
+    return {size: pil_image.resize((size, int(height * size / width)), Image.Resampling.LANCZOS)
+            for size in sizes if size < width}
+
+
+def _resize_cascade(path: str, sizes: List[int]) -> dict:
+    pil_image, _ = load_image(Path(path), min_decode_size(sizes, None))
+    return resize_cascade(pil_image, sizes)
+
+
+def _timed_resize_run(pipeline: str, path: str, sizes: List[int]):
+    """Run one resize pipeline in this (fresh) process: (ms, peak MB above start, luma per size)."""
+    try:
+        import resource
+        rss = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        rss_mb = 1 / 1024 if sys.platform != 'darwin' else 1 / (1024 * 1024)
+    except ImportError:
+        rss, rss_mb = (lambda: 0), 0
+    before = rss()
+    start = time.perf_counter()
+    outputs = (_resize_direct if pipeline == 'direct' else _resize_cascade)(path, sizes)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    peak_mb = (rss() - before) * rss_mb
+    return elapsed_ms, peak_mb, {size: np.asarray(img.convert('L')) for size, img in outputs.items()}
+
+
+def benchmark_resize(input_path: str, sizes: List[int] = None) -> dict:
+    """
+    Time and memory of the direct resize pipeline vs draft decode + cascade,
+    per image, with the SSIM of each cascaded size against the direct one.
+    Each run gets a fresh process so peak memory isn't shared between runs.
+    """
+    sizes = sizes or RESPONSIVE_SIZES
+    input_path = Path(input_path)
+    if input_path.is_dir():
+        paths = sorted(p for p in input_path.iterdir() if p.suffix.lower() in BATCH_EXTENSIONS)
+    else:
+        paths = [input_path]
+
+    images = []
+    for path in paths:
+        runs = {}
+        try:
+            for pipeline in ('direct', 'cascade'):
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    runs[pipeline] = executor.submit(_timed_resize_run, pipeline, str(path), sizes).result()
+        except Exception as e:
+            print(f"✗ {path.name}: {e}")
+            continue
+
+        scores = {}
+        for size, direct in runs['direct'][2].items():
+            cascaded = runs['cascade'][2].get(size)
+            if cascaded is None:
+                continue
+            a, b = Image.fromarray(direct), Image.fromarray(cascaded)
+            if b.size != a.size:
+                b = b.resize(a.size, Image.Resampling.LANCZOS)
+            scores[size] = round(ssim(b, a), 4)
+
+        entry = {
+            'input': str(path),
+            'direct_ms': round(runs['direct'][0], 1),
+            'cascade_ms': round(runs['cascade'][0], 1),
+            'direct_peak_mb': round(runs['direct'][1], 1),
+            'cascade_peak_mb': round(runs['cascade'][1], 1),
+            'ssim': scores,
+        }
+        images.append(entry)
+        min_ssim = min(scores.values()) if scores else None
+        print(f"  {path.name}: direct {entry['direct_ms']:6.0f}ms {entry['direct_peak_mb']:6.0f}MB  "
+              f"cascade {entry['cascade_ms']:6.0f}ms {entry['cascade_peak_mb']:6.0f}MB  "
+              f"min SSIM {min_ssim}")
+
+    summary = {
+        'images': len(images),
+        'sizes': sizes,
+        'median_direct_ms': round(statistics.median(e['direct_ms'] for e in images), 1) if images else None,
+        'median_cascade_ms': round(statistics.median(e['cascade_ms'] for e in images), 1) if images else None,
+        'median_direct_peak_mb': round(statistics.median(e['direct_peak_mb'] for e in images), 1) if images else None,
+        'median_cascade_peak_mb': round(statistics.median(e['cascade_peak_mb'] for e in images), 1) if images else None,
+        'min_ssim': min((v for e in images for v in e['ssim'].values()), default=None),
+    }
+    return {'summary': summary, 'images': images}
 
 
 def generate_srcset_html(files: List[str], alt: str = "") -> str:
-    """Generate HTML srcset markup for responsive images."""
+    """
+    Generate HTML srcset markup for responsive images.
+    Files in several formats become a <picture> with a <source> per
+    modern format (AVIF first) and an <img> in the most compatible one.
+    """
     if not files:
         return ""
 
-    # Sort by size (extract width from filename)
-    def get_width(f):
-        name = Path(f).stem
-        for part in name.split('-'):
-            if part.endswith('w'):
-                try:
-                    return int(part[:-1])
-                except:
-                    pass
-        return 0
-
-    files = sorted(files, key=get_width)
-
-    # Build srcset
-    srcset_parts = []
+    by_format = {}
     for f in files:
-        w = get_width(f)
-        if w:
-            srcset_parts.append(f"{Path(f).name} {w}w")
-
-    if not srcset_parts:
+        for image_format, spec in OUTPUT_FORMATS.items():
+            if Path(f).suffix.lower() == spec['ext']:
+                by_format.setdefault(image_format, []).append(f)
+    if len(by_format) > 1:
+        fallback = 'jpg' if 'jpg' in by_format else 'webp' if 'webp' in by_format else next(iter(by_format))
+        img_html = generate_srcset_html(by_format[fallback], alt)
+        sources = []
+        for image_format in OUTPUT_FORMATS:
+            if image_format == fallback or image_format not in by_format:
+                continue
+            srcset = srcset_attribute(by_format[image_format])
+            if srcset:
+                sources.append(f'  <source type="{OUTPUT_FORMATS[image_format]["mime"]}"\n'
+                               f'          srcset="{srcset}"\n'
+                               f'          sizes="{SRCSET_SIZES}">')
+        img_html = '\n'.join('  ' + line for line in img_html.splitlines())
+        return '<picture>\n' + '\n'.join(sources) + '\n' + img_html + '\n</picture>'
+
+    # Sort by size (width from filename)
+    files = sorted(files, key=srcset_width)
+    srcset = srcset_attribute(files)
+
+    if not srcset:
         return f'<img src="{Path(files[0]).name}" alt="{alt}" loading="lazy">'
 
     # Use middle size as default src
     default_src = files[len(files)//2] if files else files[0]
 
     html = f'''<img src="{Path(default_src).name}"
-     srcset="{', '.join(srcset_parts)}"
-     sizes="(max-width: 600px) 400px, (max-width: 1024px) 800px, 1200px"
+     srcset="{srcset}"
+     sizes="{SRCSET_SIZES}"
      alt="{alt}"
      loading="lazy">'''
 
     return html
 
 
+def srcset_width(f: str) -> int:
+    """Width from a '-800w' part of the file name, or 0."""
+    name = Path(f).stem
+    for part in name.split('-'):
+        if part.endswith('w'):
+            try:
+                return int(part[:-1])
+            except ValueError:
+                pass
+    return 0
+
+
+def srcset_attribute(files: List[str]) -> str:
+    """'a-400w.webp 400w, a-800w.webp 800w' for the files with a width in their name."""
+    return ', '.join(f"{Path(f).name} {srcset_width(f)}w"
+                     for f in sorted(files, key=srcset_width) if srcset_width(f))
+
+
+def parse_formats(value: str) -> List[str]:
+    formats = [f.strip().lower().replace('jpeg', 'jpg') for f in value.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"unknown format(s) {', '.join(unknown) or value!r}; "
+                                         f"choose from {', '.join(OUTPUT_FORMATS)}")
+    return list(dict.fromkeys(formats))
+
+
+def parse_qualities(value: str) -> dict:
+    qualities = {}
+    for item in value.split(','):
+        try:
+            image_format, quality = item.split('=')
+            image_format = image_format.strip().lower().replace('jpeg', 'jpg')
+            quality = int(quality)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected format=quality pairs, got {item!r}")
+        if image_format not in OUTPUT_FORMATS or not 0 <= quality <= 100:
+            raise argparse.ArgumentTypeError(f"bad quality setting {item!r}")
+        qualities[image_format] = quality
+    return qualities
+
+
+def run_posters(args):
+    """--posters: fill in missing poster files for the site's videos."""
+    input_path = Path(args.input)
+    output_dir = args.output or (input_path if input_path.is_dir() else input_path.parent)
+    try:
+        check_formats_supported(args.formats)
+        names = dict(parse_name_mapping(n) for n in args.name or [])
+    except ValueError as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
+
+    print(f"\n{'='*60}")
+    print("VIDEO POSTERS - COS Celebrations")
+    print(f"{'='*60}")
+    print(f"Output:   {output_dir}")
+    print(f"Manifest: {args.manifest or poster_manifest_path(input_path, output_dir)}")
+    print(f"Aspect:   {args.aspect}")
+    print(f"Format:   {', '.join(args.formats)}")
+    print(f"Jobs:     {args.jobs}")
+    print(f"{'='*60}\n")
+
+    processor = PhotoProcessor(output_dir=output_dir, detect_max_edge=args.detect_max_edge,
+                               verify_resize=args.verify_resize)
+    try:
+        results = processor.process_videos(input_path, jobs=args.jobs, force=args.force, names=names,
+                                           manifest_path=args.manifest, aspect=args.aspect, formats=args.formats,
+                                           quality=args.quality, max_kb=args.max_kb)
+    except Exception as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
+
+    print(f"\n{'='*60}")
+    print("POSTERS COMPLETE")
+    print(f"{'='*60}")
+    print(f"Posters: {len(results['processed'])} sets ({results['skipped']} already complete)")
+    print(f"Failed:  {len(results['failed'])}")
+    for fail in results['failed']:
+        print(f"  - {fail['input']}: {fail['error']}")
+    if results['failed']:
+        sys.exit(1)
+
+
+def parse_name_mapping(value: str) -> Tuple[str, str]:
+    """'promo.mp4=promo-poster' -> ('promo.mp4', 'promo-poster')."""
+    clip, sep, base = value.partition('=')
+    if not sep or not clip.strip() or not base.strip():
+        raise ValueError(f"--name expects CLIP=POSTER_NAME, got '{value}'")
+    return clip.strip(), base.strip()
+
+
+def run_sweep(args):
+    """--sweep: fill in missing siblings under the site root and report bytes saved."""
+    root = Path(args.input)
+    if not root.is_dir():
+        print(f"\nError: --sweep needs the site root directory, got {root}")
+        sys.exit(1)
+    try:
+        check_formats_supported(['avif', 'webp'])
+    except ValueError as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
+
+    print(f"\n{'='*60}")
+    print("IMAGE SWEEP - COS Celebrations")
+    print(f"{'='*60}")
+    print(f"Root:   {root.resolve()}")
+    print(f"Scan:   {', '.join(f'{d}/' for d in SWEEP_DIRS)}")
+    print(f"Jobs:   {args.jobs}")
+    if args.max_kb:
+        print(f"Budget: {args.max_kb} KB per file")
+    print(f"{'='*60}\n")
+
+    processor = PhotoProcessor(output_dir=root, detect_max_edge=args.detect_max_edge,
+                               verify_resize=args.verify_resize)
+    results = processor.process_sweep(root, jobs=args.jobs, force=args.force, dry_run=args.dry_run,
+                                      quality=args.quality, max_kb=args.max_kb)
+
+    stale = [e for e in results['existing'] if e['stale']]
+    print(f"\n{'='*60}")
+    print("SWEEP PLAN" if args.dry_run else "SWEEP COMPLETE")
+    print(f"{'='*60}")
+    if args.dry_run:
+        planned = sum(len(task['outputs']) for task in results['planned'])
+        print(f"Would write: {planned} files for {len(results['planned'])} assets")
+    else:
+        generated = results['generated']
+        full = sum(o['saved'] for o in generated if o['width'] is None)
+        mobile = sum(o['saved'] for o in generated if o['width'])
+        print(f"Written:   {len(generated)} files for {len(results['planned'])} assets")
+        print(f"Saved:     {full / 1024 / 1024:.1f} MB full-size (AVIF/WebP vs source), "
+              f"{mobile / 1024 / 1024:.1f} MB on phones ({MOBILE_WIDTH}w vs source)")
+        if results['not_smaller']:
+            print(f"Not smaller than the source, not written: {len(results['not_smaller'])}")
+        print(f"Failed:    {len(results['failed'])} assets")
+        for fail in results['failed']:
+            print(f"  - {fail['input']}: {fail['error']}")
+    print(f"Existing:  {len(results['existing'])} siblings left as they are"
+          + (f" ({len(stale)} older than their source; --force regenerates them)"
+             if stale and not args.force else ""))
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Report:    {args.report}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Smart Photo Tool - Face-aware cropping and responsive sizing',
@@ -397,7 +1882,11 @@ Examples:
   %(prog)s photo.jpg --aspect square     # Crop to square for Instagram
   %(prog)s photo.jpg --aspect 16:9       # Crop to 16:9 for hero image
   %(prog)s ./photos/ --batch             # Process entire folder
+  %(prog)s ./photos/ --batch --jobs 8    # ...across 8 worker processes
   %(prog)s photo.jpg --sizes 600 1200    # Custom responsive sizes
+  %(prog)s photo.jpg --formats avif,webp,jpg --quality avif=55 --html
+  %(prog)s ./photos/ --benchmark-detection   # Proxy vs full-res face detection
+  %(prog)s ./photos/ --benchmark-resize      # Direct vs cascaded resize: time, memory, SSIM
 
 Aspect Presets:
   square   1:1   Instagram posts
@@ -410,23 +1899,120 @@ Aspect Presets:
     )
 
     parser.add_argument('input', help='Input image or directory')
-    parser.add_argument('--output', '-o', default='./processed',
-                        help='Output directory (default: ./processed)')
+    parser.add_argument('--output', '-o',
+                        help='Output directory (default: ./processed; with --posters, next to the videos)')
     parser.add_argument('--aspect', '-a', default='original',
-                        help='Target aspect ratio (e.g., square, 16:9, 4:3)')
+                        help='Target aspect ratio (e.g., square, 16:9, 4:3), or several comma-separated '
+                             '(square,4:5,16:9) rendered from one decode and one face detection')
     parser.add_argument('--sizes', '-s', nargs='+', type=int,
                         default=RESPONSIVE_SIZES,
                         help=f'Responsive sizes to generate (default: {RESPONSIVE_SIZES})')
     parser.add_argument('--batch', '-b', action='store_true',
                         help='Process all images in directory')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes for --batch (default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help=f'With --batch, re-render photos already in {MANIFEST_NAME}; '
+                             f'with --sweep, regenerate siblings older than their source; '
+                             f'with --posters, re-render whole poster sets from their clips')
+    parser.add_argument('--sweep', action='store_true',
+                        help=f'Treat input as the site root and add missing AVIF/WebP/{MOBILE_WIDTH}w '
+                             f'siblings to everything in {" and ".join(SWEEP_DIRS)}/')
+    parser.add_argument('--posters', action='store_true',
+                        help=f'Treat input as a video or folder of videos ({", ".join(sorted(VIDEO_EXTENSIONS))}) '
+                             f'and fill in the missing files of each poster set the site uses')
+    parser.add_argument('--name', action='append', metavar='CLIP=POSTER',
+                        help='With --posters, poster name for a clip its pages don\'t reference '
+                             '(e.g. promo.mp4=promo-poster); repeatable')
+    parser.add_argument('--manifest',
+                        help='With --posters, the manifest of picked frames and rendered sets (default: '
+                             f'{POSTER_MANIFEST_PATH.relative_to(PROJECT_DIR)} for videos in this project, '
+                             f'else {POSTER_MANIFEST_NAME} in the output directory)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='With --sweep, list the files it would write and exit')
+    parser.add_argument('--report',
+                        help='With --sweep, write the full results (JSON) to this file')
     parser.add_argument('--prefix', '-p',
                         help='Output filename prefix (overrides auto-naming)')
+    parser.add_argument('--formats', '-f', type=parse_formats,
+                        help=f'Comma-separated output formats: {", ".join(OUTPUT_FORMATS)} '
+                             f'(default: webp; with --posters, {",".join(POSTER_FORMATS)})')
+    parser.add_argument('--quality', '-q', type=parse_qualities, default={},
+                        help='Per-format quality overrides, e.g. avif=55,webp=80 (defaults: ' +
+                             ', '.join(f"{fmt}={spec['quality']}" for fmt, spec in OUTPUT_FORMATS.items()) + ')')
+    parser.add_argument('--max-kb', type=int,
+                        help='Lower each file\'s quality (binary search, not below ' +
+                             ', '.join(f"{fmt}={spec['min_quality']}" for fmt, spec in OUTPUT_FORMATS.items()) +
+                             ') until it fits this many KB; the search results are kept in the '
+                             f'output directory\'s {MANIFEST_NAME} for later runs')
     parser.add_argument('--html', action='store_true',
                         help='Output HTML srcset markup')
+    parser.add_argument('--detect-max-edge', type=int, default=DETECTION_MAX_EDGE,
+                        help=f'Run face detection on a copy at most this many pixels on the long edge, '
+                             f'0 for full resolution (default: {DETECTION_MAX_EDGE})')
+    parser.add_argument('--benchmark-detection', action='store_true',
+                        help='Compare proxy vs full-resolution face detection on the input and exit')
+    parser.add_argument('--verify-resize', action='store_true',
+                        help=f'Check cascaded resizes against a direct resize (SSIM >= {MIN_RESIZE_SSIM})')
+    parser.add_argument('--benchmark-resize', action='store_true',
+                        help='Compare direct vs draft + cascaded resizing on the input and exit')
 
     args = parser.parse_args()
+    if args.formats is None:
+        args.formats = POSTER_FORMATS if args.posters else DEFAULT_FORMATS
+    if args.output is None and not args.posters:
+        args.output = './processed'
+
+    if args.benchmark_detection:
+        print(f"\nFace detection: full resolution vs {args.detect_max_edge}px proxy\n")
+        report = benchmark_detection(args.input, args.detect_max_edge)
+        summary = report['summary']
+        if not summary['images']:
+            print("No images to benchmark")
+            sys.exit(1)
+        speedup = summary['median_full_ms'] / summary['median_proxy_ms'] if summary['median_proxy_ms'] else 0
+        print(f"\n{'='*60}")
+        print(f"Images:        {summary['images']}")
+        print(f"Median time:   {summary['median_full_ms']:.0f}ms full, "
+              f"{summary['median_proxy_ms']:.0f}ms proxy ({speedup:.1f}x)")
+        print(f"Recall:        {summary['recall']}  (full-res faces the proxy also found)")
+        print(f"Precision:     {summary['precision']}  (proxy faces full-res also found)")
+        print(f"Crop-safe:     {summary['crop_safe_images']}/{summary['images']} images "
+              f"(proxy faces region covers the full-res one)")
+        sys.exit(0)
+
+    if args.benchmark_resize:
+        print(f"\nResize: direct LANCZOS per size vs draft decode + cascade ({args.sizes})\n")
+        report = benchmark_resize(args.input, args.sizes)
+        summary = report['summary']
+        if not summary['images']:
+            print("No images to benchmark")
+            sys.exit(1)
+        print(f"\n{'='*60}")
+        print(f"Images:        {summary['images']}")
+        print(f"Median time:   {summary['median_direct_ms']:.0f}ms direct, "
+              f"{summary['median_cascade_ms']:.0f}ms cascade")
+        print(f"Median memory: {summary['median_direct_peak_mb']:.0f}MB direct, "
+              f"{summary['median_cascade_peak_mb']:.0f}MB cascade (peak RSS growth)")
+        print(f"Lowest SSIM:   {summary['min_ssim']} (cascade vs direct, 1.0 = identical)")
+        sys.exit(0)
+
+    try:
+        check_formats_supported(args.formats)
+    except ValueError as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
+
+    if args.sweep:
+        run_sweep(args)
+        sys.exit(0)
+
+    if args.posters:
+        run_posters(args)
+        sys.exit(0)
 
-    processor = PhotoProcessor(output_dir=args.output)
+    processor = PhotoProcessor(output_dir=args.output, detect_max_edge=args.detect_max_edge,
+                               verify_resize=args.verify_resize)
 
     print(f"\n{'='*60}")
     print("SMART PHOTO TOOL - COS Celebrations")
@@ -434,49 +2020,67 @@ Aspect Presets:
     print(f"Output: {args.output}")
     print(f"Aspect: {args.aspect}")
     print(f"Sizes:  {args.sizes}")
+    print(f"Format: {', '.join(args.formats)}")
+    if args.max_kb:
+        print(f"Budget: {args.max_kb} KB per file")
+    if args.batch:
+        print(f"Jobs:   {args.jobs}")
     print(f"{'='*60}\n")
 
     try:
         if args.batch:
             results = processor.process_batch(
                 args.input,
+                jobs=args.jobs,
+                force=args.force,
                 aspect=args.aspect,
                 sizes=args.sizes,
-                prefix=args.prefix
+                prefix=args.prefix,
+                formats=args.formats,
+                quality=args.quality,
+                max_kb=args.max_kb
             )
 
             print(f"\n{'='*60}")
             print(f"BATCH COMPLETE")
             print(f"{'='*60}")
-            print(f"Processed: {len(results['processed'])} images")
+            print(f"Processed: {len(results['processed'])} images ({results['skipped']} unchanged, skipped)")
             print(f"Failed:    {len(results['failed'])} images")
             print(f"Faces:     {results['total_faces']} detected")
+            if args.max_kb:
+                encodings = [e for item in results['processed'] for e in item['encodings'].values()]
+                over = sum(1 for e in encodings if e['over_budget'])
+                print(f"Budget:    {len(encodings) - over}/{len(encodings)} files within {args.max_kb} KB")
 
             if results['failed']:
                 print(f"\nFailed files:")
                 for fail in results['failed']:
                     print(f"  - {fail['input']}: {fail['error']}")
         else:
-            files, faces = processor.process_image(
+            files, faces, encodings = processor.process_single(
                 args.input,
                 aspect=args.aspect,
                 sizes=args.sizes,
-                prefix=args.prefix
+                prefix=args.prefix,
+                formats=args.formats,
+                quality=args.quality,
+                max_kb=args.max_kb
             )
 
             print(f"\n{'='*60}")
             print(f"PROCESSING COMPLETE")
             print(f"{'='*60}")
-            print(f"Faces detected: {faces}")
+            print(f"Faces detected: {len(faces)}")
             print(f"Files created:")
             for f in files:
-                size = os.path.getsize(f)
-                print(f"  - {Path(f).name} ({size/1024:.1f} KB)")
+                print(f"  - {describe_encoding(f, encodings[f])}")
 
             if args.html:
-                print(f"\nHTML srcset markup:")
-                print("-" * 40)
-                print(generate_srcset_html(files, alt="Wedding photo"))
+                for aspect in split_aspects(args.aspect):
+                    aspect_files = [f for f in files if encodings[f]['aspect'] == aspect]
+                    print(f"\nHTML srcset markup ({aspect}):")
+                    print("-" * 40)
+                    print(generate_srcset_html(aspect_files, alt="Wedding photo"))
 
     except Exception as e:
         print(f"\nError: {e}")